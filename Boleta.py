@@ -1,11 +1,19 @@
 import pandas as pd
 import json
 import os
+import time
+import threading
+from functools import lru_cache
+from contextlib import nullcontext
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
-from reporte import generar_dashboard_html, convertir_html_a_pdf
+from boleta_compacta import BoletaCompacta, cargar_diccionarios, guardar_diccionarios, bloquear_diccionarios
+from planificador import ejecutar_etapas
+from liquidacion import liquidar_boletas
+from catalogo import CatalogoProductos
+from historial import AgregadosPersonas
+from perfil_memoria import PerfilMemoria, PresupuestoMemoriaExcedido
+from cache_boletas import calcular_hash_archivo, cargar_desde_cache, guardar_en_cache, PYARROW_DISPONIBLE
 
 # =============================================================================
 # CONFIGURACIÓN INICIAL
@@ -17,11 +25,59 @@ class Config:
     # Configuración de archivos
     DIRECTORIO_DATA = 'data'
     DIRECTORIO_REPORTES = 'reportes'
+    DIRECTORIO_CACHE = 'cache'
+    ARCHIVO_DICCIONARIOS = os.path.join(DIRECTORIO_CACHE, 'diccionarios.json')
+    ARCHIVO_CATALOGO = 'catalogo_productos.json'
+    ARCHIVO_HISTORIAL = os.path.join(DIRECTORIO_CACHE, 'historial_personas.json')
     ARCHIVO_EXCEL = 'analisis_gastos.xlsx'
+    # 'unico' escribe siempre ARCHIVO_EXCEL; 'por_boleta' escribe reportes/<partición>/analisis_<csv>_<fecha>.xlsx
+    MODO_EXCEL = 'unico'
+    
+    # Reportes de cada boleta en subdirectorios por fecha (patrón de strftime sobre la fecha del
+    # reporte; None deja todo en DIRECTORIO_REPORTES) e índice reportes/index.html + indice.jsonl
+    PARTICION_REPORTES = '%Y/%m/%d'
+    INDICE_REPORTES = True
     
     # Configuración de propina
     PROPINA_PORCENTAJE = 10  # Porcentaje de propina
     
+    # Configuración del caché de boletas procesadas (requiere pyarrow)
+    USAR_CACHE = True
+    
+    # Motor para generar el PDF: 'chromium' (Playwright) o 'nativo' (matplotlib, sin navegador)
+    MOTOR_PDF = 'chromium'
+    
+    # Perfil del PDF: 'archivo' (máxima fidelidad) o 'compacto' (sin degradados ni sombras, gráficos
+    # en JPEG con Chromium y fuentes sin incrustar con el motor nativo; mucho más liviano para enviar)
+    PERFIL_PDF = 'archivo'
+    
+    # PDF de Chromium en páginas A4 (secciones en páginas nuevas, encabezados de tabla repetidos)
+    # en vez de una sola página del alto del dashboard; el motor nativo siempre pagina
+    PDF_PAGINADO = False
+    
+    # Artefactos extra capturados en la misma carga del dashboard (solo motor 'chromium')
+    GENERAR_MINIATURA = False       # PNG para notificaciones
+    RECORTE_MINIATURA = 'resumen'   # 'completa' o 'resumen'
+    GENERAR_IMAGENES_GRAFICOS = False
+    GENERAR_DATOS_JSON = False
+    
+    # Dashboard HTML: 'completo' (un HTML autocontenido por boleta) o 'shell' (un shell
+    # compartido reportes/dashboard_shell_v<N>.html + reportes/datos/<boleta>.json)
+    MODO_DASHBOARD = 'completo'
+    COMPRESION_DATOS = None         # None, 'gzip' o 'brotli' (copia pre-comprimida del JSON)
+    
+    # Renderizar los gráficos una sola vez como PNG y reutilizarlos en HTML, Excel y PDF
+    GRAFICOS_ESTATICOS = False
+    DPI_GRAFICOS = 150
+    
+    # Generar Excel en paralelo con la rama HTML → PDF
+    REPORTES_EN_PARALELO = True
+    
+    # Perfil de memoria por etapa (tracemalloc + RSS); con presupuesto, la etapa que lo supere falla
+    PERFIL_MEMORIA = False
+    PRESUPUESTO_MEMORIA_MB = None
+    ARCHIVO_PERFIL_MEMORIA = os.path.join(DIRECTORIO_REPORTES, 'perfil_memoria.json')
+    
     # Configuración de visualización
     COLORES = [
         "#ff9f1c",  # naranja suave
@@ -44,13 +100,29 @@ class Config:
     # Configuración de matplotlib
     @staticmethod
     def configurar_matplotlib():
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         sns.set_palette("pastel")
         plt.rcParams['font.size'] = 12
 
 
-# Aplicar configuraciones iniciales
+# Aplicar configuraciones iniciales (matplotlib se configura al dibujar el primer gráfico)
 Config.configurar_pandas()
-Config.configurar_matplotlib()
+
+
+@lru_cache(maxsize=None)
+def importar_graficos():
+    """
+    Importa y configura matplotlib y seaborn la primera vez que se necesitan.
+    Así los cálculos (y dividir.py) no pagan el costo de importar las librerías de gráficos.
+    
+    Returns:
+        Tuple de (plt, sns)
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    Config.configurar_matplotlib()
+    return plt, sns
 
 
 # =============================================================================
@@ -102,44 +174,64 @@ def print_left_aligned(dataframe):
         print(row_str)
 
 
-def calcular_estadisticas_por_responsable(df, total_cuenta):
+def calcular_estadisticas_por_responsable(df, total_cuenta, historial=None, id_boleta=None, fecha=None,
+                                          propina_porcentaje=None):
     """
     Calcula estadísticas por responsable
 
     Args:
-        df: DataFrame con los datos
+        df: DataFrame con los datos o BoletaCompacta
         total_cuenta: Total de la cuenta sin propina
+        historial: AgregadosPersonas a actualizar con esta boleta (opcional)
+        id_boleta: Identificador de la boleta en el historial (ej. nombre del CSV)
+        fecha: Fecha de la boleta para el historial (por defecto hoy)
+        propina_porcentaje: Porcentaje de propina (por defecto Config.PROPINA_PORCENTAJE)
 
     Returns:
         DataFrame con estadísticas por responsable
     """
-    # Pre-parsear JSON para evitar múltiples llamadas
-    stats = []
-    for _, row in df.iterrows():
-        resp_list = json.loads(row['Responsables_JSON'])
-        if not resp_list:
-            continue
+    if propina_porcentaje is None:
+        propina_porcentaje = Config.PROPINA_PORCENTAJE
+    
+    # Agregar sobre arreglos de ids en vez de crear un dict por cada par (ítem, responsable)
+    boleta = df if isinstance(df, BoletaCompacta) else BoletaCompacta.desde_dataframe(df)
+    
+    # Actualizar los agregados históricos de forma incremental
+    if historial is not None:
+        if id_boleta is None:
+            raise ValueError("Se necesita id_boleta para registrar la boleta en el historial")
+        historial.registrar_boleta(
+            id_boleta, boleta, propina_porcentaje, fecha or datetime.now().strftime("%Y-%m-%d")
+        )
+    
+    ids, total_gastado, cantidad_items = boleta.totales_por_persona()
+    _, total_con_propina, _ = boleta.totales_por_persona(1 + propina_porcentaje / 100)
 
-        monto_por_persona = row['Total'] / len(resp_list)
-        for resp in resp_list:
-            stats.append({
-                'Responsable': resp,
-                'Producto': row['Producto'],
-                'Monto_Asignado': monto_por_persona,
-                'Monto_con_propina': monto_por_persona * (1 + Config.PROPINA_PORCENTAJE / 100),
-                'Personas_Compartiendo': len(resp_list)
-            })
+    return armar_estadisticas(boleta.personas.obtener_nombres(ids), total_gastado, total_con_propina,
+                              cantidad_items, total_cuenta)
 
-    stats_df = pd.DataFrame(stats)
 
-    # Crear resumen por responsable
-    resumen = stats_df.groupby('Responsable', as_index=False).agg({
-        'Monto_Asignado': 'sum',
-        'Monto_con_propina': 'sum',
-        'Producto': 'count'
-    })
+def armar_estadisticas(responsables, total_gastado, total_con_propina, cantidad_items, total_cuenta):
+    """
+    Arma la tabla de estadísticas por responsable a partir de los totales ya sumados
+
+    Args:
+        responsables: Nombres de los responsables
+        total_gastado: Total sin propina de cada responsable
+        total_con_propina: Total con propina de cada responsable
+        cantidad_items: Cantidad de ítems de cada responsable
+        total_cuenta: Total de la cuenta sin propina
 
-    resumen.columns = ['Responsable', 'Total_Gastado', 'Total_con_Propina', 'Cantidad_Items']
+    Returns:
+        DataFrame con estadísticas por responsable y la fila TOTAL
+    """
+    # Crear resumen por responsable (ordenado alfabéticamente, igual que un groupby)
+    resumen = pd.DataFrame({
+        'Responsable': responsables,
+        'Total_Gastado': total_gastado,
+        'Total_con_Propina': total_con_propina,
+        'Cantidad_Items': cantidad_items
+    }).sort_values(by='Responsable').reset_index(drop=True)
     
     # Calcular porcentajes
     porcentajes = (resumen['Total_Gastado'] / total_cuenta * 100).round(2)
@@ -164,45 +256,76 @@ def calcular_estadisticas_por_responsable(df, total_cuenta):
     return pd.concat([resumen, total_row], ignore_index=True)
 
 
-def generar_tablas_detalle(df, stats_responsables):
+def obtener_items_por_responsable(df):
+    """
+    Agrupa los ítems de la boleta por responsable usando el índice invertido
+    persona → asignaciones, construido en una sola pasada sobre las asignaciones
+
+    Args:
+        df: DataFrame con los datos o BoletaCompacta
+
+    Returns:
+        dict: {responsable: [(producto, precio), ...]} en el orden de la boleta; un
+        producto aparece tantas veces como el responsable figure en él
+    """
+    boleta = df if isinstance(df, BoletaCompacta) else BoletaCompacta.desde_dataframe(df)
+    ids, offsets, asignaciones = boleta.indice_por_persona()
+
+    productos = boleta.productos.obtener_nombres(boleta.producto_ids[boleta.item_por_asignacion()])
+    precios = boleta.monto_por_asignacion().tolist()
+
+    items_por_responsable = {}
+    for k, nombre in enumerate(boleta.personas.obtener_nombres(ids)):
+        posiciones = asignaciones[offsets[k]:offsets[k + 1]].tolist()
+        items_por_responsable[nombre] = [(productos[a], precios[a]) for a in posiciones]
+    return items_por_responsable
+
+
+def generar_tablas_detalle(df, stats_responsables, formato='ancho'):
     """
     Genera tablas de detalle con productos y precios por responsable
 
     Args:
-        df: DataFrame con los datos
+        df: DataFrame con los datos o BoletaCompacta
         stats_responsables: DataFrame con estadísticas por responsable
+        formato: 'ancho' (una fila por responsable con columnas Item_N / Precio_N) o
+                 'largo' (una fila por ítem asignado, sin columnas de relleno)
 
     Returns:
-        Tuple de (tabla_productos, tabla_precios)
+        Tuple de (tabla_productos, tabla_precios). En formato 'largo', tabla_productos
+        tiene columnas Responsable, Item, Producto y Precio, y tabla_precios una fila por
+        responsable con Subtotal, Propina y Total a Pagar (valores numéricos)
     """
-    # Pre-parsear JSON una sola vez para optimizar
-    df_parsed = df.copy()
-    df_parsed['Responsables_Parsed'] = df_parsed['Responsables_JSON'].apply(json.loads)
-    
-    # Determinar items por responsable
-    items_por_responsable = {}
-    for responsable in stats_responsables[:-1]['Responsable']:
-        items = []
-        for _, row in df_parsed.iterrows():
-            responsables = row['Responsables_Parsed']
-            # Contar cuántas veces aparece el responsable en la lista
-            cantidad_veces = responsables.count(responsable)
-            if cantidad_veces > 0:
-                precio_unitario = row['Total'] / len(responsables)
-                # Agregar el producto tantas veces como aparezca el responsable
-                for _ in range(cantidad_veces):
-                    items.append({
-                        'producto': row['Producto'],
-                        'precio': precio_unitario
-                    })
-        items_por_responsable[responsable] = items
-    
+    if formato not in ('ancho', 'largo'):
+        raise ValueError(f"Formato de tablas desconocido: {formato}")
+
+    indice = obtener_items_por_responsable(df)
+    responsables = stats_responsables[:-1]['Responsable']
+    items_por_responsable = {responsable: indice.get(responsable, []) for responsable in responsables}
+    columna_propina = f'Propina ({Config.PROPINA_PORCENTAJE}%)'
+
+    if formato == 'largo':
+        filas_items = [
+            (responsable, i + 1, producto, precio)
+            for responsable, items in items_por_responsable.items()
+            for i, (producto, precio) in enumerate(items)
+        ]
+        filas_totales = []
+        for responsable, items in items_por_responsable.items():
+            subtotal = sum(precio for _, precio in items)
+            propina_monto = subtotal * (Config.PROPINA_PORCENTAJE / 100)
+            filas_totales.append((responsable, subtotal, propina_monto, subtotal + propina_monto))
+
+        tabla_productos = pd.DataFrame(filas_items, columns=['Responsable', 'Item', 'Producto', 'Precio'])
+        tabla_precios = pd.DataFrame(filas_totales, columns=['Responsable', 'Subtotal', columna_propina, 'Total a Pagar'])
+        return tabla_productos, tabla_precios
+
     max_items = max((len(items) for items in items_por_responsable.values()), default=0)
 
     # Crear columnas dinámicas
     columnas_productos = ['Responsable'] + [f'Item_{i + 1}' for i in range(max_items)]
     columnas_precios = ['Responsable'] + [f'Precio_{i + 1}' for i in range(max_items)] + [
-        'Subtotal', f'Propina ({Config.PROPINA_PORCENTAJE}%)', 'Total a Pagar'
+        'Subtotal', columna_propina, 'Total a Pagar'
     ]
 
     # Construir filas usando list comprehension (mucho más eficiente)
@@ -216,8 +339,8 @@ def generar_tablas_detalle(df, stats_responsables):
 
         for i in range(max_items):
             if i < len(items):
-                fila_productos[f'Item_{i + 1}'] = items[i]['producto']
-                precio = items[i]['precio']
+                producto, precio = items[i]
+                fila_productos[f'Item_{i + 1}'] = producto
                 fila_precios[f'Precio_{i + 1}'] = f"${round(precio)}"
                 subtotal += precio
             else:
@@ -228,7 +351,7 @@ def generar_tablas_detalle(df, stats_responsables):
         propina_monto = subtotal * (Config.PROPINA_PORCENTAJE / 100)
         total = subtotal + propina_monto
         fila_precios['Subtotal'] = f"${round(subtotal)}"
-        fila_precios[f'Propina ({Config.PROPINA_PORCENTAJE}%)'] = f"${round(propina_monto)}"
+        fila_precios[columna_propina] = f"${round(propina_monto)}"
         fila_precios['Total a Pagar'] = f"${round(total)}"
 
         filas_productos.append(fila_productos)
@@ -253,6 +376,8 @@ def grafico_barras(stats_responsables, palette):
         stats_responsables: DataFrame con estadísticas por responsable
         palette: Paleta de colores a usar
     """
+    plt, sns = importar_graficos()
+    
     plt.figure(figsize=(12, 6))
     
     # Ordenar datos alfabéticamente por responsable
@@ -292,6 +417,8 @@ def grafico_torta(stats_responsables):
     Args:
         stats_responsables: DataFrame con estadísticas por responsable
     """
+    plt, _ = importar_graficos()
+    
     # Ordenar datos alfabéticamente por responsable
     datos = stats_responsables[:-1].sort_values('Responsable', ascending=True)
     plt.figure(figsize=(10, 10))
@@ -322,6 +449,8 @@ def mapa_calor(df, stats_responsables):
         df: DataFrame con los datos
         stats_responsables: DataFrame con estadísticas por responsable
     """
+    plt, sns = importar_graficos()
+    
     # Pre-parsear JSON y ordenar alfabéticamente
     df_parsed = df.copy()
     df_parsed['Responsables_Parsed'] = df_parsed['Responsables_JSON'].apply(json.loads)
@@ -366,7 +495,8 @@ def mapa_calor(df, stats_responsables):
 # FUNCIONES DE EXPORTAR A EXCEL
 # =============================================================================
 
-def exportar_a_excel(stats_responsables, tabla_productos, tabla_precios, nombre_archivo="resultados.xlsx"):
+def exportar_a_excel(stats_responsables, tabla_productos, tabla_precios, nombre_archivo="resultados.xlsx",
+                     imagenes_graficos=None, transferencias=None):
     """
     Exporta las tablas a un archivo Excel con múltiples hojas
 
@@ -375,8 +505,17 @@ def exportar_a_excel(stats_responsables, tabla_productos, tabla_precios, nombre_
         tabla_productos: DataFrame con productos por responsable
         tabla_precios: DataFrame con precios por responsable
         nombre_archivo: Nombre del archivo Excel a generar
+        imagenes_graficos: Dict {id_grafico: ruta_png} para insertar en una hoja 'Gráficos' (opcional)
+        transferencias: DataFrame De/Para/Monto para una hoja 'Transferencias' (opcional)
+    
+    Returns:
+        str: Nombre del archivo generado
     """
-    with pd.ExcelWriter(nombre_archivo, engine='xlsxwriter') as writer:
+    # Escribir a un temporal y renombrar para que dos procesos nunca mezclen el mismo archivo
+    raiz, extension = os.path.splitext(nombre_archivo)
+    archivo_temporal = f"{raiz}.{os.getpid()}.{threading.get_ident()}.tmp{extension}"
+    
+    with pd.ExcelWriter(archivo_temporal, engine='xlsxwriter') as writer:
         # Configurar el formato para moneda
         workbook = writer.book
         money_format = workbook.add_format({'num_format': '$#,##0'})
@@ -395,28 +534,153 @@ def exportar_a_excel(stats_responsables, tabla_productos, tabla_precios, nombre_
         num_cols = len(tabla_precios.columns)
         worksheet.set_column(1, num_cols - 1, 15)
 
+        # Transferencias para saldar la cuenta
+        if transferencias is not None and len(transferencias):
+            transferencias.to_excel(writer, sheet_name='Transferencias', index=False)
+            worksheet = writer.sheets['Transferencias']
+            worksheet.set_column('A:B', 20)
+            worksheet.set_column('C:C', 15, money_format)
+
+        # Insertar los gráficos ya renderizados, uno bajo otro
+        if imagenes_graficos:
+            worksheet = workbook.add_worksheet('Gráficos')
+            fila = 0
+            for ruta_imagen in imagenes_graficos.values():
+                worksheet.insert_image(fila, 0, ruta_imagen, {'x_scale': 0.6, 'y_scale': 0.6})
+                fila += 30
+
+    os.replace(archivo_temporal, nombre_archivo)
     print(f"\nArchivo Excel generado: {nombre_archivo}")
+    return nombre_archivo
+
+
+def _escribir_filas(worksheet, fila, df, formatos_columnas=None):
+    """
+    Escribe las filas de un DataFrame sin encabezado, una por una (compatible con el modo
+    constant_memory de xlsxwriter, que exige escribir cada hoja en orden de filas)
+
+    Args:
+        worksheet: Hoja de xlsxwriter
+        fila: Fila inicial
+        df: DataFrame a escribir
+        formatos_columnas: Dict {columna: formato} (opcional)
+
+    Returns:
+        int: Siguiente fila libre
+    """
+    formatos_columnas = formatos_columnas or {}
+    for registro in df.itertuples(index=False):
+        for col, (nombre_col, valor) in enumerate(zip(df.columns, registro)):
+            if pd.isna(valor):
+                continue
+            worksheet.write(fila, col, valor.item() if hasattr(valor, 'item') else valor,
+                            formatos_columnas.get(nombre_col))
+        fila += 1
+    return fila
+
+
+# Hojas de datos del consolidado: todas las boletas una bajo otra, con una columna Boleta
+COLUMNAS_CONSOLIDADO_RESPONSABLES = ['Boleta', 'Responsable', 'Total_Gastado', 'Total_con_Propina',
+                                     'Cantidad_Items', 'Porcentaje_Cuenta']
+COLUMNAS_CONSOLIDADO_ITEMS = ['Boleta', 'Responsable', 'Item', 'Producto', 'Precio']
+
+
+def exportar_consolidado(archivos_csv, nombre_archivo=None):
+    """
+    Exporta varias boletas a un solo Excel con una hoja índice y dos hojas de datos largas
+    ('Responsables' e 'Ítems') con una fila por responsable o ítem y una columna Boleta.
+    Cada boleta se carga, se escribe y se descarta antes de pasar a la siguiente, y
+    xlsxwriter trabaja en modo constant_memory, así que la memoria no crece con la
+    cantidad de boletas. Como ese modo mantiene un archivo temporal abierto por hoja,
+    la cantidad de hojas es fija (no una por boleta) para no agotar los descriptores
+    de archivo con miles de boletas.
+
+    Args:
+        archivos_csv: Lista de nombres de archivos CSV (se buscarán en la carpeta 'data')
+        nombre_archivo: Ruta del Excel (por defecto reportes/consolidado_<fecha>.xlsx)
+
+    Returns:
+        str: Ruta del archivo generado
+    """
+    import xlsxwriter
+    
+    if nombre_archivo is None:
+        fecha_actual = datetime.now().strftime("%Y-%m-%d")
+        nombre_archivo = os.path.join(Config.DIRECTORIO_REPORTES, f"consolidado_{fecha_actual}.xlsx")
+    Path(nombre_archivo).parent.mkdir(parents=True, exist_ok=True)
+    
+    raiz, extension = os.path.splitext(nombre_archivo)
+    archivo_temporal = f"{raiz}.{os.getpid()}.{threading.get_ident()}.tmp{extension}"
+    
+    workbook = xlsxwriter.Workbook(archivo_temporal, {'constant_memory': True})
+    formato_encabezado = workbook.add_format({'bold': True})
+    money_format = workbook.add_format({'num_format': '$#,##0'})
+    formatos_montos = {'Total_Gastado': money_format, 'Total_con_Propina': money_format,
+                       'Precio': money_format}
+    
+    # La hoja índice se crea primero para que quede al inicio; se llena una fila por boleta
+    indice = workbook.add_worksheet('Índice')
+    indice.set_column('A:A', 25)
+    indice.set_column('B:C', 18, money_format)
+    indice.set_column('D:E', 14)
+    indice.write_row(0, 0, ['Boleta', 'Total', 'Total con Propina', 'Responsables', 'Cuadra'], formato_encabezado)
+    
+    hoja_responsables = workbook.add_worksheet('Responsables')
+    hoja_responsables.set_column('A:B', 20)
+    hoja_responsables.set_column('C:F', 15)
+    hoja_responsables.write_row(0, 0, COLUMNAS_CONSOLIDADO_RESPONSABLES, formato_encabezado)
+    hoja_items = workbook.add_worksheet('Ítems')
+    hoja_items.set_column('A:B', 20)
+    hoja_items.set_column('D:D', 30)
+    hoja_items.set_column('E:E', 15)
+    hoja_items.write_row(0, 0, COLUMNAS_CONSOLIDADO_ITEMS, formato_encabezado)
+    fila_responsables = fila_items = 1
+    
+    for fila_indice, archivo_csv in enumerate(archivos_csv, start=1):
+        df, total_cuenta, total_con_propina = cargar_y_procesar_csv(archivo_csv)
+        stats_responsables = calcular_estadisticas_por_responsable(df, total_cuenta)
+        tabla_items, _ = generar_tablas_detalle(df, stats_responsables, formato='largo')
+        cuadra = df['Total'].sum() == total_cuenta
+        boleta = Path(archivo_csv).stem
+        
+        # El índice enlaza a la primera fila de la boleta en la hoja de responsables
+        indice.write_url(fila_indice, 0, f"internal:'Responsables'!A{fila_responsables + 1}", string=boleta)
+        indice.write_number(fila_indice, 1, float(total_cuenta))
+        indice.write_number(fila_indice, 2, float(total_con_propina))
+        indice.write_number(fila_indice, 3, len(stats_responsables) - 1)
+        indice.write_string(fila_indice, 4, 'Sí' if cuadra else 'No')
+        
+        # Sin la fila TOTAL: los totales de cada boleta ya están en el índice
+        responsables = stats_responsables[stats_responsables['Responsable'] != 'TOTAL']
+        fila_responsables = _escribir_filas(hoja_responsables, fila_responsables,
+                                            responsables.assign(Boleta=boleta)[COLUMNAS_CONSOLIDADO_RESPONSABLES],
+                                            formatos_montos)
+        fila_items = _escribir_filas(hoja_items, fila_items,
+                                     tabla_items.assign(Boleta=boleta)[COLUMNAS_CONSOLIDADO_ITEMS],
+                                     formatos_montos)
+    
+    workbook.close()
+    os.replace(archivo_temporal, nombre_archivo)
+    print(f"\nArchivo Excel consolidado generado: {nombre_archivo}")
+    return nombre_archivo
 
 
 # =============================================================================
 # FUNCIONES DE CARGA Y PROCESAMIENTO DE DATOS
 # =============================================================================
 
-def cargar_y_procesar_csv(archivo_csv):
+def procesar_boleta_csv(origen):
     """
-    Carga y procesa el archivo CSV con los datos de gastos
+    Lee y procesa una boleta en CSV, sin caché
     
     Args:
-        archivo_csv: Nombre del archivo CSV (se buscará en la carpeta 'data')
+        origen: Ruta del CSV o archivo abierto (ej. sys.stdin)
     
     Returns:
         Tuple de (df_procesado, total_cuenta, total_con_propina)
     """
-    # Construir ruta completa desde la carpeta data
-    ruta_csv = os.path.join(Config.DIRECTORIO_DATA, archivo_csv)
-    
     # Leer CSV
-    df_original = pd.read_csv(ruta_csv, decimal=',', thousands='.')
+    df_original = pd.read_csv(origen, decimal=',', thousands='.')
     
     # Extraer totales
     total_cuenta = df_original.loc[df_original['Cant'] == 'Total', 'Total'].values[0]
@@ -433,7 +697,131 @@ def cargar_y_procesar_csv(archivo_csv):
     return df, total_cuenta, total_con_propina
 
 
-def verificar_totales(df, total_cuenta, total_con_propina):
+def cargar_y_procesar_csv(archivo_csv, usar_cache=None):
+    """
+    Carga y procesa el archivo CSV con los datos de gastos.
+    Si el caché está activo, reutiliza la versión Arrow ya procesada
+    mientras el hash del CSV no cambie.
+    
+    Args:
+        archivo_csv: Nombre del archivo CSV (se buscará en la carpeta 'data')
+        usar_cache: Usar el caché Arrow (por defecto Config.USAR_CACHE)
+    
+    Returns:
+        Tuple de (df_procesado, total_cuenta, total_con_propina)
+    """
+    # Construir ruta completa desde la carpeta data
+    ruta_csv = os.path.join(Config.DIRECTORIO_DATA, archivo_csv)
+    
+    if usar_cache is None:
+        usar_cache = Config.USAR_CACHE
+    usar_cache = usar_cache and PYARROW_DISPONIBLE
+    
+    # Intentar cargar desde el caché
+    hash_csv = None
+    if usar_cache:
+        hash_csv = calcular_hash_archivo(ruta_csv)
+        resultado = cargar_desde_cache(ruta_csv, Config.DIRECTORIO_CACHE, hash_csv)
+        if resultado is not None:
+            return resultado
+    
+    df, total_cuenta, total_con_propina = procesar_boleta_csv(ruta_csv)
+    
+    # Guardar en caché para las próximas cargas
+    if usar_cache:
+        guardar_en_cache(ruta_csv, df, total_cuenta, total_con_propina, Config.DIRECTORIO_CACHE, hash_csv)
+    
+    return df, total_cuenta, total_con_propina
+
+
+def cargar_boletas_compactas(archivos_csv):
+    """
+    Carga varias boletas en formato compacto usando los diccionarios globales
+    de personas y productos, de modo que un mismo nombre tenga el mismo id en todas
+    
+    Args:
+        archivos_csv: Lista de nombres de archivos CSV (se buscarán en la carpeta 'data')
+    
+    Returns:
+        Dict de {archivo_csv: (boleta_compacta, total_cuenta, total_con_propina)}
+    """
+    # Asignar ids dentro del bloqueo: otro proceso podría estar agregando nombres a la vez
+    with bloquear_diccionarios(Config.ARCHIVO_DICCIONARIOS):
+        personas, productos = cargar_diccionarios(Config.ARCHIVO_DICCIONARIOS)
+        num_personas, num_productos = len(personas), len(productos)
+        
+        # Una boleta a la vez: cada DataFrame se descarta apenas se convierte,
+        # así el pico de memoria no crece con el tamaño del lote
+        boletas = {}
+        for archivo_csv in archivos_csv:
+            df, total_cuenta, total_con_propina = cargar_y_procesar_csv(archivo_csv)
+            boleta = BoletaCompacta.desde_dataframe(df, personas, productos)
+            del df
+            boletas[archivo_csv] = (boleta, total_cuenta, total_con_propina)
+        
+        # Guardar solo si aparecieron nombres nuevos
+        if len(personas) != num_personas or len(productos) != num_productos:
+            guardar_diccionarios(personas, productos, Config.ARCHIVO_DICCIONARIOS)
+    
+    return boletas
+
+
+def normalizar_productos(df, catalogo=None):
+    """
+    Agrega la columna 'Producto_Canonico' con el nombre canónico de cada producto
+    según el catálogo, para poder agrupar el mismo ítem entre boletas y restaurantes
+    
+    Args:
+        df: DataFrame de cargar_y_procesar_csv
+        catalogo: CatalogoProductos (por defecto se carga desde Config.ARCHIVO_CATALOGO)
+    
+    Returns:
+        DataFrame con la columna Producto_Canonico
+    """
+    guardar = catalogo is None
+    if catalogo is None:
+        catalogo = CatalogoProductos.cargar(Config.ARCHIVO_CATALOGO)
+    num_decisiones = len(catalogo.decisiones)
+    
+    df = df.copy()
+    df['Producto_Canonico'] = catalogo.normalizar_columna(df['Producto'])
+    
+    # Guardar las decisiones nuevas para no recalcularlas la próxima vez
+    if guardar and len(catalogo.decisiones) != num_decisiones:
+        catalogo.guardar(Config.ARCHIVO_CATALOGO)
+    
+    return df
+
+
+def reconstruir_historial(archivos_csv=None):
+    """
+    Reconstruye desde cero los agregados históricos por persona y los guarda
+    en Config.ARCHIVO_HISTORIAL. Cada boleta conserva la fecha con que se registró en el
+    historial anterior; las nuevas usan la fecha de hoy, igual que el registro incremental.
+    
+    Args:
+        archivos_csv: Lista de CSV a incluir (por defecto todos los de la carpeta 'data')
+    
+    Returns:
+        AgregadosPersonas reconstruido
+    """
+    if archivos_csv is None:
+        archivos_csv = sorted(p.name for p in Path(Config.DIRECTORIO_DATA).glob('*.csv'))
+    
+    # La fecha de modificación del CSV cambia al copiar o hacer checkout; se usa la registrada
+    anterior = AgregadosPersonas.cargar(Config.ARCHIVO_HISTORIAL)
+    
+    historial = AgregadosPersonas()
+    for archivo_csv in archivos_csv:
+        df, total_cuenta, _ = cargar_y_procesar_csv(archivo_csv)
+        calcular_estadisticas_por_responsable(df, total_cuenta, historial, archivo_csv,
+                                              anterior.fecha_boleta(archivo_csv))
+    
+    historial.guardar(Config.ARCHIVO_HISTORIAL)
+    return historial
+
+
+def verificar_totales(df, total_cuenta, total_con_propina, propina_porcentaje=None):
     """
     Verifica que los totales calculados coincidan con los del CSV
     
@@ -441,15 +829,26 @@ def verificar_totales(df, total_cuenta, total_con_propina):
         df: DataFrame procesado
         total_cuenta: Total sin propina del CSV
         total_con_propina: Total con propina del CSV
+        propina_porcentaje: Porcentaje de propina (por defecto Config.PROPINA_PORCENTAJE)
+    
+    Returns:
+        bool: True si ambos totales cuadran
     """
+    if propina_porcentaje is None:
+        propina_porcentaje = Config.PROPINA_PORCENTAJE
     suma_productos = df['Total'].sum()
+    cuadra = True
     
     if suma_productos != total_cuenta:
         print(f"⚠️  Diferencia en total: {total_cuenta - suma_productos}")
+        cuadra = False
     
-    total_calculado = suma_productos * (1 + Config.PROPINA_PORCENTAJE / 100)
+    total_calculado = suma_productos * (1 + propina_porcentaje / 100)
     if abs(total_calculado - total_con_propina) > 0.01:  # Tolerancia para redondeo
         print(f"⚠️  Diferencia en total con propina: {total_con_propina - total_calculado}")
+        cuadra = False
+    
+    return cuadra
 
 
 def obtener_configuracion_colores(num_responsables):
@@ -464,13 +863,17 @@ def obtener_configuracion_colores(num_responsables):
     """
     if num_responsables <= len(Config.COLORES):
         return Config.COLORES[:num_responsables]
+    _, sns = importar_graficos()
     return sns.color_palette("husl", num_responsables)
 
 
 def generar_reportes(stats_responsables, tabla_productos, tabla_precios, 
-                     total_cuenta, total_con_propina, nombre_csv):
+                     total_cuenta, total_con_propina, nombre_csv, motor_pdf=None, pagador=None, perfil=None,
+                     solo_etapas=None, resultados_previos=None, fecha=None, perfil_pdf=None, modo_excel=None):
     """
-    Genera todos los reportes (Excel, HTML, PDF)
+    Genera todos los reportes (Excel, HTML, PDF).
+    El Excel se genera en paralelo con la rama HTML → PDF; si un artefacto
+    falla, los demás se generan igual.
     
     Args:
         stats_responsables: DataFrame con estadísticas
@@ -479,28 +882,208 @@ def generar_reportes(stats_responsables, tabla_productos, tabla_precios,
         total_cuenta: Total sin propina
         total_con_propina: Total con propina
         nombre_csv: Nombre del archivo CSV (para usar en nombres de archivos)
+        motor_pdf: 'chromium' o 'nativo' (por defecto Config.MOTOR_PDF)
+        pagador: Quien pagó la cuenta (nombre o dict {nombre: monto}); si se indica,
+                 se agregan las transferencias para saldarla
+        perfil: PerfilMemoria activo para medir cada etapa (las etapas corren de a una)
+        solo_etapas: Etapas a ejecutar (por defecto todas); las dependencias que no estén
+                     incluidas se toman de resultados_previos
+        resultados_previos: Dict {etapa: resultado} de ejecuciones anteriores (ej. la ruta del HTML)
+        fecha: Fecha usada en los nombres de archivo (por defecto hoy)
+        perfil_pdf: 'archivo' o 'compacto' (por defecto Config.PERFIL_PDF)
+        modo_excel: 'unico' o 'por_boleta' (por defecto Config.MODO_EXCEL)
+    
+    Returns:
+        Tuple de (resultados, errores) por etapa ('graficos', 'excel', 'html', 'pdf')
     """
-    # Crear directorio si no existe
-    Path(Config.DIRECTORIO_REPORTES).mkdir(exist_ok=True)
+    # Importar la parte de reportes solo aquí: carga Playwright y los gráficos
+    from reporte import (generar_datos_json, generar_dashboard_html, generar_dashboard_json,
+                         capturar_artefactos, generar_pdf_nativo, renderizar_graficos)
+    from indice_reportes import ruta_particion, registrar_reporte
+    
+    # Importar matplotlib y seaborn ocupa decenas de MB: se mide como etapa propia para
+    # no atribuírselo a la primera etapa que dibuje
+    with perfil.etapa('reportes.importar_graficos') if perfil is not None else nullcontext():
+        importar_graficos()
+    
+    motor_pdf = motor_pdf or Config.MOTOR_PDF
+    perfil_pdf = perfil_pdf or Config.PERFIL_PDF
+    modo_excel = modo_excel or Config.MODO_EXCEL
+    if motor_pdf not in ('chromium', 'nativo'):
+        raise ValueError(f"Motor de PDF desconocido: {motor_pdf}")
+    if modo_excel not in ('unico', 'por_boleta'):
+        raise ValueError(f"Modo de Excel desconocido: {modo_excel}")
+    if Config.MODO_DASHBOARD not in ('completo', 'shell'):
+        raise ValueError(f"Modo de dashboard desconocido: {Config.MODO_DASHBOARD}")
     
-    fecha_actual = datetime.now().strftime("%Y-%m-%d")
+    fecha_actual = fecha or datetime.now().strftime("%Y-%m-%d")
     
-    # Extraer nombre base del CSV (sin extensión)
+    # Crear directorio si no existe (ej. reportes/2026/01/15 con la partición por fecha)
+    particion = ruta_particion(fecha_actual)
+    Path(Config.DIRECTORIO_REPORTES, particion).mkdir(parents=True, exist_ok=True)
+    
+    # Extraer nombre base del CSV (sin extensión); los nombres son relativos a reportes/
     nombre_base = Path(nombre_csv).stem
+    nombre_dashboard = os.path.join(particion, f"dashboard_{nombre_base}_{fecha_actual}.html")
+    nombre_pdf = os.path.join(particion, f"dashboard_{nombre_base}_{fecha_actual}.pdf")
+    if modo_excel == 'por_boleta':
+        nombre_excel = os.path.join(Config.DIRECTORIO_REPORTES, particion,
+                                    f"analisis_{nombre_base}_{fecha_actual}.xlsx")
+    else:
+        nombre_excel = Config.ARCHIVO_EXCEL
+    
+    # Transferencias para que cada uno le devuelva a quien pagó
+    transferencias = liquidar_boletas([(stats_responsables, pagador)])[1] if pagador else None
+    
+    # Gráficos renderizados una sola vez (si falla, se vuelve a los gráficos de Chart.js)
+    def etapa_graficos():
+        if not Config.GRAFICOS_ESTATICOS:
+            return None
+        try:
+            data = generar_datos_json(stats_responsables, tabla_productos, tabla_precios,
+                                      total_cuenta, total_con_propina, Config.PROPINA_PORCENTAJE, fecha_actual)
+            return renderizar_graficos(data, f"{nombre_base}_{fecha_actual}", Config.DPI_GRAFICOS,
+                                       os.path.join(Config.DIRECTORIO_REPORTES, particion, "graficos"))
+        except Exception as e:
+            print(f"⚠️  No se pudieron renderizar los gráficos: {e}")
+            return None
     
     # Excel
-    exportar_a_excel(stats_responsables, tabla_productos, tabla_precios, Config.ARCHIVO_EXCEL)
+    def etapa_excel(imagenes_graficos):
+        return exportar_a_excel(stats_responsables, tabla_productos, tabla_precios, nombre_excel,
+                                imagenes_graficos, transferencias)
     
-    # Dashboard HTML
-    nombre_dashboard = f"dashboard_{nombre_base}_{fecha_actual}.html"
-    ruta_html = generar_dashboard_html(
-        stats_responsables, tabla_productos, tabla_precios,
-        total_cuenta, total_con_propina, Config.PROPINA_PORCENTAJE, fecha_actual, nombre_dashboard
-    )
+    # Dashboard HTML (completo o JSON para el shell compartido, que siempre usa Chart.js)
+    def etapa_html(imagenes_graficos):
+        if Config.MODO_DASHBOARD == 'shell':
+            return generar_dashboard_json(
+                stats_responsables, tabla_productos, tabla_precios,
+                total_cuenta, total_con_propina, Config.PROPINA_PORCENTAJE, fecha_actual,
+                os.path.join(particion, f"dashboard_{nombre_base}_{fecha_actual}.json"),
+                transferencias, Config.COMPRESION_DATOS
+            )
+        return generar_dashboard_html(
+            stats_responsables, tabla_productos, tabla_precios,
+            total_cuenta, total_con_propina, Config.PROPINA_PORCENTAJE, fecha_actual, nombre_dashboard,
+            imagenes_graficos, transferencias
+        )
+    
+    # PDF desde HTML (ajustado al contenido) o generado directamente en Python
+    def etapa_pdf(ruta_html, imagenes_graficos):
+        if motor_pdf == 'nativo':
+            return generar_pdf_nativo(
+                stats_responsables, tabla_productos, tabla_precios,
+                total_cuenta, total_con_propina, Config.PROPINA_PORCENTAJE, fecha_actual, nombre_pdf,
+                imagenes_graficos=imagenes_graficos, transferencias=transferencias,
+                perfil_pdf=perfil_pdf
+            )
+        
+        # Una sola carga del dashboard para el PDF y los artefactos opcionales
+        artefactos = capturar_artefactos(
+            ruta_html, nombre_pdf,
+            nombre_png=os.path.join(particion, f"dashboard_{nombre_base}_{fecha_actual}.png")
+                       if Config.GENERAR_MINIATURA else None,
+            recorte_png=Config.RECORTE_MINIATURA,
+            capturar_graficos=Config.GENERAR_IMAGENES_GRAFICOS,
+            nombre_datos=os.path.join(particion, f"dashboard_{nombre_base}_{fecha_actual}.json")
+                         if Config.GENERAR_DATOS_JSON else None,
+            perfil_pdf=perfil_pdf,
+            paginado=Config.PDF_PAGINADO
+        )
+        if artefactos is None:
+            raise RuntimeError("No se pudo generar el PDF con Chromium")
+        return artefactos['pdf']
+    
+    etapas = {
+        'graficos': (etapa_graficos, []),
+        'excel': (etapa_excel, ['graficos']),
+        'html': (etapa_html, ['graficos']),
+        'pdf': (etapa_pdf, ['html', 'graficos']),
+    }
+    
+    # Ejecutar solo algunas etapas, reutilizando los resultados de las dependencias ya generadas
+    if solo_etapas is not None:
+        desconocidas = set(solo_etapas) - set(etapas)
+        if desconocidas:
+            raise ValueError(f"Etapas desconocidas: {sorted(desconocidas)}")
+        previos = resultados_previos or {}
+        etapas = {
+            nombre: (funcion, dependencias) if nombre in solo_etapas
+            else ((lambda valor=previos.get(nombre): valor), [])
+            for nombre, (funcion, dependencias) in etapas.items()
+            if nombre in solo_etapas or any(nombre in etapas[e][1] for e in solo_etapas)
+        }
+    
+    max_hilos = None if Config.REPORTES_EN_PARALELO else 1
+    
+    # Medir la memoria de cada etapa por separado (en paralelo los picos se mezclarían)
+    if perfil is not None and perfil.activo:
+        etapas = {nombre: (perfil.medir(f"reportes.{nombre}", funcion), dependencias)
+                  for nombre, (funcion, dependencias) in etapas.items()}
+        max_hilos = 1
     
-    # PDF desde HTML (ajustado al contenido)
-    nombre_pdf = f"dashboard_{nombre_base}_{fecha_actual}.pdf"
-    convertir_html_a_pdf(ruta_html, nombre_pdf)
+    resultados, errores = ejecutar_etapas(etapas, max_hilos=max_hilos)
+    
+    for artefacto, error in errores.items():
+        print(f"❌ Error al generar {artefacto.upper()}: {error}")
+    
+    # Registrar en el índice lo generado en esta llamada (las demás etapas se registran al correr);
+    # el Excel 'unico' se sobrescribe en cada boleta, así que no se enlaza
+    indexables = ('html', 'pdf', 'excel') if modo_excel == 'por_boleta' else ('html', 'pdf')
+    artefactos = {etapa: resultados.get(etapa) for etapa in indexables
+                  if etapa in resultados and (solo_etapas is None or etapa in solo_etapas)}
+    if Config.INDICE_REPORTES and any(artefactos.values()):
+        registrar_reporte(nombre_base, fecha_actual, total_con_propina, len(stats_responsables) - 1,
+                          artefactos)
+    
+    # Superar el presupuesto de memoria hace fallar toda la ejecución, no solo la etapa
+    for error in errores.values():
+        if isinstance(error, PresupuestoMemoriaExcedido):
+            raise error
+    
+    return resultados, errores
+
+
+def comparar_perfiles_pdf(stats_responsables, tabla_productos, tabla_precios,
+                          total_cuenta, total_con_propina, nombre_csv, motor_pdf=None, perfiles=None):
+    """
+    Genera el PDF de una boleta con cada perfil y compara tamaño y tiempo.
+    El HTML y los gráficos se generan una sola vez; cada perfil sobrescribe el PDF anterior.
+    
+    Args:
+        stats_responsables: DataFrame con estadísticas
+        tabla_productos: DataFrame con productos
+        tabla_precios: DataFrame con precios
+        total_cuenta: Total sin propina
+        total_con_propina: Total con propina
+        nombre_csv: Nombre del archivo CSV
+        motor_pdf: 'chromium' o 'nativo' (por defecto Config.MOTOR_PDF)
+        perfiles: Perfiles a comparar (por defecto todos los de PERFILES_PDF)
+    
+    Returns:
+        DataFrame con columnas Perfil, Tamano_KB y Segundos
+    """
+    from reporte import PERFILES_PDF
+    
+    argumentos = (stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina, nombre_csv)
+    previos, errores = generar_reportes(*argumentos, motor_pdf=motor_pdf, solo_etapas=['graficos', 'html'])
+    if errores:
+        raise RuntimeError(f"No se pudo preparar el dashboard: {errores}")
+    
+    filas = []
+    for perfil in perfiles or PERFILES_PDF:
+        inicio = time.perf_counter()
+        resultados, errores = generar_reportes(*argumentos, motor_pdf=motor_pdf, solo_etapas=['pdf'],
+                                               resultados_previos=previos, perfil_pdf=perfil)
+        segundos = time.perf_counter() - inicio
+        if 'pdf' in errores:
+            raise errores['pdf']
+        filas.append({
+            'Perfil': perfil,
+            'Tamano_KB': round(os.path.getsize(resultados['pdf']) / 1024, 1),
+            'Segundos': round(segundos, 2),
+        })
+    return pd.DataFrame(filas)
 
 
 # =============================================================================
@@ -513,35 +1096,46 @@ if __name__ == "__main__":
     # Configuración del archivo CSV
     ARCHIVO_CSV = 'Boleta04.csv'
     
+    # Perfil de memoria (no mide nada si Config.PERFIL_MEMORIA es False)
+    perfil = PerfilMemoria(Config.PERFIL_MEMORIA, Config.PRESUPUESTO_MEMORIA_MB, Config.ARCHIVO_PERFIL_MEMORIA)
+    
     # Cargar y procesar datos
-    df, total_cuenta, total_con_propina = cargar_y_procesar_csv(ARCHIVO_CSV)
+    with perfil.etapa('carga'):
+        df, total_cuenta, total_con_propina = cargar_y_procesar_csv(ARCHIVO_CSV)
     
     # Mostrar datos procesados
     print("📊 DataFrame procesado:")
     print_left_aligned(df)
     
     # Verificar totales
-    verificar_totales(df, total_cuenta, total_con_propina)
+    with perfil.etapa('verificacion'):
+        verificar_totales(df, total_cuenta, total_con_propina)
     
     # Estadísticas básicas
     print("\n📈 Estadísticas básicas:")
-    print(df.describe())
+    with perfil.etapa('describe'):
+        print(df.describe())
     
     # Calcular estadísticas por responsable
     print("\n👥 Estadísticas por responsable:")
-    stats_responsables = calcular_estadisticas_por_responsable(df, total_cuenta)
+    with perfil.etapa('estadisticas'):
+        stats_responsables = calcular_estadisticas_por_responsable(df, total_cuenta)
     print_left_aligned(stats_responsables)
     
     # Generar gráficos
     num_responsables = len(stats_responsables) - 1  # Sin contar TOTAL
     palette = obtener_configuracion_colores(num_responsables)
     
-    grafico_barras(stats_responsables, palette)
-    grafico_torta(stats_responsables)
-    mapa_calor(df, stats_responsables)
+    with perfil.etapa('grafico_barras'):
+        grafico_barras(stats_responsables, palette)
+    with perfil.etapa('grafico_torta'):
+        grafico_torta(stats_responsables)
+    with perfil.etapa('mapa_calor'):
+        mapa_calor(df, stats_responsables)
     
     # Generar tablas detalladas
-    tabla_productos, tabla_precios = generar_tablas_detalle(df, stats_responsables)
+    with perfil.etapa('tablas_detalle'):
+        tabla_productos, tabla_precios = generar_tablas_detalle(df, stats_responsables)
     
     print("\n🛍️  Tabla de Productos por Responsable:")
     print_left_aligned(tabla_productos)
@@ -550,4 +1144,10 @@ if __name__ == "__main__":
     
     # Generar todos los reportes
     generar_reportes(stats_responsables, tabla_productos, tabla_precios, 
-                    total_cuenta, total_con_propina, ARCHIVO_CSV)
\ No newline at end of file
+                    total_cuenta, total_con_propina, ARCHIVO_CSV, perfil=perfil)
+    
+    # Reporte de memoria
+    perfil.imprimir()
+    ruta_perfil = perfil.guardar()
+    if ruta_perfil:
+        print(f"\n✅ Perfil de memoria generado: {ruta_perfil}")
@@ -0,0 +1,337 @@
+import os
+import json
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Bloqueo de archivos entre procesos: fcntl en Unix, msvcrt en Windows
+try:
+    import fcntl
+    FCNTL_DISPONIBLE = True
+except ImportError:
+    import msvcrt
+    FCNTL_DISPONIBLE = False
+
+
+class TablaNombres:
+    """Tabla de nombres internados: asigna un id entero estable a cada nombre"""
+
+    def __init__(self, nombres=None):
+        self.nombres = []
+        self.ids = {}
+        for nombre in nombres or []:
+            self.obtener_id(nombre)
+
+    def obtener_id(self, nombre):
+        """
+        Obtiene el id de un nombre, registrándolo si es nuevo
+
+        Args:
+            nombre: Nombre a internar
+
+        Returns:
+            int: Id del nombre
+        """
+        id_nombre = self.ids.get(nombre)
+        if id_nombre is None:
+            id_nombre = len(self.nombres)
+            self.ids[nombre] = id_nombre
+            self.nombres.append(nombre)
+        return id_nombre
+
+    def obtener_nombres(self, ids):
+        """
+        Traduce un arreglo de ids a sus nombres
+
+        Args:
+            ids: Iterable de ids
+
+        Returns:
+            list: Nombres correspondientes
+        """
+        return [self.nombres[i] for i in ids]
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __contains__(self, nombre):
+        return nombre in self.ids
+
+
+def cargar_diccionarios(ruta_archivo):
+    """
+    Carga los diccionarios globales de personas y productos guardados en disco.
+    Los ids son la posición de cada nombre, por lo que se mantienen estables entre boletas.
+
+    Args:
+        ruta_archivo: Ruta del archivo JSON de diccionarios
+
+    Returns:
+        Tuple de (personas, productos) como TablaNombres (vacías si el archivo no existe)
+    """
+    if not os.path.exists(ruta_archivo):
+        return TablaNombres(), TablaNombres()
+
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    return TablaNombres(datos.get('personas')), TablaNombres(datos.get('productos'))
+
+
+@contextmanager
+def bloquear_archivo(ruta_archivo):
+    """
+    Bloqueo exclusivo entre procesos sobre un archivo (se bloquea <ruta>.lock, así el
+    archivo protegido se puede reemplazar con os.replace sin perder el bloqueo)
+
+    Args:
+        ruta_archivo: Ruta del archivo a proteger
+    """
+    directorio = os.path.dirname(ruta_archivo)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    with open(f"{ruta_archivo}.lock", 'a+b') as candado:
+        if FCNTL_DISPONIBLE:
+            fcntl.flock(candado, fcntl.LOCK_EX)
+        else:
+            candado.seek(0)
+            msvcrt.locking(candado.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if FCNTL_DISPONIBLE:
+                fcntl.flock(candado, fcntl.LOCK_UN)
+            else:
+                candado.seek(0)
+                msvcrt.locking(candado.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def bloquear_diccionarios(ruta_archivo):
+    """
+    Bloqueo exclusivo entre procesos sobre los diccionarios (archivo <ruta>.lock).
+    Cargar, agregar nombres y guardar deben hacerse dentro del bloqueo: si dos procesos
+    agregan nombres a la vez, el segundo sobrescribiría los ids que entregó el primero.
+
+    Args:
+        ruta_archivo: Ruta del archivo JSON de diccionarios
+    """
+    return bloquear_archivo(ruta_archivo)
+
+
+def guardar_diccionarios(personas, productos, ruta_archivo):
+    """
+    Guarda los diccionarios globales de personas y productos.
+    Los nombres solo se agregan al final, así que un id nunca cambia de nombre
+    (siempre que se carguen y guarden dentro de bloquear_diccionarios).
+
+    Args:
+        personas: TablaNombres de personas
+        productos: TablaNombres de productos
+        ruta_archivo: Ruta del archivo JSON de diccionarios
+    """
+    directorio = os.path.dirname(ruta_archivo)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    # Escribir a un temporal y renombrar para no dejar el archivo a medias
+    ruta_temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as f:
+        json.dump({'personas': personas.nombres, 'productos': productos.nombres}, f, ensure_ascii=False)
+    os.replace(ruta_temporal, ruta_archivo)
+
+
+class BoletaCompacta:
+    """
+    Representación compacta de una boleta basada en arreglos tipados.
+
+    Cada ítem i tiene su producto en producto_ids[i] y su monto en montos[i].
+    Sus responsables están en persona_ids[offsets[i]:offsets[i + 1]] (formato CSR).
+    Los nombres se guardan una sola vez en las tablas de personas y productos.
+    """
+
+    def __init__(self, producto_ids, montos, offsets, persona_ids, productos, personas):
+        self.producto_ids = producto_ids
+        self.montos = montos
+        self.offsets = offsets
+        self.persona_ids = persona_ids
+        self.productos = productos
+        self.personas = personas
+
+    @classmethod
+    def desde_dataframe(cls, df, personas=None, productos=None):
+        """
+        Construye la boleta compacta desde el DataFrame de cargar_y_procesar_csv
+
+        Args:
+            df: DataFrame con columnas Producto, Total y Responsables_JSON
+            personas: TablaNombres compartida para personas (opcional)
+            productos: TablaNombres compartida para productos (opcional)
+
+        Returns:
+            BoletaCompacta
+        """
+        personas = personas if personas is not None else TablaNombres()
+        productos = productos if productos is not None else TablaNombres()
+
+        num_items = len(df)
+        producto_ids = np.fromiter(
+            (productos.obtener_id(p) for p in df['Producto']), dtype=np.int32, count=num_items
+        )
+
+        # Montos enteros (pesos); solo se mantienen decimales si la boleta los trae
+        totales = df['Total'].to_numpy()
+        if np.array_equal(totales, np.round(totales)):
+            montos = totales.astype(np.int64)
+        else:
+            montos = totales.astype(np.float64)
+
+        offsets = np.zeros(num_items + 1, dtype=np.int64)
+        ids = []
+        for i, valor in enumerate(df['Responsables_JSON']):
+            lista = json.loads(valor)
+            ids.extend(personas.obtener_id(r) for r in lista)
+            offsets[i + 1] = len(ids)
+        persona_ids = np.array(ids, dtype=np.int32)
+
+        return cls(producto_ids, montos, offsets, persona_ids, productos, personas)
+
+    def __len__(self):
+        return len(self.montos)
+
+    @property
+    def num_asignaciones(self):
+        """Número total de pares (ítem, responsable)"""
+        return len(self.persona_ids)
+
+    def personas_por_item(self):
+        """
+        Returns:
+            Arreglo con la cantidad de responsables de cada ítem
+        """
+        return np.diff(self.offsets)
+
+    def item_por_asignacion(self):
+        """
+        Returns:
+            Arreglo con el índice de ítem de cada asignación
+        """
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.personas_por_item())
+
+    def monto_por_asignacion(self):
+        """
+        Returns:
+            Arreglo con el monto (sin propina) que corresponde a cada asignación
+        """
+        compartidos = self.personas_por_item()
+        return np.repeat(self.montos / np.maximum(compartidos, 1), compartidos)
+
+    def indice_por_persona(self):
+        """
+        Índice invertido persona → asignaciones, en formato CSR como los ítems
+
+        Returns:
+            Tuple de (ids_personas, offsets, asignaciones): las asignaciones de ids_personas[k]
+            son asignaciones[offsets[k]:offsets[k + 1]], en el orden en que aparecen en la boleta
+        """
+        # Orden estable: dentro de cada persona se conserva el orden de la boleta
+        asignaciones = np.argsort(self.persona_ids, kind='stable')
+        ids, cantidad = np.unique(self.persona_ids, return_counts=True)
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(cantidad, out=offsets[1:])
+        return ids, offsets, asignaciones
+
+    def totales_por_persona(self, factor=1):
+        """
+        Suma lo asignado a cada persona agregando directamente sobre los ids
+
+        Args:
+            factor: Multiplicador aplicado a cada monto (ej. 1.1 para incluir propina)
+
+        Returns:
+            Tuple de (ids_personas, total_gastado, cantidad_items) solo para las
+            personas presentes en esta boleta
+        """
+        return agregar_por_persona(self.persona_ids, self.monto_por_asignacion() * factor)
+
+    def a_dataframe(self):
+        """
+        Reconstruye el DataFrame que esperan las funciones existentes
+        (calcular_estadisticas_por_responsable, generar_tablas_detalle, mapa_calor)
+
+        Returns:
+            DataFrame con columnas Producto, Total, Responsables y Responsables_JSON
+        """
+        listas = [
+            self.personas.obtener_nombres(self.persona_ids[inicio:fin])
+            for inicio, fin in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+        return pd.DataFrame({
+            'Producto': self.productos.obtener_nombres(self.producto_ids),
+            'Total': self.montos,
+            'Responsables': [';'.join(lista) if lista else None for lista in listas],
+            'Responsables_JSON': [json.dumps(lista) for lista in listas],
+        })
+
+    def a_dataframe_asignaciones(self, propina_porcentaje):
+        """
+        Genera el DataFrame largo con una fila por par (ítem, responsable)
+
+        Args:
+            propina_porcentaje: Porcentaje de propina aplicado
+
+        Returns:
+            DataFrame con Responsable, Producto, Monto_Asignado, Monto_con_propina
+            y Personas_Compartiendo
+        """
+        items = self.item_por_asignacion()
+        monto = self.monto_por_asignacion()
+        return pd.DataFrame({
+            'Responsable': self.personas.obtener_nombres(self.persona_ids),
+            'Producto': self.productos.obtener_nombres(self.producto_ids[items]),
+            'Monto_Asignado': monto,
+            'Monto_con_propina': monto * (1 + propina_porcentaje / 100),
+            'Personas_Compartiendo': self.personas_por_item()[items],
+        })
+
+
+def agregar_por_persona(persona_ids, montos):
+    """
+    Agrupa montos por id de persona. Usa solo los ids presentes, por lo que el costo
+    no depende del tamaño del diccionario global.
+
+    Args:
+        persona_ids: Arreglo de ids de persona (uno por asignación)
+        montos: Arreglo de montos (uno por asignación)
+
+    Returns:
+        Tuple de (ids_personas, total, cantidad) ordenado por id
+    """
+    ids, posiciones = np.unique(persona_ids, return_inverse=True)
+    total = np.bincount(posiciones, weights=montos, minlength=len(ids))
+    cantidad = np.bincount(posiciones, minlength=len(ids))
+    return ids, total, cantidad
+
+
+def combinar_totales_por_persona(boletas, factor=1):
+    """
+    Suma lo asignado a cada persona en varias boletas en una sola pasada.
+    Las boletas deben compartir la misma tabla de personas (diccionario global).
+
+    Args:
+        boletas: Lista de BoletaCompacta
+        factor: Multiplicador aplicado a cada monto (ej. 1.1 para incluir propina)
+
+    Returns:
+        Tuple de (ids_personas, total_gastado, cantidad_items)
+    """
+    if not boletas:
+        return np.array([], dtype=np.int32), np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+
+    personas = boletas[0].personas
+    if any(boleta.personas is not personas for boleta in boletas):
+        raise ValueError("Las boletas no comparten el mismo diccionario de personas")
+
+    persona_ids = np.concatenate([boleta.persona_ids for boleta in boletas])
+    montos = np.concatenate([boleta.monto_por_asignacion() for boleta in boletas]) * factor
+    return agregar_por_persona(persona_ids, montos)
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+# Importar pyarrow para el caché columnar (opcional)
+try:
+    import pyarrow as pa
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+# Versión del formato del caché; si cambia el procesamiento, se invalida todo
+VERSION_CACHE = '1'
+
+
+def calcular_hash_archivo(ruta_archivo, tamano_bloque=1 << 20):
+    """
+    Calcula el hash SHA-256 de un archivo leyéndolo por bloques
+
+    Args:
+        ruta_archivo: Ruta del archivo
+        tamano_bloque: Tamaño de cada bloque de lectura en bytes
+
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    sha = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def obtener_ruta_cache(ruta_csv, directorio_cache='cache'):
+    """
+    Obtiene la ruta del archivo Arrow asociado a un CSV
+
+    Args:
+        ruta_csv: Ruta del archivo CSV original
+        directorio_cache: Carpeta donde se guardan los archivos de caché
+
+    Returns:
+        str: Ruta del archivo .arrow
+    """
+    return os.path.join(directorio_cache, f"{Path(ruta_csv).stem}.arrow")
+
+
+def cargar_desde_cache(ruta_csv, directorio_cache='cache', hash_csv=None):
+    """
+    Carga una boleta ya procesada desde el caché Arrow (memory-mapped)
+    si el hash del CSV coincide con el guardado
+
+    Args:
+        ruta_csv: Ruta del archivo CSV original
+        directorio_cache: Carpeta donde se guardan los archivos de caché
+        hash_csv: Hash del CSV si ya fue calculado (opcional)
+
+    Returns:
+        Tuple de (df_procesado, total_cuenta, total_con_propina) o None si no hay caché válido
+    """
+    if not PYARROW_DISPONIBLE:
+        return None
+
+    ruta_arrow = obtener_ruta_cache(ruta_csv, directorio_cache)
+    if not os.path.exists(ruta_arrow):
+        return None
+
+    hash_csv = hash_csv or calcular_hash_archivo(ruta_csv)
+
+    try:
+        with pa.memory_map(ruta_arrow, 'r') as fuente:
+            lector = pa.ipc.open_file(fuente)
+            metadata = lector.schema.metadata or {}
+            if (metadata.get(b'version') != VERSION_CACHE.encode()
+                    or metadata.get(b'sha256') != hash_csv.encode()):
+                return None
+            tabla = lector.read_all()
+            totales = json.loads(metadata[b'totales'])
+    except (pa.ArrowInvalid, OSError, KeyError):
+        return None
+
+    df = tabla.to_pandas()
+    tipo_total = df['Total'].dtype.type
+    return df, tipo_total(totales['total_cuenta']), tipo_total(totales['total_con_propina'])
+
+
+def guardar_en_cache(ruta_csv, df, total_cuenta, total_con_propina,
+                     directorio_cache='cache', hash_csv=None):
+    """
+    Guarda una boleta procesada en formato Arrow IPC junto al hash del CSV original
+
+    Args:
+        ruta_csv: Ruta del archivo CSV original
+        df: DataFrame procesado
+        total_cuenta: Total sin propina
+        total_con_propina: Total con propina
+        directorio_cache: Carpeta donde se guardan los archivos de caché
+        hash_csv: Hash del CSV si ya fue calculado (opcional)
+
+    Returns:
+        str: Ruta del archivo generado o None si pyarrow no está disponible
+    """
+    if not PYARROW_DISPONIBLE:
+        return None
+
+    os.makedirs(directorio_cache, exist_ok=True)
+    hash_csv = hash_csv or calcular_hash_archivo(ruta_csv)
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    totales = {
+        'total_cuenta': total_cuenta.item() if hasattr(total_cuenta, 'item') else total_cuenta,
+        'total_con_propina': total_con_propina.item() if hasattr(total_con_propina, 'item') else total_con_propina,
+    }
+    tabla = tabla.replace_schema_metadata({
+        **(tabla.schema.metadata or {}),
+        b'version': VERSION_CACHE.encode(),
+        b'sha256': hash_csv.encode(),
+        b'totales': json.dumps(totales).encode(),
+    })
+
+    # Escribir a un temporal y renombrar para que otro proceso nunca lea un archivo a medias
+    ruta_arrow = obtener_ruta_cache(ruta_csv, directorio_cache)
+    ruta_temporal = f"{ruta_arrow}.{os.getpid()}.tmp"
+    with pa.OSFile(ruta_temporal, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    os.replace(ruta_temporal, ruta_arrow)
+
+    return ruta_arrow
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import unicodedata
+from collections import Counter
+
+
+def limpiar_nombre(nombre):
+    """
+    Normaliza un nombre de producto para compararlo: minúsculas, sin tildes
+    y solo letras, números y espacios simples
+
+    Args:
+        nombre: Nombre crudo del producto (tal como viene en la boleta)
+
+    Returns:
+        str: Nombre limpio
+    """
+    sin_tildes = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', sin_tildes.lower()).split())
+
+
+def obtener_trigramas(texto):
+    """
+    Obtiene el conjunto de trigramas de un texto ya limpio (con bordes marcados por espacios)
+
+    Args:
+        texto: Texto limpio
+
+    Returns:
+        set: Trigramas del texto
+    """
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class CatalogoProductos:
+    """
+    Catálogo de productos canónicos con un índice invertido de trigramas.
+
+    Cada producto canónico tiene uno o más alias. Para normalizar un nombre solo se
+    comparan los alias que comparten algún trigrama con él, así que el costo no crece
+    con el tamaño total del catálogo. Las decisiones ya tomadas se guardan en caché.
+    """
+
+    def __init__(self, umbral=0.5):
+        self.umbral = umbral
+        self.productos = {}       # canónico → lista de alias
+        self.alias = []           # id de alias → (alias limpio, canónico, cantidad de trigramas)
+        self.indice = {}          # trigrama → lista de ids de alias
+        self.decisiones = {}      # nombre crudo → canónico (o None si no hubo coincidencia)
+        self._indexados = set()   # pares (alias limpio, canónico) ya presentes en el índice
+
+    def agregar_producto(self, canonico, alias=()):
+        """
+        Agrega un producto canónico y sus alias al catálogo
+
+        Args:
+            canonico: Nombre canónico del producto
+            alias: Nombres alternativos con los que aparece en las boletas
+        """
+        lista_alias = self.productos.setdefault(canonico, [])
+        for nombre in (canonico, *alias):
+            if nombre != canonico and nombre not in lista_alias:
+                lista_alias.append(nombre)
+            limpio = limpiar_nombre(nombre)
+            if (limpio, canonico) in self._indexados:
+                continue
+            self._indexados.add((limpio, canonico))
+            trigramas = obtener_trigramas(limpio)
+            id_alias = len(self.alias)
+            self.alias.append((limpio, canonico, len(trigramas)))
+            for trigrama in trigramas:
+                self.indice.setdefault(trigrama, []).append(id_alias)
+
+        # Un alias nuevo puede cambiar decisiones que antes no tenían coincidencia
+        self.decisiones = {crudo: c for crudo, c in self.decisiones.items() if c is not None}
+
+    def buscar(self, nombre):
+        """
+        Busca el producto canónico más parecido usando el índice de trigramas
+
+        Args:
+            nombre: Nombre crudo del producto
+
+        Returns:
+            Tuple de (canónico, similitud) o (None, 0.0) si no supera el umbral
+        """
+        limpio = limpiar_nombre(nombre)
+        trigramas = obtener_trigramas(limpio)
+
+        # Contar trigramas en común solo con los alias candidatos
+        comunes = Counter()
+        for trigrama in trigramas:
+            comunes.update(self.indice.get(trigrama, ()))
+
+        mejor, mejor_similitud = None, 0.0
+        for id_alias, en_comun in comunes.items():
+            alias_limpio, canonico, num_trigramas = self.alias[id_alias]
+            if alias_limpio == limpio:
+                return canonico, 1.0
+            similitud = 2 * en_comun / (len(trigramas) + num_trigramas)  # Coeficiente de Dice
+            if similitud > mejor_similitud:
+                mejor, mejor_similitud = canonico, similitud
+
+        if mejor_similitud < self.umbral:
+            return None, 0.0
+        return mejor, mejor_similitud
+
+    def normalizar(self, nombre):
+        """
+        Obtiene el producto canónico de un nombre, usando la caché de decisiones
+
+        Args:
+            nombre: Nombre crudo del producto
+
+        Returns:
+            str: Nombre canónico o None si no hay coincidencia
+        """
+        if nombre not in self.decisiones:
+            self.decisiones[nombre] = self.buscar(nombre)[0]
+        return self.decisiones[nombre]
+
+    def normalizar_columna(self, productos):
+        """
+        Normaliza una columna de productos procesando cada valor distinto una sola vez.
+        Los productos sin coincidencia conservan su nombre original.
+
+        Args:
+            productos: Serie de pandas con nombres crudos
+
+        Returns:
+            Serie con los nombres canónicos
+        """
+        unicos = productos.dropna().unique()
+        mapeo = {nombre: self.normalizar(nombre) for nombre in unicos}
+        canonicos = productos.map(mapeo)
+        return canonicos.fillna(productos)
+
+    @classmethod
+    def cargar(cls, ruta_archivo, umbral=0.5):
+        """
+        Carga el catálogo y sus decisiones desde un archivo JSON
+
+        Args:
+            ruta_archivo: Ruta del archivo JSON del catálogo
+            umbral: Similitud mínima para aceptar una coincidencia
+
+        Returns:
+            CatalogoProductos (vacío si el archivo no existe)
+        """
+        catalogo = cls(umbral)
+        if not os.path.exists(ruta_archivo):
+            return catalogo
+
+        with open(ruta_archivo, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        for canonico, alias in datos.get('productos', {}).items():
+            catalogo.agregar_producto(canonico, alias)
+        catalogo.decisiones = datos.get('decisiones', {})
+        return catalogo
+
+    def guardar(self, ruta_archivo):
+        """
+        Guarda el catálogo y la caché de decisiones en un archivo JSON
+
+        Args:
+            ruta_archivo: Ruta del archivo JSON del catálogo
+        """
+        directorio = os.path.dirname(ruta_archivo)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        ruta_temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump({'productos': self.productos, 'decisiones': self.decisiones},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(ruta_temporal, ruta_archivo)
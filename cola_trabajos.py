@@ -0,0 +1,518 @@
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from Boleta import (Config, cargar_y_procesar_csv, verificar_totales, calcular_estadisticas_por_responsable,
+                    generar_tablas_detalle, generar_reportes)
+from cache_boletas import calcular_hash_archivo
+
+# Etapas de cada boleta y sus dependencias (las de reportes son las de generar_reportes)
+ETAPAS_BOLETA = {
+    'carga': [],
+    'estadisticas': ['carga'],
+    'graficos': ['estadisticas'],
+    'excel': ['estadisticas', 'graficos'],
+    'html': ['estadisticas', 'graficos'],
+    'pdf': ['estadisticas', 'html', 'graficos'],
+}
+ETAPAS_REPORTES = ('graficos', 'excel', 'html', 'pdf')
+
+# Cada boleta se identifica por su archivo y el hash de su contenido: si el CSV cambia,
+# volver a encolarlo crea una serie nueva de trabajos
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS trabajos (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT NOT NULL,
+    hash_csv TEXT NOT NULL DEFAULT '',
+    etapa TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    trabajador TEXT,
+    lease_hasta REAL,
+    disponible_desde REAL NOT NULL DEFAULT 0,
+    resultado TEXT,
+    error TEXT,
+    actualizado REAL NOT NULL,
+    UNIQUE (archivo, hash_csv, etapa)
+);
+CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado, disponible_desde);
+CREATE INDEX IF NOT EXISTS trabajos_lease ON trabajos (estado, lease_hasta);
+CREATE TABLE IF NOT EXISTS dependencias (
+    etapa TEXT NOT NULL,
+    depende_de TEXT NOT NULL,
+    PRIMARY KEY (etapa, depende_de)
+);
+'''
+
+# Siguiente trabajo listo: pendiente (o con lease vencido) y sin dependencias sin completar.
+# Sin ORDER BY: se recorren los índices por estado y se detiene en el primero que sirva
+# (los pendientes salen en orden de disponible_desde y luego de id)
+CONSULTA_TRABAJO_LISTO = '''
+SELECT * FROM trabajos AS t
+WHERE ((t.estado = 'pendiente' AND t.disponible_desde <= :ahora)
+       OR (t.estado = 'en_curso' AND t.lease_hasta < :ahora AND t.intentos < :max_intentos))
+  AND NOT EXISTS (
+      SELECT 1 FROM dependencias AS d
+      WHERE d.etapa = t.etapa
+        AND NOT EXISTS (
+            SELECT 1 FROM trabajos AS previo
+            WHERE previo.archivo = t.archivo AND previo.hash_csv = t.hash_csv
+              AND previo.etapa = d.depende_de
+              AND previo.estado = 'completado'))
+LIMIT 1
+'''
+
+
+class LeasePerdido(Exception):
+    """Otro trabajador tomó el trabajo porque el lease de este venció"""
+
+
+class ColaTrabajos:
+    """
+    Cola de trabajos durable en SQLite: un trabajo por boleta y etapa.
+
+    Los trabajadores (procesos en una o varias máquinas que comparten el archivo)
+    toman trabajos con un lease que renuevan mientras trabajan. Si un trabajador
+    muere, su lease vence y otro retoma el trabajo; las etapas completadas no se
+    repiten. Un trabajo que falla se reintenta con espera creciente hasta
+    max_intentos, y entonces sus etapas dependientes quedan omitidas.
+    """
+
+    def __init__(self, ruta_db, max_intentos=3, espera_reintento=30):
+        self.ruta_db = ruta_db
+        self.max_intentos = max_intentos
+        self.espera_reintento = espera_reintento
+
+        directorio = os.path.dirname(ruta_db)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with self._conectar() as conexion:
+            self._migrar(conexion)
+            conexion.executescript(ESQUEMA)
+            # Las dependencias viven en ETAPAS_BOLETA; la tabla permite filtrarlas en SQL
+            conexion.execute('BEGIN IMMEDIATE')
+            conexion.execute('DELETE FROM dependencias')
+            conexion.executemany(
+                'INSERT INTO dependencias (etapa, depende_de) VALUES (?, ?)',
+                [(etapa, previa) for etapa, previas in ETAPAS_BOLETA.items() for previa in previas]
+            )
+            conexion.execute('COMMIT')
+
+    @staticmethod
+    def _migrar(conexion):
+        """Reconstruye la tabla de una cola creada antes de identificar las boletas por hash"""
+        # Revisar dentro de la transacción: otro proceso podría estar migrando a la vez
+        conexion.execute('BEGIN IMMEDIATE')
+        columnas = {fila['name'] for fila in conexion.execute('PRAGMA table_info(trabajos)')}
+        if not columnas or 'hash_csv' in columnas:
+            conexion.execute('COMMIT')
+            return
+        # La restricción UNIQUE no se puede cambiar con ALTER TABLE; los trabajos se conservan
+        # con hash vacío, así que volver a encolar esas boletas crea trabajos nuevos
+        conexion.execute('DROP INDEX IF EXISTS trabajos_estado')
+        conexion.execute('DROP INDEX IF EXISTS trabajos_lease')
+        conexion.execute('ALTER TABLE trabajos RENAME TO trabajos_anterior')
+        for sentencia in ESQUEMA.split(';'):
+            if sentencia.strip():
+                conexion.execute(sentencia)
+        conexion.execute('''
+            INSERT INTO trabajos (id, archivo, etapa, fecha, estado, intentos, trabajador, lease_hasta,
+                                  disponible_desde, resultado, error, actualizado)
+            SELECT id, archivo, etapa, fecha, estado, intentos, trabajador, lease_hasta,
+                   disponible_desde, resultado, error, actualizado
+            FROM trabajos_anterior
+        ''')
+        conexion.execute('DROP TABLE trabajos_anterior')
+        conexion.execute('COMMIT')
+
+    @contextmanager
+    def _conectar(self):
+        """Abre una conexión que espera (en vez de fallar) si otra tiene la base bloqueada"""
+        conexion = sqlite3.connect(self.ruta_db, timeout=60, isolation_level=None)
+        conexion.row_factory = sqlite3.Row
+        try:
+            yield conexion
+        finally:
+            conexion.close()
+
+    def encolar(self, archivos_csv, fecha=None):
+        """
+        Crea los trabajos de cada boleta. Una boleta que ya está en la cola con el mismo
+        contenido no se toca; si su CSV cambió (por ejemplo, al reprocesar cada noche), se
+        crea una serie nueva de trabajos y la anterior queda en la cola como historial.
+
+        Args:
+            archivos_csv: Nombres de los CSV (dentro de Config.DIRECTORIO_DATA)
+            fecha: Fecha para los nombres de los reportes (por defecto hoy)
+
+        Returns:
+            int: Cantidad de trabajos nuevos
+        """
+        fecha = fecha or time.strftime("%Y-%m-%d")
+        ahora = time.time()
+        filas = []
+        for archivo in archivos_csv:
+            hash_csv = calcular_hash_archivo(os.path.join(Config.DIRECTORIO_DATA, archivo))
+            filas.extend((archivo, hash_csv, etapa, fecha, ahora) for etapa in ETAPAS_BOLETA)
+        with self._conectar() as conexion:
+            antes = conexion.total_changes
+            conexion.execute('BEGIN IMMEDIATE')
+            conexion.executemany(
+                'INSERT OR IGNORE INTO trabajos (archivo, hash_csv, etapa, fecha, actualizado) VALUES (?, ?, ?, ?, ?)',
+                filas
+            )
+            conexion.execute('COMMIT')
+            return conexion.total_changes - antes
+
+    def tomar(self, trabajador, lease_segundos):
+        """
+        Toma el siguiente trabajo listo: pendiente (o con lease vencido) y con todas sus
+        dependencias completadas
+
+        Args:
+            trabajador: Identificador del trabajador
+            lease_segundos: Duración del lease
+
+        Returns:
+            dict con id, archivo, hash_csv, etapa, fecha, intentos y los resultados de sus
+            dependencias, o None si no hay trabajos listos
+        """
+        ahora = time.time()
+        with self._conectar() as conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+
+            # Un trabajo que tumba a su trabajador una y otra vez no se retoma para siempre
+            # (solo se revisan los en curso con lease vencido: a lo más uno por trabajador)
+            agotados = conexion.execute(
+                '''SELECT id, archivo, hash_csv, etapa FROM trabajos
+                   WHERE estado = 'en_curso' AND lease_hasta < ? AND intentos >= ?''',
+                (ahora, self.max_intentos)
+            ).fetchall()
+            for trabajo in agotados:
+                conexion.execute(
+                    '''UPDATE trabajos SET estado = 'fallido', error = 'Lease vencido', lease_hasta = NULL,
+                       actualizado = ? WHERE id = ?''', (ahora, trabajo['id'])
+                )
+                self._omitir_dependientes(conexion, trabajo, ahora)
+
+            trabajo = conexion.execute(
+                CONSULTA_TRABAJO_LISTO, {'ahora': ahora, 'max_intentos': self.max_intentos}
+            ).fetchone()
+            if trabajo is None:
+                conexion.execute('COMMIT')
+                return None
+
+            previos = self._resultados_dependencias(conexion, trabajo)
+            conexion.execute(
+                '''UPDATE trabajos SET estado = 'en_curso', trabajador = ?, lease_hasta = ?,
+                   intentos = intentos + 1, actualizado = ? WHERE id = ?''',
+                (trabajador, ahora + lease_segundos, ahora, trabajo['id'])
+            )
+            conexion.execute('COMMIT')
+            return {
+                'id': trabajo['id'], 'archivo': trabajo['archivo'], 'hash_csv': trabajo['hash_csv'],
+                'etapa': trabajo['etapa'], 'fecha': trabajo['fecha'], 'intentos': trabajo['intentos'] + 1, 'previos': previos,
+            }
+
+    @staticmethod
+    def _resultados_dependencias(conexion, trabajo):
+        """Resultados de las dependencias (ya completadas) de un trabajo listo"""
+        dependencias = ETAPAS_BOLETA[trabajo['etapa']]
+        if not dependencias:
+            return {}
+        filas = conexion.execute(
+            f'''SELECT etapa, resultado FROM trabajos
+                WHERE archivo = ? AND hash_csv = ? AND etapa IN ({', '.join('?' * len(dependencias))})''',
+            (trabajo['archivo'], trabajo['hash_csv'], *dependencias)
+        ).fetchall()
+        return {f['etapa']: json.loads(f['resultado']) for f in filas}
+
+    def renovar(self, id_trabajo, trabajador, lease_segundos):
+        """
+        Extiende el lease de un trabajo en curso
+
+        Returns:
+            bool: False si el trabajo ya no pertenece a este trabajador
+        """
+        with self._conectar() as conexion:
+            cursor = conexion.execute(
+                '''UPDATE trabajos SET lease_hasta = ? WHERE id = ? AND trabajador = ? AND estado = 'en_curso' ''',
+                (time.time() + lease_segundos, id_trabajo, trabajador)
+            )
+            return cursor.rowcount == 1
+
+    def completar(self, id_trabajo, trabajador, resultado):
+        """
+        Marca un trabajo como completado con su resultado (serializable en JSON)
+
+        Raises:
+            LeasePerdido: Si otro trabajador tomó el trabajo mientras tanto
+        """
+        with self._conectar() as conexion:
+            cursor = conexion.execute(
+                '''UPDATE trabajos SET estado = 'completado', resultado = ?, error = NULL, lease_hasta = NULL,
+                   actualizado = ? WHERE id = ? AND trabajador = ? AND estado = 'en_curso' ''',
+                (json.dumps(resultado, ensure_ascii=False), time.time(), id_trabajo, trabajador)
+            )
+            if cursor.rowcount != 1:
+                raise LeasePerdido(f"El trabajo {id_trabajo} ya no pertenece a {trabajador}")
+
+    def fallar(self, id_trabajo, trabajador, error):
+        """
+        Registra un fallo: el trabajo vuelve a la cola con espera creciente o, si agotó
+        sus intentos, queda fallido y sus etapas dependientes omitidas
+
+        Returns:
+            str: Nuevo estado del trabajo ('pendiente' o 'fallido')
+        """
+        ahora = time.time()
+        with self._conectar() as conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            trabajo = conexion.execute(
+                "SELECT * FROM trabajos WHERE id = ? AND trabajador = ? AND estado = 'en_curso'",
+                (id_trabajo, trabajador)
+            ).fetchone()
+            if trabajo is None:
+                conexion.execute('COMMIT')
+                raise LeasePerdido(f"El trabajo {id_trabajo} ya no pertenece a {trabajador}")
+
+            if trabajo['intentos'] < self.max_intentos:
+                estado = 'pendiente'
+                espera = self.espera_reintento * 2 ** (trabajo['intentos'] - 1)
+            else:
+                estado, espera = 'fallido', 0
+            conexion.execute(
+                '''UPDATE trabajos SET estado = ?, error = ?, lease_hasta = NULL, disponible_desde = ?,
+                   actualizado = ? WHERE id = ?''',
+                (estado, str(error), ahora + espera, ahora, id_trabajo)
+            )
+            if estado == 'fallido':
+                self._omitir_dependientes(conexion, trabajo, ahora)
+            conexion.execute('COMMIT')
+            return estado
+
+    @staticmethod
+    def _omitir_dependientes(conexion, trabajo, ahora):
+        """Marca como omitidas todas las etapas que dependen (directa o indirectamente) de una fallida"""
+        etapa = trabajo['etapa']
+        omitidas = {etapa}
+        hubo_cambios = True
+        while hubo_cambios:
+            hubo_cambios = False
+            for nombre, dependencias in ETAPAS_BOLETA.items():
+                if nombre not in omitidas and omitidas.intersection(dependencias):
+                    omitidas.add(nombre)
+                    hubo_cambios = True
+        omitidas.discard(etapa)
+        for nombre in omitidas:
+            conexion.execute(
+                '''UPDATE trabajos SET estado = 'omitido', error = ?, actualizado = ?
+                   WHERE archivo = ? AND hash_csv = ? AND etapa = ? AND estado = 'pendiente' ''',
+                (f"Falló la etapa previa: {etapa}", ahora, trabajo['archivo'], trabajo['hash_csv'], nombre)
+            )
+
+    def reintentar_fallidos(self):
+        """
+        Devuelve a la cola los trabajos fallidos y omitidos, con sus intentos en cero
+
+        Returns:
+            int: Cantidad de trabajos reactivados
+        """
+        with self._conectar() as conexion:
+            cursor = conexion.execute(
+                '''UPDATE trabajos SET estado = 'pendiente', intentos = 0, disponible_desde = 0, actualizado = ?
+                   WHERE estado IN ('fallido', 'omitido')''', (time.time(),)
+            )
+            return cursor.rowcount
+
+    def hay_trabajo_pendiente(self):
+        """
+        Returns:
+            bool: True si quedan trabajos pendientes o en curso
+        """
+        with self._conectar() as conexion:
+            fila = conexion.execute(
+                "SELECT COUNT(*) FROM trabajos WHERE estado IN ('pendiente', 'en_curso')"
+            ).fetchone()
+            return fila[0] > 0
+
+    def estado(self):
+        """
+        Returns:
+            DataFrame con una fila por trabajo
+        """
+        with self._conectar() as conexion:
+            return pd.read_sql_query(
+                '''SELECT archivo, substr(hash_csv, 1, 8) AS version, etapa, estado, intentos, trabajador, error
+                   FROM trabajos ORDER BY archivo, id''', conexion
+            )
+
+
+def _ruta_intermedia(trabajo):
+    """Ruta del resultado intermedio (carga o estadísticas) de una boleta"""
+    nombre = f"{Path(trabajo['archivo']).stem}.{trabajo['hash_csv'][:12]}.{trabajo['etapa']}.pkl"
+    return os.path.join(Config.DIRECTORIO_CACHE, 'trabajos', nombre)
+
+
+def _guardar_intermedio(objeto, ruta):
+    """Guarda un resultado intermedio de forma atómica (un crash no deja archivos a medias)"""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    ruta_temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pd.to_pickle(objeto, ruta_temporal)
+    os.replace(ruta_temporal, ruta)
+
+
+def ejecutar_trabajo(trabajo):
+    """
+    Ejecuta una etapa de una boleta sobre las funciones del pipeline
+
+    Args:
+        trabajo: Dict retornado por ColaTrabajos.tomar
+
+    Returns:
+        Resultado serializable en JSON (rutas generadas)
+    """
+    archivo, etapa, previos = trabajo['archivo'], trabajo['etapa'], trabajo['previos']
+
+    if etapa == 'carga':
+        ruta = _ruta_intermedia(trabajo)
+        _guardar_intermedio(cargar_y_procesar_csv(archivo), ruta)
+        return ruta
+
+    if etapa == 'estadisticas':
+        df, total_cuenta, total_con_propina = pd.read_pickle(previos['carga'])
+        if not verificar_totales(df, total_cuenta, total_con_propina):
+            print(f"⚠️  Los totales de {archivo} no cuadran")
+        stats_responsables = calcular_estadisticas_por_responsable(df, total_cuenta)
+        tabla_productos, tabla_precios = generar_tablas_detalle(df, stats_responsables)
+        ruta = _ruta_intermedia(trabajo)
+        _guardar_intermedio(
+            (stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina), ruta
+        )
+        return ruta
+
+    stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina = \
+        pd.read_pickle(previos['estadisticas'])
+    # Un Excel por boleta: con 'unico' todos los trabajadores sobrescribirían el mismo archivo
+    resultados, errores = generar_reportes(
+        stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina, archivo,
+        solo_etapas=[etapa],
+        resultados_previos={e: previos[e] for e in ETAPAS_REPORTES if e in previos},
+        fecha=trabajo['fecha'],
+        modo_excel='por_boleta'
+    )
+    if etapa in errores:
+        raise errores[etapa]
+    return resultados[etapa]
+
+
+def procesar_cola(cola, trabajador=None, lease_segundos=300, espera_vacia=5, max_trabajos=None):
+    """
+    Toma y ejecuta trabajos hasta que la cola quede vacía
+
+    Args:
+        cola: ColaTrabajos
+        trabajador: Identificador (por defecto <host>:<pid>)
+        lease_segundos: Duración del lease; se renueva cada tercio mientras el trabajo corre
+        espera_vacia: Segundos entre consultas cuando solo quedan trabajos de otros trabajadores
+        max_trabajos: Máximo de trabajos a ejecutar (por defecto sin límite)
+
+    Returns:
+        Tuple de (completados, fallidos) por este trabajador
+    """
+    trabajador = trabajador or f"{socket.gethostname()}:{os.getpid()}"
+    completados = fallidos = 0
+
+    while max_trabajos is None or completados + fallidos < max_trabajos:
+        trabajo = cola.tomar(trabajador, lease_segundos)
+        if trabajo is None:
+            if not cola.hay_trabajo_pendiente():
+                break
+            # Quedan trabajos de otros trabajadores o esperando un reintento
+            time.sleep(espera_vacia)
+            continue
+
+        # Renovar el lease en segundo plano mientras la etapa corre
+        detener = threading.Event()
+
+        def renovar_lease():
+            while not detener.wait(lease_segundos / 3):
+                if not cola.renovar(trabajo['id'], trabajador, lease_segundos):
+                    break
+
+        renovador = threading.Thread(target=renovar_lease, daemon=True)
+        renovador.start()
+        print(f"▶️  {trabajador}: {trabajo['archivo']} / {trabajo['etapa']} (intento {trabajo['intentos']})")
+        try:
+            resultado = ejecutar_trabajo(trabajo)
+        except Exception as e:
+            try:
+                estado = cola.fallar(trabajo['id'], trabajador, e)
+                print(f"❌ {trabajo['archivo']} / {trabajo['etapa']}: {e} ({estado})")
+            except LeasePerdido as perdido:
+                print(f"⚠️  {perdido}")
+            fallidos += 1
+            continue
+        finally:
+            detener.set()
+            renovador.join()
+
+        try:
+            cola.completar(trabajo['id'], trabajador, resultado)
+            completados += 1
+        except LeasePerdido as perdido:
+            print(f"⚠️  {perdido}")
+
+    return completados, fallidos
+
+
+def main(argumentos=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description='Cola durable para reprocesar boletas por etapas')
+    parser.add_argument('--db', default=os.path.join(Config.DIRECTORIO_CACHE, 'cola_trabajos.db'),
+                        help='Archivo SQLite de la cola')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    encolar = subparsers.add_parser('encolar', help='Agregar boletas a la cola')
+    encolar.add_argument('archivos', nargs='*', help='CSV dentro de la carpeta data (por defecto todos)')
+    encolar.add_argument('--fecha', help='Fecha para los nombres de los reportes (YYYY-MM-DD)')
+
+    trabajar = subparsers.add_parser('trabajar', help='Procesar trabajos hasta vaciar la cola')
+    trabajar.add_argument('--lease', type=int, default=300, help='Duración del lease en segundos')
+    trabajar.add_argument('--intentos', type=int, default=3, help='Máximo de intentos por trabajo')
+    trabajar.add_argument('--max-trabajos', type=int, default=None, help='Terminar después de N trabajos')
+
+    subparsers.add_parser('estado', help='Mostrar el estado de los trabajos')
+    subparsers.add_parser('reintentar', help='Volver a encolar los trabajos fallidos')
+    args = parser.parse_args(argumentos)
+
+    cola = ColaTrabajos(args.db, max_intentos=getattr(args, 'intentos', 3))
+
+    if args.comando == 'encolar':
+        archivos = args.archivos or sorted(p.name for p in Path(Config.DIRECTORIO_DATA).glob('*.csv'))
+        print(f"{cola.encolar(archivos, args.fecha)} trabajos nuevos")
+    elif args.comando == 'trabajar':
+        completados, fallidos = procesar_cola(cola, lease_segundos=args.lease, max_trabajos=args.max_trabajos)
+        print(f"{completados} trabajos completados, {fallidos} con error")
+        return 1 if fallidos else 0
+    elif args.comando == 'reintentar':
+        print(f"{cola.reintentar_fallidos()} trabajos reactivados")
+    else:
+        estado = cola.estado()
+        print(estado.to_string(index=False))
+        print(estado['estado'].value_counts().to_string(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import os
+import sys
+import glob
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from Boleta import Config
+
+# Tolerancia para diferencias por redondeo (igual que verificar_totales)
+TOLERANCIA = 0.01
+
+
+def cargar_boletas_directorio(directorio):
+    """
+    Lee todos los CSV de un directorio en un solo DataFrame largo
+
+    Args:
+        directorio: Carpeta con los CSV de boletas
+
+    Returns:
+        Tuple de (df_boletas, errores) donde df_boletas tiene una columna 'Boleta'
+        y errores es un dict {boleta: mensaje} de archivos que no se pudieron leer
+    """
+    frames = []
+    errores = {}
+    for ruta_csv in sorted(glob.glob(os.path.join(directorio, '*.csv'))):
+        nombre = Path(ruta_csv).name
+        try:
+            df = pd.read_csv(ruta_csv, decimal=',', thousands='.', usecols=['Producto', 'Total'])
+        except (ValueError, pd.errors.ParserError) as e:
+            errores[nombre] = str(e)
+            continue
+        df.insert(0, 'Boleta', nombre)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=['Boleta', 'Producto', 'Total']), errores
+    return pd.concat(frames, ignore_index=True), errores
+
+
+def conciliar_boletas(df_boletas, propina_porcentaje):
+    """
+    Compara en una sola pasada vectorizada la suma de productos de cada boleta
+    con sus totales 'General Mesa' y 'c/propina'
+
+    Args:
+        df_boletas: DataFrame largo de cargar_boletas_directorio
+        propina_porcentaje: Porcentaje de propina aplicado
+
+    Returns:
+        DataFrame con una fila por boleta y sus diferencias
+    """
+    # Las últimas 4 filas de cada boleta son el resumen
+    es_resumen = df_boletas.groupby('Boleta', sort=False).cumcount(ascending=False) < 4
+    total = pd.to_numeric(df_boletas['Total'], errors='coerce')
+
+    suma_productos = total[~es_resumen].groupby(df_boletas['Boleta'][~es_resumen]).sum()
+    resumen = df_boletas[es_resumen].assign(Total=total[es_resumen])
+    general_mesa = resumen[resumen['Producto'] == 'General Mesa'].groupby('Boleta')['Total'].first()
+    con_propina = resumen[resumen['Producto'] == 'c/propina'].groupby('Boleta')['Total'].first()
+
+    boletas = pd.Index(df_boletas['Boleta'].unique(), name='Boleta')
+    conciliacion = pd.DataFrame({
+        'Suma_Productos': suma_productos.reindex(boletas, fill_value=0),
+        'General_Mesa': general_mesa.reindex(boletas),
+        'Total_con_Propina': con_propina.reindex(boletas),
+    })
+    conciliacion['Diferencia_Total'] = conciliacion['General_Mesa'] - conciliacion['Suma_Productos']
+    calculado = conciliacion['Suma_Productos'] * (1 + propina_porcentaje / 100)
+    conciliacion['Calculado_con_Propina'] = calculado.round(2)
+    # Sumar 0.0 evita mostrar -0.0 cuando la diferencia es solo de redondeo
+    conciliacion['Diferencia_con_Propina'] = (conciliacion['Total_con_Propina'] - calculado).round(2) + 0.0
+    conciliacion['Error'] = np.where(
+        conciliacion['General_Mesa'].isna() | conciliacion['Total_con_Propina'].isna(),
+        'Faltan filas de resumen', ''
+    )
+    conciliacion['OK'] = (
+        (conciliacion['Error'] == '')
+        & (conciliacion['Diferencia_Total'].abs() <= TOLERANCIA)
+        & (conciliacion['Diferencia_con_Propina'].abs() <= TOLERANCIA)
+    )
+    return conciliacion.reset_index()
+
+
+def conciliar_directorio(directorio, propina_porcentaje=None):
+    """
+    Concilia todas las boletas de un directorio
+
+    Args:
+        directorio: Carpeta con los CSV de boletas
+        propina_porcentaje: Porcentaje de propina (por defecto Config.PROPINA_PORCENTAJE)
+
+    Returns:
+        DataFrame con una fila por boleta, incluidas las que no se pudieron leer
+    """
+    if propina_porcentaje is None:
+        propina_porcentaje = Config.PROPINA_PORCENTAJE
+
+    df_boletas, errores = cargar_boletas_directorio(directorio)
+    conciliacion = conciliar_boletas(df_boletas, propina_porcentaje)
+
+    if errores:
+        filas_error = pd.DataFrame({
+            'Boleta': list(errores.keys()),
+            'Error': list(errores.values()),
+            'OK': False,
+        })
+        conciliacion = pd.concat([conciliacion, filas_error], ignore_index=True)
+
+    return conciliacion
+
+
+def main(argumentos=None):
+    """Punto de entrada de línea de comandos; retorna 1 si alguna boleta no cuadra"""
+    parser = argparse.ArgumentParser(description='Concilia los totales de todas las boletas de un directorio')
+    parser.add_argument('directorio', nargs='?', default=Config.DIRECTORIO_DATA, help='Carpeta con los CSV')
+    parser.add_argument('--salida', help='Archivo de salida (por defecto stdout)')
+    parser.add_argument('--formato', choices=['csv', 'json'], default='csv', help='Formato de salida')
+    parser.add_argument('--solo-errores', action='store_true', help='Incluir solo boletas que no cuadran')
+    parser.add_argument('--propina', type=float, default=None, help='Porcentaje de propina')
+    args = parser.parse_args(argumentos)
+
+    conciliacion = conciliar_directorio(args.directorio, args.propina)
+    fallidas = conciliacion[~conciliacion['OK']]
+    resultado = fallidas if args.solo_errores else conciliacion
+
+    destino = args.salida or sys.stdout
+    if args.formato == 'json':
+        resultado.to_json(destino, orient='records', force_ascii=False, indent=2)
+    else:
+        resultado.to_csv(destino, index=False)
+
+    print(f"{len(conciliacion)} boletas revisadas, {len(fallidas)} con diferencias", file=sys.stderr)
+    return 1 if len(fallidas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import sys
+import argparse
+from contextlib import redirect_stdout
+
+# Solo la parte de cálculo: Boleta no importa gráficos ni Playwright hasta que se generan reportes
+from Boleta import procesar_boleta_csv, verificar_totales, calcular_estadisticas_por_responsable
+
+
+def dividir_boleta(origen, propina_porcentaje=None):
+    """
+    Calcula cuánto le corresponde pagar a cada responsable de una boleta
+
+    Args:
+        origen: Ruta del CSV o archivo abierto (ej. sys.stdin)
+        propina_porcentaje: Porcentaje de propina (por defecto Config.PROPINA_PORCENTAJE)
+
+    Returns:
+        Tuple de (stats_responsables, cuadra) donde cuadra indica si los totales coinciden
+    """
+    df, total_cuenta, total_con_propina = procesar_boleta_csv(origen)
+
+    # Las advertencias van a stderr para no mezclarse con la salida
+    with redirect_stdout(sys.stderr):
+        cuadra = verificar_totales(df, total_cuenta, total_con_propina, propina_porcentaje)
+
+    stats_responsables = calcular_estadisticas_por_responsable(df, total_cuenta,
+                                                               propina_porcentaje=propina_porcentaje)
+    return stats_responsables, cuadra
+
+
+def main(argumentos=None):
+    """Punto de entrada de línea de comandos; retorna 1 si los totales no cuadran"""
+    parser = argparse.ArgumentParser(description='Divide una boleta entre sus responsables')
+    parser.add_argument('archivo', nargs='?', default='-', help='CSV de la boleta (por defecto stdin)')
+    parser.add_argument('--formato', choices=['json', 'csv'], default='json', help='Formato de salida')
+    parser.add_argument('--propina', type=float, default=None, help='Porcentaje de propina')
+    args = parser.parse_args(argumentos)
+
+    origen = sys.stdin if args.archivo == '-' else args.archivo
+    stats_responsables, cuadra = dividir_boleta(origen, args.propina)
+
+    if args.formato == 'json':
+        stats_responsables.to_json(sys.stdout, orient='records', force_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        stats_responsables.to_csv(sys.stdout, index=False)
+
+    return 0 if cuadra else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
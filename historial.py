@@ -0,0 +1,180 @@
+import os
+import json
+from collections import Counter
+
+
+class AgregadosPersonas:
+    """
+    Estadísticas acumuladas por persona sobre todas las boletas procesadas.
+
+    Se actualizan de forma incremental con cada boleta nueva (costo proporcional
+    a sus asignaciones) y se leen en tiempo constante. Cada boleta se registra
+    una sola vez, identificada por su id, y se recuerda la fecha con que se registró.
+    """
+
+    def __init__(self):
+        self.boletas = {}       # id de boleta → fecha con que se registró
+        self.personas = {}
+
+    def _persona(self, nombre):
+        """Obtiene (o crea) el registro acumulado de una persona"""
+        registro = self.personas.get(nombre)
+        if registro is None:
+            registro = {
+                'total_gastado': 0.0,
+                'total_con_propina': 0.0,
+                'cantidad_items': 0,
+                'cantidad_boletas': 0,
+                'productos': Counter(),
+                'favorito': None,
+                'gasto_por_fecha': {},
+            }
+            self.personas[nombre] = registro
+        return registro
+
+    def registrar_boleta(self, id_boleta, boleta, propina_porcentaje, fecha):
+        """
+        Suma una boleta a los agregados. Si la boleta ya estaba registrada no hace nada.
+
+        Args:
+            id_boleta: Identificador único de la boleta (ej. nombre del CSV)
+            boleta: BoletaCompacta con las asignaciones
+            propina_porcentaje: Porcentaje de propina aplicado
+            fecha: Fecha de la boleta (str YYYY-MM-DD)
+
+        Returns:
+            bool: True si la boleta se registró, False si ya estaba
+        """
+        if id_boleta in self.boletas:
+            return False
+        self.boletas[id_boleta] = fecha
+
+        factor = 1 + propina_porcentaje / 100
+        items = boleta.item_por_asignacion()
+        montos = boleta.monto_por_asignacion()
+        personas_boleta = set()
+
+        for persona_id, item, monto in zip(boleta.persona_ids, items, montos):
+            nombre = boleta.personas.nombres[persona_id]
+            producto = boleta.productos.nombres[boleta.producto_ids[item]]
+            registro = self._persona(nombre)
+            registro['total_gastado'] += float(monto)
+            registro['total_con_propina'] += float(monto) * factor
+            registro['cantidad_items'] += 1
+            registro['gasto_por_fecha'][fecha] = registro['gasto_por_fecha'].get(fecha, 0.0) + float(monto) * factor
+
+            # Mantener el producto favorito al día sin recorrer todo el Counter
+            registro['productos'][producto] += 1
+            favorito = registro['favorito']
+            if favorito is None or registro['productos'][producto] > registro['productos'][favorito]:
+                registro['favorito'] = producto
+
+            if nombre not in personas_boleta:
+                personas_boleta.add(nombre)
+                registro['cantidad_boletas'] += 1
+
+        return True
+
+    def obtener(self, nombre):
+        """
+        Obtiene las estadísticas acumuladas de una persona
+
+        Args:
+            nombre: Nombre de la persona
+
+        Returns:
+            dict con total_gastado, total_con_propina, cantidad_items, cantidad_boletas,
+            promedio_por_item y producto_favorito, o None si la persona no existe
+        """
+        registro = self.personas.get(nombre)
+        if registro is None:
+            return None
+        return {
+            'total_gastado': round(registro['total_gastado']),
+            'total_con_propina': round(registro['total_con_propina']),
+            'cantidad_items': registro['cantidad_items'],
+            'cantidad_boletas': registro['cantidad_boletas'],
+            'promedio_por_item': registro['total_con_propina'] / registro['cantidad_items'],
+            'producto_favorito': registro['favorito'],
+        }
+
+    def mas_pedidos(self, nombre, cantidad=5):
+        """
+        Args:
+            nombre: Nombre de la persona
+            cantidad: Cantidad de productos a retornar
+
+        Returns:
+            list: Tuplas (producto, veces) de los productos más pedidos
+        """
+        registro = self.personas.get(nombre)
+        return registro['productos'].most_common(cantidad) if registro else []
+
+    def gasto_por_fecha(self, nombre):
+        """
+        Args:
+            nombre: Nombre de la persona
+
+        Returns:
+            dict: {fecha: gasto con propina} ordenado por fecha
+        """
+        registro = self.personas.get(nombre)
+        if registro is None:
+            return {}
+        return dict(sorted(registro['gasto_por_fecha'].items()))
+
+    def fecha_boleta(self, id_boleta):
+        """
+        Args:
+            id_boleta: Identificador de la boleta
+
+        Returns:
+            str: Fecha con que se registró la boleta, o None si no está registrada
+        """
+        return self.boletas.get(id_boleta)
+
+    def limpiar(self):
+        """Borra todos los agregados (para reconstruirlos desde cero)"""
+        self.boletas.clear()
+        self.personas.clear()
+
+    @classmethod
+    def cargar(cls, ruta_archivo):
+        """
+        Carga los agregados desde un archivo JSON
+
+        Args:
+            ruta_archivo: Ruta del archivo JSON
+
+        Returns:
+            AgregadosPersonas (vacío si el archivo no existe)
+        """
+        agregados = cls()
+        if not os.path.exists(ruta_archivo):
+            return agregados
+
+        with open(ruta_archivo, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        # Los archivos antiguos guardaban solo la lista de ids, sin fecha
+        boletas = datos['boletas']
+        agregados.boletas = dict(boletas) if isinstance(boletas, dict) else dict.fromkeys(boletas)
+        for nombre, registro in datos['personas'].items():
+            registro['productos'] = Counter(registro['productos'])
+            agregados.personas[nombre] = registro
+        return agregados
+
+    def guardar(self, ruta_archivo):
+        """
+        Guarda los agregados en un archivo JSON
+
+        Args:
+            ruta_archivo: Ruta del archivo JSON
+        """
+        directorio = os.path.dirname(ruta_archivo)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        ruta_temporal = f"{ruta_archivo}.{os.getpid()}.tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump({'boletas': dict(sorted(self.boletas.items())), 'personas': self.personas}, f, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta_archivo)
@@ -0,0 +1,372 @@
+import os
+import sys
+import json
+import argparse
+import threading
+from datetime import datetime
+
+from Boleta import Config
+from boleta_compacta import bloquear_archivo
+
+# Manifiesto en JSON Lines: cada reporte nuevo agrega una línea, sin releer ni reescribir el archivo
+ARCHIVO_MANIFIESTO = 'indice.jsonl'
+# Las mismas líneas como llamadas JS, para que la página funcione desde el disco (sin fetch);
+# cada una entrega su JSON como texto, así una línea inválida se omite sin afectar a las demás
+ARCHIVO_DATOS_INDICE = 'indice.js'
+LINEA_DATOS_INDICE = "agregarLinea({});\n"
+ARCHIVO_PAGINA_INDICE = 'index.html'
+
+# Filas visibles a la vez en la página (el resto se alcanza filtrando)
+MAXIMO_FILAS_INDICE = 500
+
+PAGINA_INDICE = f'''<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Índice de Reportes</title>
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            background: #f5f5f7;
+            color: #333;
+            margin: 0;
+            padding: 30px;
+        }}
+        h1 {{ color: #6324b5; margin: 0 0 20px; }}
+        .filtros {{ display: flex; gap: 12px; align-items: center; margin-bottom: 16px; }}
+        .filtros input {{ padding: 8px 12px; border: 1px solid #ccc; border-radius: 8px; min-width: 260px; }}
+        .resumen {{ color: #666; font-size: 0.9em; }}
+        table {{ width: 100%; border-collapse: collapse; background: white; border-radius: 12px; overflow: hidden; }}
+        th {{ background: #6324b5; color: white; text-align: left; padding: 10px 14px; }}
+        td {{ padding: 8px 14px; border-bottom: 1px solid #eee; }}
+        td.numero {{ text-align: right; }}
+        a {{ color: #6324b5; margin-right: 10px; }}
+    </style>
+</head>
+<body>
+    <h1>📁 Índice de Reportes</h1>
+    <div class="filtros">
+        <input id="filtro" type="search" placeholder="Filtrar por boleta o fecha (ej. 2026-01)">
+        <span class="resumen" id="resumen"></span>
+    </div>
+    <table>
+        <thead>
+            <tr><th>Fecha</th><th>Boleta</th><th>Personas</th><th>Total</th><th>Archivos</th></tr>
+        </thead>
+        <tbody id="filas"></tbody>
+    </table>
+
+    <script>
+        // Una entrada por boleta y fecha; las líneas posteriores completan o reemplazan a las anteriores
+        const reportes = new Map();
+        let lineasOmitidas = 0;
+
+        function agregarReporte(entrada) {{
+            if (!entrada || typeof entrada.boleta !== 'string' || typeof entrada.fecha !== 'string') {{
+                lineasOmitidas++;
+                return;
+            }}
+            const artefactos = entrada.artefactos && typeof entrada.artefactos === 'object' ? entrada.artefactos : {{}};
+            const clave = `${{entrada.boleta}}|${{entrada.fecha}}`;
+            const anterior = reportes.get(clave) || {{ artefactos: {{}} }};
+            reportes.set(clave, {{
+                ...anterior,
+                ...entrada,
+                artefactos: {{ ...anterior.artefactos, ...artefactos }}
+            }});
+        }}
+
+        // Cada línea se parsea por separado: una línea dañada no impide leer las demás
+        function agregarLinea(texto) {{
+            let entrada;
+            try {{
+                entrada = JSON.parse(texto);
+            }} catch (error) {{
+                lineasOmitidas++;
+                return;
+            }}
+            agregarReporte(entrada);
+        }}
+
+        function formatoPesos(valor) {{
+            return '$' + Math.round(valor).toLocaleString('es-CL');
+        }}
+
+        function celda(fila, texto, clase) {{
+            const td = fila.insertCell();
+            td.textContent = texto;
+            if (clase) td.className = clase;
+            return td;
+        }}
+
+        function renderizar() {{
+            const filtro = document.getElementById('filtro').value.trim().toLowerCase();
+            const visibles = [...reportes.values()]
+                .filter(r => !filtro || r.boleta.toLowerCase().includes(filtro) || r.fecha.includes(filtro))
+                .sort((a, b) => b.fecha.localeCompare(a.fecha) || a.boleta.localeCompare(b.boleta));
+
+            const cuerpo = document.getElementById('filas');
+            cuerpo.replaceChildren();
+            for (const r of visibles.slice(0, {MAXIMO_FILAS_INDICE})) {{
+                const fila = cuerpo.insertRow();
+                celda(fila, r.fecha);
+                celda(fila, r.boleta);
+                celda(fila, r.personas, 'numero');
+                celda(fila, formatoPesos(r.total), 'numero');
+                const archivos = celda(fila, '');
+                for (const [tipo, ruta] of Object.entries(r.artefactos)) {{
+                    const enlace = document.createElement('a');
+                    enlace.href = ruta;
+                    enlace.textContent = tipo.toUpperCase();
+                    archivos.appendChild(enlace);
+                }}
+            }}
+            document.getElementById('resumen').textContent =
+                `${{Math.min(visibles.length, {MAXIMO_FILAS_INDICE})}} de ${{visibles.length}} reportes` +
+                (filtro ? ` (${{reportes.size}} en total)` : '') +
+                (lineasOmitidas ? ` · ${{lineasOmitidas}} líneas dañadas omitidas` : '');
+        }}
+
+        // Servida por HTTP, la página puede leer el manifiesto línea por línea
+        async function cargarManifiesto() {{
+            const respuesta = await fetch('{ARCHIVO_MANIFIESTO}');
+            if (!respuesta.ok) throw new Error(`HTTP ${{respuesta.status}}`);
+            for (const linea of (await respuesta.text()).split('\\n')) {{
+                if (linea.trim()) agregarLinea(linea);
+            }}
+        }}
+
+        // Una línea a medias en indice.js (proceso interrumpido) impide ejecutarlo completo;
+        // el próximo reporte registrado la quita
+        let datosDanados = false;
+        window.addEventListener('error', evento => {{
+            if (evento.filename && evento.filename.endsWith('{ARCHIVO_DATOS_INDICE}')) datosDanados = true;
+        }});
+    </script>
+    <script src="{ARCHIVO_DATOS_INDICE}"></script>
+    <script>
+        document.getElementById('filtro').addEventListener('input', renderizar);
+        if (!datosDanados) {{
+            renderizar();
+        }} else {{
+            reportes.clear();
+            lineasOmitidas = 0;
+            cargarManifiesto().then(renderizar).catch(() => {{
+                document.getElementById('resumen').textContent =
+                    'El índice tiene una línea incompleta: se quitará al registrar el próximo reporte ' +
+                    'o con "python indice_reportes.py compactar"';
+            }});
+        }}
+    </script>
+</body>
+</html>
+'''
+
+
+def ruta_particion(fecha, formato=None):
+    """
+    Subdirectorio de los reportes de una fecha
+
+    Args:
+        fecha: Fecha del reporte en formato YYYY-MM-DD
+        formato: Patrón de strftime (por defecto Config.PARTICION_REPORTES; None o '' para
+                 no particionar)
+
+    Returns:
+        str: Ruta relativa (ej. '2026/01/15') o '' si no se particiona
+    """
+    formato = Config.PARTICION_REPORTES if formato is None else formato
+    if not formato:
+        return ''
+    return os.path.normpath(datetime.strptime(fecha, "%Y-%m-%d").strftime(formato))
+
+
+def _fin_ultima_linea(descriptor, tamano, bloque=4096):
+    """Posición justo después del último salto de línea del archivo (0 si no tiene)"""
+    fin = tamano
+    while fin > 0:
+        inicio = max(0, fin - bloque)
+        os.lseek(descriptor, inicio, os.SEEK_SET)
+        posicion = os.read(descriptor, fin - inicio).rfind(b'\n')
+        if posicion >= 0:
+            return inicio + posicion + 1
+        fin = inicio
+    return 0
+
+
+def _agregar_linea(ruta, linea):
+    """
+    Agrega una línea al final de un archivo, bloqueándolo para que varios procesos puedan
+    registrar reportes a la vez sin mezclar líneas. Si la última línea quedó a medias
+    (proceso interrumpido), se descarta antes de escribir: así indice.js nunca acumula
+    líneas que impidan ejecutarlo.
+    """
+    with bloquear_archivo(ruta):
+        descriptor = os.open(ruta, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            tamano = os.fstat(descriptor).st_size
+            fin = _fin_ultima_linea(descriptor, tamano) if tamano else 0
+            if fin < tamano:
+                os.ftruncate(descriptor, fin)
+            os.lseek(descriptor, fin, os.SEEK_SET)
+            datos = linea.encode('utf-8')
+            while datos:
+                datos = datos[os.write(descriptor, datos):]
+        finally:
+            os.close(descriptor)
+
+
+def generar_pagina_indice(directorio=None):
+    """
+    Escribe la página del índice si no existe o si cambió su plantilla.
+    La página no contiene reportes: los lee de indice.js, así que no se reescribe por cada uno.
+
+    Args:
+        directorio: Carpeta de reportes (por defecto Config.DIRECTORIO_REPORTES)
+
+    Returns:
+        str: Ruta de la página
+    """
+    directorio = directorio or Config.DIRECTORIO_REPORTES
+    ruta_pagina = os.path.join(directorio, ARCHIVO_PAGINA_INDICE)
+    if os.path.exists(ruta_pagina):
+        with open(ruta_pagina, encoding='utf-8') as f:
+            if f.read() == PAGINA_INDICE:
+                return ruta_pagina
+
+    os.makedirs(directorio, exist_ok=True)
+    # Escribir a un temporal y renombrar: varios procesos pueden crear la página a la vez
+    ruta_temporal = f"{ruta_pagina}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as f:
+        f.write(PAGINA_INDICE)
+    os.replace(ruta_temporal, ruta_pagina)
+    return ruta_pagina
+
+
+def registrar_reporte(boleta, fecha, total, personas, artefactos, directorio=None):
+    """
+    Agrega un reporte al índice en O(1): una línea al manifiesto y otra a los datos de la
+    página, sin leer las entradas anteriores (solo el final de cada archivo). Registrar de
+    nuevo la misma boleta y fecha completa o reemplaza la entrada anterior (ej. el PDF
+    generado en otro trabajo).
+
+    Args:
+        boleta: Nombre de la boleta (nombre del CSV sin extensión)
+        fecha: Fecha del reporte (YYYY-MM-DD)
+        total: Total con propina
+        personas: Cantidad de responsables
+        artefactos: Dict {tipo: ruta} de los archivos generados ('html', 'pdf', 'excel');
+                    las rutas dentro del directorio quedan relativas a él
+        directorio: Carpeta de reportes (por defecto Config.DIRECTORIO_REPORTES)
+
+    Returns:
+        dict: Entrada registrada
+    """
+    directorio = directorio or Config.DIRECTORIO_REPORTES
+    generar_pagina_indice(directorio)
+
+    def relativa(ruta):
+        # El shell compartido se registra con su ?datos=
+        ruta, separador, consulta = ruta.partition('?')
+        ruta = os.path.relpath(ruta, directorio).replace(os.sep, '/')
+        return ruta + separador + consulta
+
+    entrada = {
+        'boleta': boleta,
+        'fecha': fecha,
+        'total': int(round(total)),
+        'personas': int(personas),
+        'artefactos': {tipo: relativa(ruta) for tipo, ruta in artefactos.items() if ruta},
+        'generado': datetime.now().isoformat(timespec='seconds'),
+    }
+    linea = json.dumps(entrada, ensure_ascii=False)
+    _agregar_linea(os.path.join(directorio, ARCHIVO_MANIFIESTO), linea + '\n')
+    _agregar_linea(os.path.join(directorio, ARCHIVO_DATOS_INDICE), LINEA_DATOS_INDICE.format(json.dumps(linea)))
+    return entrada
+
+
+def leer_indice(directorio=None):
+    """
+    Lee el manifiesto combinando las entradas de una misma boleta y fecha
+
+    Args:
+        directorio: Carpeta de reportes (por defecto Config.DIRECTORIO_REPORTES)
+
+    Returns:
+        list: Entradas en el orden en que se registraron por primera vez
+    """
+    directorio = directorio or Config.DIRECTORIO_REPORTES
+    ruta_manifiesto = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    entradas = {}
+    if not os.path.exists(ruta_manifiesto):
+        return []
+
+    with open(ruta_manifiesto, encoding='utf-8') as f:
+        for linea in f:
+            try:
+                entrada = json.loads(linea)
+            except json.JSONDecodeError:
+                # Línea a medias de un proceso interrumpido
+                continue
+            if not (isinstance(entrada, dict) and isinstance(entrada.get('boleta'), str)
+                    and isinstance(entrada.get('fecha'), str) and isinstance(entrada.get('artefactos'), dict)):
+                continue
+            clave = (entrada['boleta'], entrada['fecha'])
+            anterior = entradas.get(clave, entrada)
+            entradas[clave] = {**anterior, **entrada,
+                               'artefactos': {**anterior['artefactos'], **entrada['artefactos']}}
+    return list(entradas.values())
+
+
+def compactar_indice(directorio=None):
+    """
+    Reescribe el manifiesto y los datos de la página con una sola línea por boleta y fecha.
+    Solo conserva las líneas válidas del manifiesto, así que también quita las líneas
+    dañadas. Es O(n): conviene correrlo de vez en cuando; bloquea ambos archivos, así que
+    los reportes que se registren mientras tanto esperan y no se pierden.
+
+    Args:
+        directorio: Carpeta de reportes (por defecto Config.DIRECTORIO_REPORTES)
+
+    Returns:
+        int: Cantidad de entradas después de compactar
+    """
+    directorio = directorio or Config.DIRECTORIO_REPORTES
+    ruta_manifiesto = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    ruta_datos = os.path.join(directorio, ARCHIVO_DATOS_INDICE)
+
+    # Siempre en este orden (manifiesto y luego datos) para no bloquearse con otro compactar
+    with bloquear_archivo(ruta_manifiesto), bloquear_archivo(ruta_datos):
+        entradas = leer_indice(directorio)
+        lineas = [json.dumps(entrada, ensure_ascii=False) for entrada in entradas]
+
+        for ruta, formatear in ((ruta_manifiesto, "{}\n".format),
+                                (ruta_datos, lambda linea: LINEA_DATOS_INDICE.format(json.dumps(linea)))):
+            ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                f.writelines(formatear(linea) for linea in lineas)
+            os.replace(ruta_temporal, ruta)
+
+    generar_pagina_indice(directorio)
+    return len(entradas)
+
+
+def main(argumentos=None):
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description='Índice de los reportes generados')
+    parser.add_argument('comando', choices=['listar', 'compactar'],
+                        help="'listar' imprime el manifiesto combinado en JSON; 'compactar' lo reescribe")
+    parser.add_argument('--directorio', default=None, help='Carpeta de reportes (por defecto Config.DIRECTORIO_REPORTES)')
+    args = parser.parse_args(argumentos)
+
+    if args.comando == 'listar':
+        json.dump(leer_indice(args.directorio), sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    else:
+        print(f"{compactar_indice(args.directorio)} reportes en el índice", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import heapq
+
+import pandas as pd
+
+# Diferencia permitida entre lo pagado y lo consumido: los montos se truncan a pesos
+# enteros por persona, así que cada una puede aportar hasta un peso de diferencia
+TOLERANCIA_PESOS_POR_PERSONA = 1
+
+
+def calcular_saldos(boletas):
+    """
+    Calcula el saldo neto de cada persona en una o varias boletas.
+    Un saldo positivo significa que le deben dinero; uno negativo, que debe pagar.
+
+    Args:
+        boletas: Lista de tuplas (stats_responsables, pagadores), donde stats_responsables
+                 es el resultado de calcular_estadisticas_por_responsable y pagadores es el
+                 nombre de quien pagó toda la cuenta o un dict {nombre: monto_pagado}
+
+    Returns:
+        dict: {nombre: saldo} en pesos enteros
+
+    Raises:
+        ValueError: Si en alguna boleta lo pagado no suma lo consumido (con propina)
+    """
+    saldos = {}
+    for numero, (stats_responsables, pagadores) in enumerate(boletas, start=1):
+        consumos = stats_responsables[stats_responsables['Responsable'] != 'TOTAL']
+        for responsable, monto in zip(consumos['Responsable'], consumos['Total_con_Propina']):
+            saldos[responsable] = saldos.get(responsable, 0) - int(monto)
+
+        # Quien paga una cuenta completa paga la suma de lo asignado (fila TOTAL)
+        consumido = consumos['Total_con_Propina'].sum()
+        if isinstance(pagadores, str):
+            pagadores = {pagadores: int(consumido)}
+
+        # Si lo pagado no cuadra, los saldos no suman cero y las transferencias no saldan la cuenta
+        pagado = sum(pagadores.values())
+        if abs(pagado - consumido) > TOLERANCIA_PESOS_POR_PERSONA * len(consumos):
+            raise ValueError(f"En la boleta {numero} se pagó {pagado} pero se consumió "
+                             f"{consumido:.0f} (diferencia: {pagado - consumido:.0f})")
+        for pagador, monto in pagadores.items():
+            saldos[pagador] = saldos.get(pagador, 0) + int(monto)
+
+    return saldos
+
+
+def calcular_transferencias(saldos):
+    """
+    Calcula una lista casi mínima de transferencias para saldar las cuentas.
+    Usa un algoritmo voraz con heaps: en cada paso el mayor deudor le paga al
+    mayor acreedor, por lo que el costo es O(n log n) en el número de personas.
+
+    Args:
+        saldos: Dict {nombre: saldo} de calcular_saldos
+
+    Returns:
+        DataFrame con columnas De, Para y Monto
+    """
+    # heapq es un min-heap, así que se guardan los montos en negativo
+    acreedores = [(-saldo, nombre) for nombre, saldo in saldos.items() if saldo > 0]
+    deudores = [(saldo, nombre) for nombre, saldo in saldos.items() if saldo < 0]
+    heapq.heapify(acreedores)
+    heapq.heapify(deudores)
+
+    transferencias = []
+    while acreedores and deudores:
+        credito, acreedor = heapq.heappop(acreedores)
+        deuda, deudor = heapq.heappop(deudores)
+        monto = min(-credito, -deuda)
+        transferencias.append({'De': deudor, 'Para': acreedor, 'Monto': monto})
+
+        # Volver a encolar lo que quede pendiente
+        if -credito > monto:
+            heapq.heappush(acreedores, (credito + monto, acreedor))
+        if -deuda > monto:
+            heapq.heappush(deudores, (deuda + monto, deudor))
+
+    return pd.DataFrame(transferencias, columns=['De', 'Para', 'Monto'])
+
+
+def liquidar_boletas(boletas):
+    """
+    Calcula saldos y transferencias para una o varias boletas
+
+    Args:
+        boletas: Lista de tuplas (stats_responsables, pagadores), ver calcular_saldos
+
+    Returns:
+        Tuple de (saldos_df, transferencias_df)
+    """
+    saldos = calcular_saldos(boletas)
+    saldos_df = pd.DataFrame(
+        sorted(saldos.items(), key=lambda par: par[1], reverse=True),
+        columns=['Responsable', 'Saldo']
+    )
+    return saldos_df, calcular_transferencias(saldos)
@@ -0,0 +1,216 @@
+import os
+import sys
+import glob
+import argparse
+import statistics
+
+import pandas as pd
+
+from Boleta import Config
+from reporte import PLAYWRIGHT_DISPONIBLE, VERSION_SHELL, inyectar_datos_shell
+
+if PLAYWRIGHT_DISPONIBLE:
+    from playwright.sync_api import sync_playwright
+
+# Bajo este margen una diferencia de tiempo se considera ruido de medición
+MARGEN_MS = 2.0
+
+# Marcas que deja el dashboard (ver medir() y marcarListo() en SCRIPT_GRAFICOS)
+SCRIPT_MEDICIONES = """() => {
+    const medidas = {};
+    for (const medida of performance.getEntriesByType('measure')) {
+        medidas[medida.name] = medida.duration;
+    }
+    const listo = performance.getEntriesByName('dashboard-listo')[0];
+    return {
+        medidas: medidas,
+        listo: listo ? listo.startTime : null,
+        nodos: document.getElementsByTagName('*').length
+    };
+}"""
+
+
+def buscar_dashboards(directorio=None):
+    """
+    Lista los dashboards generados en un directorio
+
+    Args:
+        directorio: Carpeta de reportes (por defecto Config.DIRECTORIO_REPORTES)
+
+    Returns:
+        list: Rutas de los HTML completos y, si existe el shell compartido, una
+        ruta 'shell?datos=...' por cada JSON de datos
+    """
+    directorio = directorio or Config.DIRECTORIO_REPORTES
+    # Los reportes pueden estar particionados por fecha (reportes/2026/01/15/...)
+    dashboards = [
+        ruta for ruta in sorted(glob.glob(os.path.join(directorio, '**', 'dashboard_*.html'), recursive=True))
+        if not os.path.basename(ruta).startswith('dashboard_shell_')
+    ]
+    ruta_shell = os.path.join(directorio, f'dashboard_shell_v{VERSION_SHELL}.html')
+    if os.path.exists(ruta_shell):
+        directorio_datos = os.path.join(directorio, 'datos')
+        for ruta_json in sorted(glob.glob(os.path.join(directorio_datos, '**', '*.json'), recursive=True)):
+            relativa = os.path.relpath(ruta_json, directorio_datos).replace(os.sep, '/')
+            dashboards.append(f"{ruta_shell}?datos=datos/{relativa}")
+    return dashboards
+
+
+def medir_pagina(browser, dashboard, timeout_ms=30000):
+    """
+    Carga un dashboard en una página nueva y lee sus marcas de rendimiento
+
+    Args:
+        browser: Navegador Chromium de Playwright
+        dashboard: Ruta del HTML (admite '?datos=...' para el shell compartido)
+        timeout_ms: Tiempo máximo de espera a que el dashboard termine de dibujarse
+
+    Returns:
+        dict: {'medidas': {nombre: ms}, 'listo': ms desde la navegación, 'nodos': int,
+        'heap_mb': float}
+    """
+    ruta_html, _, consulta = dashboard.partition('?')
+    # Contexto nuevo por medición: sin caché ni memoria compartida con la anterior
+    contexto = browser.new_context()
+    try:
+        page = contexto.new_page()
+        cdp = contexto.new_cdp_session(page)
+        cdp.send('Performance.enable')
+        # Chromium no permite fetch de file://: el shell recibe su JSON ya leído
+        if consulta:
+            inyectar_datos_shell(page, ruta_html, consulta)
+
+        page.goto(f"file:///{os.path.abspath(ruta_html)}" + (f"?{consulta}" if consulta else ""))
+        page.wait_for_selector('body[data-listo]', state='attached', timeout=timeout_ms)
+
+        medicion = page.evaluate(SCRIPT_MEDICIONES)
+        metricas = {m['name']: m['value'] for m in cdp.send('Performance.getMetrics')['metrics']}
+        medicion['heap_mb'] = metricas.get('JSHeapUsedSize', 0) / (1024 * 1024)
+        return medicion
+    finally:
+        contexto.close()
+
+
+def medir_dashboards(dashboards, repeticiones=3, timeout_ms=30000):
+    """
+    Mide el renderizado de varios dashboards en Chromium sin interfaz
+
+    Args:
+        dashboards: Lista de rutas de HTML (ver buscar_dashboards)
+        repeticiones: Cargas por dashboard; se reporta la mediana
+        timeout_ms: Tiempo máximo de espera por carga
+
+    Returns:
+        DataFrame con una fila por dashboard: Listo_ms (desde la navegación hasta el último
+        gráfico), una columna <medida>_ms por marca del dashboard (datos, tablas y cada
+        gráfico), Nodos_DOM, Heap_JS_MB y Error (el mensaje si no se pudo medir)
+    """
+    if not PLAYWRIGHT_DISPONIBLE:
+        raise RuntimeError("Playwright no está instalado. Instala con: pip install playwright "
+                           "&& playwright install chromium")
+
+    filas = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        try:
+            for dashboard in dashboards:
+                # Un dashboard que no carga queda registrado y no detiene la medición de los demás
+                try:
+                    mediciones = [medir_pagina(browser, dashboard, timeout_ms) for _ in range(repeticiones)]
+                except Exception as e:
+                    print(f"❌ No se pudo medir {dashboard}: {e}", file=sys.stderr)
+                    filas.append({'Dashboard': dashboard, 'Error': str(e).splitlines()[0]})
+                    continue
+                fila = {
+                    'Dashboard': dashboard,
+                    'Listo_ms': statistics.median(m['listo'] or 0 for m in mediciones),
+                }
+                for nombre in mediciones[0]['medidas']:
+                    columna = f"{nombre.replace('-', '_').capitalize()}_ms"
+                    fila[columna] = statistics.median(m['medidas'].get(nombre, 0) for m in mediciones)
+                fila['Nodos_DOM'] = statistics.median(m['nodos'] for m in mediciones)
+                fila['Heap_JS_MB'] = statistics.median(m['heap_mb'] for m in mediciones)
+                fila['Error'] = None
+                filas.append(fila)
+        finally:
+            browser.close()
+
+    # Error al final, después de las columnas de cada medida
+    medicion = pd.DataFrame(filas).round(2)
+    return medicion[[c for c in medicion.columns if c != 'Error'] + ['Error']]
+
+
+def comparar_con_referencia(medicion, referencia, tolerancia=0.2):
+    """
+    Detecta regresiones respecto de una medición anterior
+
+    Args:
+        medicion: DataFrame de medir_dashboards
+        referencia: DataFrame de una medición anterior (mismos dashboards)
+        tolerancia: Aumento relativo permitido (0.2 = 20%)
+
+    Returns:
+        DataFrame con Dashboard, Metrica, Referencia, Actual y Aumento_pct de cada
+        métrica que empeoró más que la tolerancia (vacío si no hay regresiones)
+    """
+    regresiones = []
+    anterior = referencia.set_index('Dashboard')
+    for _, fila in medicion.iterrows():
+        if fila['Dashboard'] not in anterior.index:
+            continue
+        for metrica, actual in fila.drop(['Dashboard', 'Error'], errors='ignore').items():
+            if metrica not in anterior.columns or pd.isna(actual):
+                continue
+            base = anterior.at[fila['Dashboard'], metrica]
+            if pd.isna(base) or actual <= base * (1 + tolerancia):
+                continue
+            if metrica.endswith('_ms') and actual - base < MARGEN_MS:
+                continue
+            regresiones.append({
+                'Dashboard': fila['Dashboard'],
+                'Metrica': metrica,
+                'Referencia': base,
+                'Actual': actual,
+                'Aumento_pct': round((actual / base - 1) * 100, 1) if base else None,
+            })
+    return pd.DataFrame(regresiones, columns=['Dashboard', 'Metrica', 'Referencia', 'Actual', 'Aumento_pct'])
+
+
+def main(argumentos=None):
+    """Punto de entrada de línea de comandos; retorna 1 si algún dashboard no cargó o hay regresiones"""
+    parser = argparse.ArgumentParser(description='Mide el renderizado de los dashboards en Chromium sin interfaz')
+    parser.add_argument('dashboards', nargs='*',
+                        help='HTML a medir (por defecto todos los de Config.DIRECTORIO_REPORTES)')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Cargas por dashboard (se usa la mediana)')
+    parser.add_argument('--salida', help='Archivo de salida (por defecto stdout)')
+    parser.add_argument('--formato', choices=['csv', 'json'], default='csv', help='Formato de salida')
+    parser.add_argument('--referencia', help='Medición anterior en JSON para detectar regresiones')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Aumento relativo permitido (0.2 = 20%%)')
+    args = parser.parse_args(argumentos)
+
+    dashboards = args.dashboards or buscar_dashboards()
+    if not dashboards:
+        print("No se encontraron dashboards para medir", file=sys.stderr)
+        return 1
+
+    medicion = medir_dashboards(dashboards, args.repeticiones)
+
+    destino = args.salida or sys.stdout
+    if args.formato == 'json':
+        medicion.to_json(destino, orient='records', force_ascii=False, indent=2)
+    else:
+        medicion.to_csv(destino, index=False)
+
+    fallidos = int(medicion['Error'].notna().sum())
+    print(f"{len(medicion)} dashboards medidos, {fallidos} con error", file=sys.stderr)
+    if not args.referencia:
+        return 1 if fallidos else 0
+
+    regresiones = comparar_con_referencia(medicion, pd.read_json(args.referencia), args.tolerancia)
+    for _, r in regresiones.iterrows():
+        print(f"⚠️  {r['Dashboard']}: {r['Metrica']} {r['Referencia']} → {r['Actual']}", file=sys.stderr)
+    return 1 if fallidos or len(regresiones) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# RSS actual con psutil si está instalado; si no, se lee /proc (Linux)
+try:
+    import psutil
+    PSUTIL_DISPONIBLE = True
+except ImportError:
+    PSUTIL_DISPONIBLE = False
+
+# RSS máximo del proceso (no existe en Windows)
+try:
+    import resource
+    RESOURCE_DISPONIBLE = True
+except ImportError:
+    RESOURCE_DISPONIBLE = False
+
+MB = 1024 * 1024
+
+# Frames propios del perfilador que no interesan en los sitios de asignación
+FILTROS_SITIOS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class PresupuestoMemoriaExcedido(MemoryError):
+    """Una etapa superó el presupuesto de memoria configurado"""
+
+
+def obtener_rss_mb():
+    """
+    Returns:
+        float: RSS actual del proceso en MB, o None si no se puede medir en esta plataforma
+    """
+    if PSUTIL_DISPONIBLE:
+        return psutil.Process().memory_info().rss / MB
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def obtener_rss_maximo_mb():
+    """
+    Returns:
+        float: RSS máximo alcanzado por el proceso en MB, o None si no se puede medir
+    """
+    if not RESOURCE_DISPONIBLE:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo entrega en KB y macOS en bytes
+    return maximo / MB if sys.platform == 'darwin' else maximo / 1024
+
+
+class PerfilMemoria:
+    """
+    Mide la memoria de cada etapa del proceso con tracemalloc y el RSS del sistema.
+
+    Por etapa registra el pico de asignaciones, lo que quedó retenido al terminar,
+    el RSS y los sitios (archivo:línea) que más memoria retuvieron. Si se indica un
+    presupuesto, la etapa que lo supere hace fallar la ejecución. Inactivo no mide
+    nada y sus etapas no tienen costo.
+    """
+
+    def __init__(self, activo=True, presupuesto_mb=None, ruta_salida=None, top_sitios=10, profundidad=1):
+        self.activo = activo
+        self.presupuesto_mb = presupuesto_mb
+        self.ruta_salida = ruta_salida
+        self.top_sitios = top_sitios
+        self.profundidad = profundidad
+        self.etapas = []
+        self._abiertas = []   # etapas en curso (pueden anidarse)
+
+    def _acumular_pico(self):
+        """Traspasa el pico actual a las etapas abiertas antes de reiniciarlo"""
+        pico = tracemalloc.get_traced_memory()[1]
+        for abierta in self._abiertas:
+            abierta['pico'] = max(abierta['pico'], pico)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def etapa(self, nombre):
+        """
+        Mide la memoria usada dentro del bloque
+
+        Args:
+            nombre: Nombre de la etapa en el reporte
+        """
+        if not self.activo:
+            yield
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.profundidad)
+        self._acumular_pico()
+        inicio = tracemalloc.take_snapshot().filter_traces(FILTROS_SITIOS)
+        abierta = {'pico': 0, 'actual': tracemalloc.get_traced_memory()[0], 'rss': obtener_rss_mb()}
+        self._abiertas.append(abierta)
+        try:
+            yield
+        finally:
+            self._acumular_pico()
+            self._abiertas.remove(abierta)
+            # Medir lo retenido antes de tomar el snapshot final, que también asigna memoria
+            abierta['final'] = tracemalloc.get_traced_memory()[0]
+            self._registrar(nombre, abierta, inicio)
+
+        self._verificar_presupuesto(self.etapas[-1])
+
+    def medir(self, nombre, funcion):
+        """
+        Envuelve una función para que cada llamada se mida como una etapa
+
+        Args:
+            nombre: Nombre de la etapa en el reporte
+            funcion: Función a envolver
+
+        Returns:
+            Función envuelta (la misma función si el perfil está inactivo)
+        """
+        if not self.activo:
+            return funcion
+
+        @wraps(funcion)
+        def envuelta(*args, **kwargs):
+            with self.etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envuelta
+
+    def _registrar(self, nombre, abierta, inicio):
+        """Agrega al reporte las mediciones de una etapa terminada"""
+        final = tracemalloc.take_snapshot().filter_traces(FILTROS_SITIOS)
+        diferencias = final.compare_to(inicio, 'lineno')
+        sitios = [
+            {
+                'sitio': f"{diferencia.traceback[0].filename}:{diferencia.traceback[0].lineno}",
+                'retenido_kb': round(diferencia.size_diff / 1024, 1),
+                'bloques': diferencia.count_diff,
+            }
+            for diferencia in diferencias[:self.top_sitios]
+            if diferencia.size_diff > 0
+        ]
+
+        rss = obtener_rss_mb()
+        self.etapas.append({
+            'etapa': nombre,
+            'pico_mb': round(abierta['pico'] / MB, 3),
+            'pico_sobre_inicio_mb': round((abierta['pico'] - abierta['actual']) / MB, 3),
+            'retenido_mb': round((abierta['final'] - abierta['actual']) / MB, 3),
+            'rss_mb': round(rss, 1) if rss is not None else None,
+            'rss_delta_mb': round(rss - abierta['rss'], 1) if rss is not None and abierta['rss'] is not None else None,
+            'rss_maximo_mb': obtener_rss_maximo_mb(),
+            'sitios': sitios,
+        })
+
+    def _verificar_presupuesto(self, medicion):
+        """
+        Falla si la etapa superó el presupuesto. Se compara lo que usó la propia etapa
+        (pico de tracemalloc sobre lo asignado al empezar o aumento del RSS, el mayor),
+        no la memoria total del proceso, que incluye lo cargado antes por otras etapas.
+        """
+        if self.presupuesto_mb is None:
+            return
+        uso = max(medicion['pico_sobre_inicio_mb'], medicion['rss_delta_mb'] or 0)
+        if uso > self.presupuesto_mb:
+            medicion['presupuesto_excedido'] = True
+            self.guardar()
+            raise PresupuestoMemoriaExcedido(
+                f"La etapa '{medicion['etapa']}' usó {uso:.1f} MB (presupuesto: {self.presupuesto_mb} MB)"
+            )
+
+    def resumen(self):
+        """
+        Returns:
+            dict: Reporte completo con el presupuesto, el pico global y las mediciones por etapa
+        """
+        return {
+            'presupuesto_mb': self.presupuesto_mb,
+            'pico_mb': max((e['pico_mb'] for e in self.etapas), default=0),
+            'rss_maximo_mb': obtener_rss_maximo_mb(),
+            'etapas': self.etapas,
+        }
+
+    def imprimir(self):
+        """Muestra una tabla breve con el pico y lo retenido por etapa"""
+        if not self.etapas:
+            return
+        print("\n🧠 Memoria por etapa:")
+        for e in self.etapas:
+            rss = f"{e['rss_mb']:.1f} MB" if e['rss_mb'] is not None else "-"
+            print(f"   {e['etapa']:<28} pico {e['pico_mb']:>9.2f} MB   retenido {e['retenido_mb']:>9.2f} MB   RSS {rss}")
+
+    def guardar(self, ruta_salida=None):
+        """
+        Guarda el reporte en JSON
+
+        Args:
+            ruta_salida: Ruta del JSON (por defecto la indicada al crear el perfil)
+
+        Returns:
+            str: Ruta del archivo generado o None si no hay ruta
+        """
+        ruta_salida = ruta_salida or self.ruta_salida
+        if not self.activo or not ruta_salida:
+            return None
+
+        directorio = os.path.dirname(ruta_salida)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(ruta_salida, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, ensure_ascii=False, indent=2)
+        return ruta_salida
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class DependenciaFallida(Exception):
+    """Una etapa no se ejecutó porque falló una de sus dependencias"""
+
+
+def ejecutar_etapas(etapas, max_hilos=None):
+    """
+    Ejecuta etapas en paralelo respetando sus dependencias. Cada etapa recibe como
+    argumentos los resultados de sus dependencias, en el orden declarado. Si una
+    etapa falla, solo se omiten las que dependen de ella; el resto sigue.
+
+    Args:
+        etapas: Dict {nombre: (funcion, [dependencias])}
+        max_hilos: Máximo de etapas simultáneas (por defecto, todas las posibles)
+
+    Returns:
+        Tuple de (resultados, errores) como dicts {nombre: valor} y {nombre: excepción}
+    """
+    desconocidas = {d for _, deps in etapas.values() for d in deps if d not in etapas}
+    if desconocidas:
+        raise ValueError(f"Dependencias desconocidas: {sorted(desconocidas)}")
+
+    resultados = {}
+    errores = {}
+    pendientes = dict(etapas)
+    en_curso = {}
+
+    with ThreadPoolExecutor(max_workers=max_hilos or max(len(etapas), 1)) as executor:
+        while pendientes or en_curso:
+            # Lanzar todas las etapas listas (y descartar las que ya no pueden correr)
+            hubo_cambios = True
+            while hubo_cambios:
+                hubo_cambios = False
+                for nombre, (funcion, dependencias) in list(pendientes.items()):
+                    fallidas = [d for d in dependencias if d in errores]
+                    if fallidas:
+                        errores[nombre] = DependenciaFallida(f"Falló la etapa previa: {', '.join(fallidas)}")
+                    elif all(d in resultados for d in dependencias):
+                        argumentos = [resultados[d] for d in dependencias]
+                        en_curso[executor.submit(funcion, *argumentos)] = nombre
+                    else:
+                        continue
+                    del pendientes[nombre]
+                    hubo_cambios = True
+
+            if not en_curso:
+                # Lo que queda pendiente depende de sí mismo (ciclo)
+                for nombre in pendientes:
+                    errores[nombre] = ValueError(f"Dependencia circular en la etapa '{nombre}'")
+                break
+
+            terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                nombre = en_curso.pop(futuro)
+                try:
+                    resultados[nombre] = futuro.result()
+                except Exception as e:
+                    errores[nombre] = e
+
+    return resultados, errores
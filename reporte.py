@@ -1,6 +1,11 @@
 import os
 import json
+import time
+import shutil
+import logging
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import parse_qs, unquote
 
 # Importar playwright para PDF
 try:
@@ -9,6 +14,287 @@ try:
 except ImportError:
     PLAYWRIGHT_DISPONIBLE = False
 
+# Importar brotli para pre-comprimir los datos del shell (opcional, gzip viene con Python)
+try:
+    import brotli
+    BROTLI_DISPONIBLE = True
+except ImportError:
+    BROTLI_DISPONIBLE = False
+
+# Estilos del dashboard, compartidos por el HTML completo y el shell
+ESTILOS_DASHBOARD = '''        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: linear-gradient(135deg, #0f0f23 0%, #1a1a2e 100%); min-height: 100vh; color: #fff; }
+        .app { max-width: 1400px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #16213e 0%, #0f3460 100%); border-radius: 20px; padding: 30px; margin-bottom: 30px; box-shadow: 0 10px 30px rgba(0,0,0,0.3); text-align: center; border: 1px solid #00d4ff; }
+        .header h1 { color: #00d4ff; font-size: 2.5rem; margin-bottom: 15px; font-weight: 700; text-shadow: 0 0 10px rgba(0,212,255,0.3); }
+        .header p { color: #a8b2d1; font-size: 1.1rem; }
+        .summary-cards { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }
+        .card { background: linear-gradient(135deg, #16213e 0%, #0f3460 100%); border-radius: 15px; padding: 25px; box-shadow: 0 8px 25px rgba(0,0,0,0.3); transition: transform 0.3s ease, box-shadow 0.3s ease; text-align: center; border: 1px solid #333; }
+        .card:hover { transform: translateY(-5px); box-shadow: 0 15px 35px rgba(0,212,255,0.2); border-color: #00d4ff; }
+        .card-icon { font-size: 2.5rem; margin-bottom: 15px; }
+        .card-value { font-size: 2rem; font-weight: bold; color: #00d4ff; margin-bottom: 5px; text-shadow: 0 0 10px rgba(0,212,255,0.3); }
+        .card-label { color: #a8b2d1; font-size: 0.9rem; text-transform: uppercase; letter-spacing: 1px; }
+        .charts-container { display: grid; grid-template-columns: 1fr 1fr; gap: 30px; margin-bottom: 30px; }
+        .chart-card { background: #000; border-radius: 15px; padding: 25px; box-shadow: 0 8px 25px rgba(0,0,0,0.5); border: 1px solid #333; }
+        .chart-title { font-size: 1.3rem; font-weight: 600; color: #00d4ff; margin-bottom: 20px; text-align: center; text-shadow: 0 0 5px rgba(0,212,255,0.3); }
+        .full-width-chart { grid-column: 1 / -1; }
+        .chart-container { position: relative; height: 400px; width: 100%; }
+        .chart-container.small { height: 300px; }
+        .table-container { background: linear-gradient(135deg, #16213e 0%, #0f3460 100%); border-radius: 15px; padding: 25px; box-shadow: 0 8px 25px rgba(0,0,0,0.3); overflow-x: auto; margin-bottom: 30px; border: 1px solid #333; }
+        .data-table { width: 100%; border-collapse: collapse; margin-top: 15px; }
+        .data-table th, .data-table td { padding: 15px 12px; text-align: left; border: 1px solid #454545; }
+        .data-table th { background: #000; font-weight: 600; color: #00d4ff; text-transform: uppercase; font-size: 0.95rem; letter-spacing: 1px; }
+        .data-table td { background: #1e2328; color: #e8eaed; font-size: 1rem; }
+        .data-table tr:nth-child(even) td { background: #2a2d32; }
+        .data-table tr:hover td { background: #3a4047 !important; color: #fff !important; }
+        .data-table th:nth-child(3) { color: #00ff41; font-size: 1.05rem; text-shadow: 0 0 15px rgba(0,255,65,0.8), 0 0 25px rgba(0,255,65,0.5); }
+        .data-table td:nth-child(3) { color: #00ff41 !important; font-weight: bold; font-size: 1.2rem; text-shadow: 0 0 20px rgba(0,255,65,1), 0 0 30px rgba(0,255,65,0.7), 0 0 40px rgba(0,255,65,0.5); }
+        .data-table tr:hover td:nth-child(3) { color: #39ff14 !important; text-shadow: 0 0 25px rgba(57,255,20,1), 0 0 35px rgba(57,255,20,0.8); }
+        .total-row { background: #00d4ff !important; color: #000 !important; font-weight: bold; }
+        .total-row:hover { background: #0099cc !important; }
+        .total-row td { background: #00d4ff !important; color: #000 !important; border: 1px solid #0099cc !important; }
+        .total-row td:nth-child(3) { color: #5B21B6 !important; font-size: 1.4rem; font-weight: 900; text-shadow: 0 0 25px rgba(91,33,182,1), 0 0 40px rgba(91,33,182,0.8), 0 0 55px rgba(91,33,182,0.6), 0 0 70px rgba(91,33,182,0.4); animation: neonPulse 1.5s ease-in-out infinite; }
+        @keyframes neonPulse { 0%, 100% { text-shadow: 0 0 25px rgba(91,33,182,1), 0 0 40px rgba(91,33,182,0.8), 0 0 55px rgba(91,33,182,0.6); } 50% { text-shadow: 0 0 35px rgba(91,33,182,1), 0 0 55px rgba(91,33,182,1), 0 0 75px rgba(91,33,182,0.8); } }
+        .productos-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 25px; margin-top: 20px; }
+        .producto-card { background: linear-gradient(135deg, #1a2540 0%, #16213e 100%); border-radius: 12px; padding: 20px; border: 3px solid #00ff41; box-shadow: 0 8px 20px rgba(0,255,65,0.3), 0 0 40px rgba(0,255,65,0.15); transition: transform 0.3s ease, box-shadow 0.3s ease, border-color 0.3s ease; }
+        .producto-card:hover { transform: translateY(-8px) scale(1.02); box-shadow: 0 12px 30px rgba(0,255,65,0.5), 0 0 60px rgba(0,255,65,0.3); border-color: #39ff14; }
+        .producto-card h4 { color: #00d4ff; margin-bottom: 15px; font-size: 1.2rem; text-align: center; font-weight: 700; text-shadow: 0 0 10px rgba(0,212,255,0.5); padding: 10px; background: rgba(0,212,255,0.1); border-radius: 8px; border: 1px solid rgba(0,212,255,0.3); }
+        .producto-item { background: #0f3460; margin: 5px 0; padding: 8px 12px; border-radius: 5px; font-size: 0.9rem; color: #a8b2d1; display: flex; justify-content: space-between; align-items: center; }
+        .producto-nombre { flex: 1; }
+        .producto-precio { font-weight: bold; color: #00d4ff; }
+        .totales-card { margin-top: 15px; padding-top: 15px; border-top: 2px solid #333; }
+        .total-item { background: #1a1a2e; margin: 8px 0; padding: 10px 15px; border-radius: 5px; display: flex; justify-content: space-between; font-weight: 600; }
+        .total-item.final { background: #00d4ff; color: #000; font-size: 1.05rem; }
+        @media (max-width: 768px) { .charts-container { grid-template-columns: 1fr; } .header h1 { font-size: 2rem; } .summary-cards { grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); } }'''
+
+# Funciones de Chart.js del dashboard, compartidas por el HTML completo y el shell
+SCRIPT_GRAFICOS = '''        const COLORES = [
+            '#00d4ff',  // Celeste brillante
+            '#ff6b6b',  // Rojo coral
+            '#4ecdc4',  // Turquesa
+            '#f9ca24',  // Amarillo oro
+            '#6c5ce7',  // Púrpura
+            '#26de81',  // Verde esmeralda
+            '#fd79a8',  // Rosa chicle
+            '#fdcb6e',  // Amarillo suave
+            '#a55eea',  // Lila
+            '#520325',  // Rojizo oscuro
+            '#ff9f43',  // Naranja mandarina
+            '#ee5a6f',  // Rojo sandía
+            '#0fb9b1',  // Verde azulado
+            '#2ed573',  // Verde lima
+            '#ffa502',  // Naranja fuerte
+            '#ff6348',  // Rojo salmón
+            '#747d8c',  // Gris azulado
+            '#5f27cd',  // Púrpura oscuro
+            '#00d2d3',  // Cian
+            '#ff9ff3'   // Rosa lavanda
+        ];
+
+        // Marcas de rendimiento alrededor de cada paso (las lee medir_dashboards.py)
+        function medir(nombre, funcion) {
+            performance.mark(`${nombre}-inicio`);
+            const resultado = funcion();
+            performance.mark(`${nombre}-fin`);
+            performance.measure(nombre, `${nombre}-inicio`, `${nombre}-fin`);
+            return resultado;
+        }
+
+        function marcarListo() {
+            performance.mark('dashboard-listo');
+            document.body.dataset.listo = 'true';
+        }
+
+        function formatCurrency(value) {
+            return new Intl.NumberFormat('es-CL', {
+                style: 'currency',
+                currency: 'CLP'
+            }).format(value);
+        }
+
+        function crearGraficoBarras(data) {
+            const ctx = document.getElementById('barChart').getContext('2d');
+            new Chart(ctx, {
+                type: 'bar',
+                data: {
+                    labels: data.estadisticas.map(item => item.responsable),
+                    datasets: [{
+                        label: 'Total con Propina',
+                        data: data.estadisticas.map(item => item.totalConPropina),
+                        backgroundColor: COLORES,
+                        borderColor: COLORES.map(color => color + 'AA'),
+                        borderWidth: 2,
+                        borderRadius: 8,
+                        borderSkipped: false,
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                            titleColor: '#00d4ff',
+                            bodyColor: '#fff',
+                            borderColor: '#00d4ff',
+                            borderWidth: 1,
+                            callbacks: {
+                                label: function(context) {
+                                    return formatCurrency(context.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            ticks: {
+                                color: '#a8b2d1'
+                            },
+                            grid: {
+                                color: '#333'
+                            }
+                        },
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                color: '#a8b2d1',
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            },
+                            grid: {
+                                color: '#333'
+                            }
+                        }
+                    }
+                }
+            });
+        }
+
+        function crearGraficoTorta(data) {
+            const ctx = document.getElementById('pieChart').getContext('2d');
+            new Chart(ctx, {
+                type: 'doughnut',
+                data: {
+                    labels: data.estadisticas.map(item => item.responsable),
+                    datasets: [{
+                        data: data.estadisticas.map(item => item.totalConPropina),
+                        backgroundColor: COLORES,
+                        borderColor: '#000',
+                        borderWidth: 2,
+                        hoverOffset: 10
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'bottom',
+                            labels: {
+                                padding: 20,
+                                usePointStyle: true,
+                                font: { size: 12 },
+                                color: '#a8b2d1'
+                            }
+                        },
+                        tooltip: {
+                            backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                            titleColor: '#00d4ff',
+                            bodyColor: '#fff',
+                            borderColor: '#00d4ff',
+                            borderWidth: 1,
+                            callbacks: {
+                                label: function(context) {
+                                    const label = context.label || '';
+                                    const value = formatCurrency(context.parsed);
+                                    const total = context.dataset.data.reduce((sum, val) => sum + val, 0);
+                                    const percentage = ((context.parsed / total) * 100).toFixed(1);
+                                    return `${label}: ${value} (${percentage}%)`;
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        }
+
+
+        function crearGraficoLineas(data) {
+            const ctx = document.getElementById('lineChart').getContext('2d');
+            // Calcular y ordenar promedios
+            const promedios = data.estadisticas
+                .map(item => ({
+                    responsable: item.responsable,
+                    promedio: item.totalConPropina / item.cantidadItems
+                }))
+                .sort((a, b) => a.promedio - b.promedio);
+
+            new Chart(ctx, {
+                type: 'line',
+                data: {
+                    labels: promedios.map(item => item.responsable),
+                    datasets: [{
+                        label: 'Promedio por Item',
+                        data: promedios.map(item => item.promedio),
+                        borderColor: '#4ecdc4',
+                        backgroundColor: 'rgba(78, 205, 196, 0.1)',
+                        borderWidth: 3,
+                        pointBackgroundColor: '#4ecdc4',
+                        pointBorderColor: '#000',
+                        pointBorderWidth: 2,
+                        pointRadius: 8,
+                        pointHoverRadius: 12,
+                        fill: true,
+                        tension: 0.4
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                            titleColor: '#00d4ff',
+                            bodyColor: '#fff',
+                            borderColor: '#00d4ff',
+                            borderWidth: 1,
+                            callbacks: {
+                                label: function(context) {
+                                    return `Promedio: ${formatCurrency(context.parsed.y)}`;
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            ticks: {
+                                color: '#a8b2d1'
+                            },
+                            grid: {
+                                color: '#333'
+                            }
+                        },
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                color: '#a8b2d1',
+                                callback: function(value) {
+                                    return formatCurrency(value);
+                                }
+                            },
+                            grid: {
+                                color: '#333'
+                            }
+                        }
+                    }
+                }
+            });
+        }'''
+
+
 def generar_datos_json(stats_responsables, tabla_productos, tabla_precios, 
                       total_cuenta, total_con_propina, propina_porcentaje, fecha=None):
     """
@@ -72,11 +358,53 @@ def generar_datos_json(stats_responsables, tabla_productos, tabla_precios,
     return data
 
 
+def obtener_detalle_por_responsable(tabla_productos, tabla_precios, propina_porcentaje):
+    """
+    Une las tablas de productos y precios en el detalle de cada responsable
+    
+    Args:
+        tabla_productos: DataFrame con productos por responsable
+        tabla_precios: DataFrame con precios por responsable
+        propina_porcentaje: Porcentaje de propina aplicado
+    
+    Returns:
+        list: Dicts con responsable, items [(producto, precio)], subtotal, propina y total
+    """
+    # Convertir a diccionarios para acceso más rápido
+    productos_dict = {row['Responsable']: row for row in tabla_productos.to_dict('records')}
+    precio_cols = [col for col in tabla_precios.columns if col.startswith('Precio_')]
+    
+    detalles = []
+    for row_precios in tabla_precios.to_dict('records'):
+        responsable = row_precios['Responsable']
+        producto_row = productos_dict[responsable]
+        
+        items = []
+        for col in precio_cols:
+            if row_precios[col] and row_precios[col] != '':
+                item_num = col.split('_')[1]
+                producto_nombre = producto_row.get(f'Item_{item_num}', '')
+                if producto_nombre:
+                    items.append((producto_nombre, row_precios[col]))
+        
+        detalles.append({
+            'responsable': responsable,
+            'items': items,
+            'subtotal': row_precios['Subtotal'],
+            'propina': row_precios[f'Propina ({propina_porcentaje}%)'],
+            'total': row_precios['Total a Pagar']
+        })
+    
+    return detalles
+
+
 def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios, 
                           total_cuenta, total_con_propina, propina_porcentaje, fecha=None, 
-                          nombre_archivo="dashboard_gastos.html"):
+                          nombre_archivo="dashboard_gastos.html", imagenes_graficos=None,
+                          transferencias=None):
     """
-    Genera un dashboard HTML con gráficos interactivos usando Chart.js
+    Genera un dashboard HTML con gráficos interactivos usando Chart.js,
+    o con imágenes ya renderizadas si se entregan en imagenes_graficos
     
     Args:
         stats_responsables: DataFrame con estadísticas por responsable
@@ -87,6 +415,8 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
         propina_porcentaje: Porcentaje de propina aplicado
         fecha: Fecha del reporte (opcional)
         nombre_archivo: Nombre del archivo HTML a generar
+        imagenes_graficos: Dict {id_grafico: ruta_png} de renderizar_graficos (opcional)
+        transferencias: DataFrame De/Para/Monto de liquidacion.calcular_transferencias (opcional)
     
     Returns:
         str: Ruta del archivo generado
@@ -96,8 +426,9 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
     data = generar_datos_json(stats_responsables, tabla_productos, tabla_precios, 
                              total_cuenta, total_con_propina, propina_porcentaje, fecha)
     
-    # Crear directorio si no existe
-    os.makedirs("reportes", exist_ok=True)
+    # Crear directorio si no existe (el nombre puede incluir la partición por fecha)
+    ruta_archivo = os.path.join("reportes", nombre_archivo)
+    os.makedirs(os.path.dirname(ruta_archivo), exist_ok=True)
     
     # Formatear los datos para insertar en el HTML
     fecha_reporte = fecha or datetime.now().strftime("%Y-%m-%d")
@@ -106,6 +437,23 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
         # Formatear directamente con separador de miles apropiado
         return f"${int(value):,}".replace(",", ".")
     
+    def contenido_grafico(id_grafico):
+        # Imagen estática (ruta relativa al HTML) o canvas para Chart.js
+        if imagenes_graficos:
+            ruta_relativa = os.path.relpath(imagenes_graficos[id_grafico],
+                                            os.path.dirname(ruta_archivo)).replace(os.sep, '/')
+            return f'<img id="{id_grafico}" src="{ruta_relativa}" alt="{id_grafico}" style="width: 100%; height: 100%; object-fit: contain;">'
+        return f'<canvas id="{id_grafico}"></canvas>'
+    
+    # '</' escapado para que el JSON no pueda cerrar la etiqueta <script>
+    datos_json = json.dumps(data, ensure_ascii=False).replace('</', '<\\/')
+    
+    script_chartjs = '' if imagenes_graficos else '<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>'
+    inicializar_graficos = '' if imagenes_graficos else '''
+            medir('grafico-barras', () => crearGraficoBarras(gastosData));
+            medir('grafico-torta', () => crearGraficoTorta(gastosData));
+            medir('grafico-lineas', () => crearGraficoLineas(gastosData));'''
+    
     # Crear HTML con datos integrados
     html_content = f'''<!DOCTYPE html>
 <html lang="es">
@@ -113,52 +461,9 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Análisis de Gastos Compartidos</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    {script_chartjs}
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: linear-gradient(135deg, #0f0f23 0%, #1a1a2e 100%); min-height: 100vh; color: #fff; }}
-        .app {{ max-width: 1400px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #16213e 0%, #0f3460 100%); border-radius: 20px; padding: 30px; margin-bottom: 30px; box-shadow: 0 10px 30px rgba(0,0,0,0.3); text-align: center; border: 1px solid #00d4ff; }}
-        .header h1 {{ color: #00d4ff; font-size: 2.5rem; margin-bottom: 15px; font-weight: 700; text-shadow: 0 0 10px rgba(0,212,255,0.3); }}
-        .header p {{ color: #a8b2d1; font-size: 1.1rem; }}
-        .summary-cards {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }}
-        .card {{ background: linear-gradient(135deg, #16213e 0%, #0f3460 100%); border-radius: 15px; padding: 25px; box-shadow: 0 8px 25px rgba(0,0,0,0.3); transition: transform 0.3s ease, box-shadow 0.3s ease; text-align: center; border: 1px solid #333; }}
-        .card:hover {{ transform: translateY(-5px); box-shadow: 0 15px 35px rgba(0,212,255,0.2); border-color: #00d4ff; }}
-        .card-icon {{ font-size: 2.5rem; margin-bottom: 15px; }}
-        .card-value {{ font-size: 2rem; font-weight: bold; color: #00d4ff; margin-bottom: 5px; text-shadow: 0 0 10px rgba(0,212,255,0.3); }}
-        .card-label {{ color: #a8b2d1; font-size: 0.9rem; text-transform: uppercase; letter-spacing: 1px; }}
-        .charts-container {{ display: grid; grid-template-columns: 1fr 1fr; gap: 30px; margin-bottom: 30px; }}
-        .chart-card {{ background: #000; border-radius: 15px; padding: 25px; box-shadow: 0 8px 25px rgba(0,0,0,0.5); border: 1px solid #333; }}
-        .chart-title {{ font-size: 1.3rem; font-weight: 600; color: #00d4ff; margin-bottom: 20px; text-align: center; text-shadow: 0 0 5px rgba(0,212,255,0.3); }}
-        .full-width-chart {{ grid-column: 1 / -1; }}
-        .chart-container {{ position: relative; height: 400px; width: 100%; }}
-        .chart-container.small {{ height: 300px; }}
-        .table-container {{ background: linear-gradient(135deg, #16213e 0%, #0f3460 100%); border-radius: 15px; padding: 25px; box-shadow: 0 8px 25px rgba(0,0,0,0.3); overflow-x: auto; margin-bottom: 30px; border: 1px solid #333; }}
-        .data-table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-        .data-table th, .data-table td {{ padding: 15px 12px; text-align: left; border: 1px solid #454545; }}
-        .data-table th {{ background: #000; font-weight: 600; color: #00d4ff; text-transform: uppercase; font-size: 0.95rem; letter-spacing: 1px; }}
-        .data-table td {{ background: #1e2328; color: #e8eaed; font-size: 1rem; }}
-        .data-table tr:nth-child(even) td {{ background: #2a2d32; }}
-        .data-table tr:hover td {{ background: #3a4047 !important; color: #fff !important; }}
-        .data-table th:nth-child(3) {{ color: #00ff41; font-size: 1.05rem; text-shadow: 0 0 15px rgba(0,255,65,0.8), 0 0 25px rgba(0,255,65,0.5); }}
-        .data-table td:nth-child(3) {{ color: #00ff41 !important; font-weight: bold; font-size: 1.2rem; text-shadow: 0 0 20px rgba(0,255,65,1), 0 0 30px rgba(0,255,65,0.7), 0 0 40px rgba(0,255,65,0.5); }}
-        .data-table tr:hover td:nth-child(3) {{ color: #39ff14 !important; text-shadow: 0 0 25px rgba(57,255,20,1), 0 0 35px rgba(57,255,20,0.8); }}
-        .total-row {{ background: #00d4ff !important; color: #000 !important; font-weight: bold; }}
-        .total-row:hover {{ background: #0099cc !important; }}
-        .total-row td {{ background: #00d4ff !important; color: #000 !important; border: 1px solid #0099cc !important; }}
-        .total-row td:nth-child(3) {{ color: #5B21B6 !important; font-size: 1.4rem; font-weight: 900; text-shadow: 0 0 25px rgba(91,33,182,1), 0 0 40px rgba(91,33,182,0.8), 0 0 55px rgba(91,33,182,0.6), 0 0 70px rgba(91,33,182,0.4); animation: neonPulse 1.5s ease-in-out infinite; }}
-        @keyframes neonPulse {{ 0%, 100% {{ text-shadow: 0 0 25px rgba(91,33,182,1), 0 0 40px rgba(91,33,182,0.8), 0 0 55px rgba(91,33,182,0.6); }} 50% {{ text-shadow: 0 0 35px rgba(91,33,182,1), 0 0 55px rgba(91,33,182,1), 0 0 75px rgba(91,33,182,0.8); }} }}
-        .productos-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 25px; margin-top: 20px; }}
-        .producto-card {{ background: linear-gradient(135deg, #1a2540 0%, #16213e 100%); border-radius: 12px; padding: 20px; border: 3px solid #00ff41; box-shadow: 0 8px 20px rgba(0,255,65,0.3), 0 0 40px rgba(0,255,65,0.15); transition: transform 0.3s ease, box-shadow 0.3s ease, border-color 0.3s ease; }}
-        .producto-card:hover {{ transform: translateY(-8px) scale(1.02); box-shadow: 0 12px 30px rgba(0,255,65,0.5), 0 0 60px rgba(0,255,65,0.3); border-color: #39ff14; }}
-        .producto-card h4 {{ color: #00d4ff; margin-bottom: 15px; font-size: 1.2rem; text-align: center; font-weight: 700; text-shadow: 0 0 10px rgba(0,212,255,0.5); padding: 10px; background: rgba(0,212,255,0.1); border-radius: 8px; border: 1px solid rgba(0,212,255,0.3); }}
-        .producto-item {{ background: #0f3460; margin: 5px 0; padding: 8px 12px; border-radius: 5px; font-size: 0.9rem; color: #a8b2d1; display: flex; justify-content: space-between; align-items: center; }}
-        .producto-nombre {{ flex: 1; }}
-        .producto-precio {{ font-weight: bold; color: #00d4ff; }}
-        .totales-card {{ margin-top: 15px; padding-top: 15px; border-top: 2px solid #333; }}
-        .total-item {{ background: #1a1a2e; margin: 8px 0; padding: 10px 15px; border-radius: 5px; display: flex; justify-content: space-between; font-weight: 600; }}
-        .total-item.final {{ background: #00d4ff; color: #000; font-size: 1.05rem; }}
-        @media (max-width: 768px) {{ .charts-container {{ grid-template-columns: 1fr; }} .header h1 {{ font-size: 2rem; }} .summary-cards {{ grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); }} }}
+{ESTILOS_DASHBOARD}
     </style>
 </head>
 <body>
@@ -195,21 +500,21 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
             <div class="chart-card">
                 <h3 class="chart-title">💰 Gastos por Responsable</h3>
                 <div class="chart-container small">
-                    <canvas id="barChart"></canvas>
+                    {contenido_grafico('barChart')}
                 </div>
             </div>
             
             <div class="chart-card">
                 <h3 class="chart-title">🥧 Distribución de Gastos</h3>
                 <div class="chart-container small">
-                    <canvas id="pieChart"></canvas>
+                    {contenido_grafico('pieChart')}
                 </div>
             </div>
             
             <div class="chart-card full-width-chart">
                 <h3 class="chart-title">📈 Promedio de Gasto por Item</h3>
                 <div class="chart-container">
-                    <canvas id="lineChart"></canvas>
+                    {contenido_grafico('lineChart')}
                 </div>
             </div>
         </div>
@@ -243,6 +548,32 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
                     </tr>''')
     html_content += ''.join(filas_tabla)
     
+    # Sección opcional con las transferencias para saldar la cuenta
+    seccion_transferencias = ''
+    if transferencias is not None and len(transferencias):
+        filas_transferencias = ''.join(f'''
+                    <tr>
+                        <td>{fila['De']}</td>
+                        <td>{fila['Para']}</td>
+                        <td>{format_currency(fila['Monto'])}</td>
+                    </tr>''' for fila in transferencias.to_dict('records'))
+        seccion_transferencias = f'''
+        <div class="table-container">
+            <h3 class="chart-title">💸 Transferencias para Saldar</h3>
+            <table class="data-table">
+                <thead>
+                    <tr>
+                        <th>Paga</th>
+                        <th>Recibe</th>
+                        <th>Monto</th>
+                    </tr>
+                </thead>
+                <tbody>{filas_transferencias}
+                </tbody>
+            </table>
+        </div>
+'''
+    
     # Agregar fila de totales
     totales = data['totales']
     html_content += f'''
@@ -257,53 +588,38 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
                 </tbody>
             </table>
         </div>
-
+{seccion_transferencias}
         <div class="table-container">
             <h3 class="chart-title">�🛍️ Productos por Responsable</h3>
             <div class="productos-grid">'''
     
-    # Convertir a diccionarios para acceso más rápido
-    productos_dict = {row['Responsable']: row for row in tabla_productos.to_dict('records')}
-    precio_cols = [col for col in tabla_precios.columns if col.startswith('Precio_')]
-    
     # Agregar productos con precios usando list para acumular y join al final
     cards_html = []
-    for row_precios in tabla_precios.to_dict('records'):
-        responsable = row_precios['Responsable']
-        producto_row = productos_dict[responsable]
-        
+    for detalle in obtener_detalle_por_responsable(tabla_productos, tabla_precios, propina_porcentaje):
         # Construir items
-        items_html = []
-        for col in precio_cols:
-            if row_precios[col] and row_precios[col] != '':
-                item_num = col.split('_')[1]
-                producto_col = f'Item_{item_num}'
-                producto_nombre = producto_row.get(producto_col, '')
-                
-                if producto_nombre:
-                    items_html.append(f'''
+        items_html = [f'''
                     <div class="producto-item">
                         <span class="producto-nombre">{producto_nombre}</span>
-                        <span class="producto-precio">{row_precios[col]}</span>
-                    </div>''')
+                        <span class="producto-precio">{precio}</span>
+                    </div>''' for producto_nombre, precio in detalle['items']]
         
         # Construir card completa
         cards_html.append(f'''
                 <div class="producto-card">
-                    <h4>{responsable}</h4>
+                    <h4>{detalle['responsable']}</h4>
                     {''.join(items_html)}
                     <div class="totales-card">
                         <div class="total-item">
                             <span>Subtotal:</span>
-                            <span>{row_precios['Subtotal']}</span>
+                            <span>{detalle['subtotal']}</span>
                         </div>
                         <div class="total-item">
                             <span>Propina ({propina_porcentaje}%):</span>
-                            <span>{row_precios[f'Propina ({propina_porcentaje}%)']}</span>
+                            <span>{detalle['propina']}</span>
                         </div>
                         <div class="total-item final">
                             <span>Total a Pagar:</span>
-                            <span>{row_precios['Total a Pagar']}</span>
+                            <span>{detalle['total']}</span>
                         </div>
                     </div>
                 </div>''')
@@ -316,232 +632,354 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
         </div>
     </div>
 
+    <script type="application/json" id="datos">{datos_json}</script>
     <script>
-        // Datos generados desde Python
-        const gastosData = {json.dumps(data, ensure_ascii=False, indent=8)};
+        // Datos generados desde Python (como JSON aparte para medir su parseo, igual que en el shell)
+        performance.mark('datos-inicio');
+        const gastosData = JSON.parse(document.getElementById('datos').textContent);
+        performance.mark('datos-fin');
+        performance.measure('datos', 'datos-inicio', 'datos-fin');
 
-        const COLORES = [
-            '#00d4ff',  // Celeste brillante
-            '#ff6b6b',  // Rojo coral
-            '#4ecdc4',  // Turquesa
-            '#f9ca24',  // Amarillo oro
-            '#6c5ce7',  // Púrpura
-            '#26de81',  // Verde esmeralda
-            '#fd79a8',  // Rosa chicle
-            '#fdcb6e',  // Amarillo suave
-            '#a55eea',  // Lila
-            '#520325',  // Rojizo oscuro
-            '#ff9f43',  // Naranja mandarina
-            '#ee5a6f',  // Rojo sandía
-            '#0fb9b1',  // Verde azulado
-            '#2ed573',  // Verde lima
-            '#ffa502',  // Naranja fuerte
-            '#ff6348',  // Rojo salmón
-            '#747d8c',  // Gris azulado
-            '#5f27cd',  // Púrpura oscuro
-            '#00d2d3',  // Cian
-            '#ff9ff3'   // Rosa lavanda
-        ];
+{SCRIPT_GRAFICOS}
 
-        function formatCurrency(value) {{
-            return new Intl.NumberFormat('es-CL', {{
-                style: 'currency',
-                currency: 'CLP'
-            }}).format(value);
+        // Inicializar la aplicación
+        function inicializarApp() {{{inicializar_graficos}
+            marcarListo();
         }}
 
-        function crearGraficoBarras(data) {{
-            const ctx = document.getElementById('barChart').getContext('2d');
-            new Chart(ctx, {{
-                type: 'bar',
-                data: {{
-                    labels: data.estadisticas.map(item => item.responsable),
-                    datasets: [{{
-                        label: 'Total con Propina',
-                        data: data.estadisticas.map(item => item.totalConPropina),
-                        backgroundColor: COLORES,
-                        borderColor: COLORES.map(color => color + 'AA'),
-                        borderWidth: 2,
-                        borderRadius: 8,
-                        borderSkipped: false,
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{ display: false }},
-                        tooltip: {{
-                            backgroundColor: 'rgba(0, 0, 0, 0.8)',
-                            titleColor: '#00d4ff',
-                            bodyColor: '#fff',
-                            borderColor: '#00d4ff',
-                            borderWidth: 1,
-                            callbacks: {{
-                                label: function(context) {{
-                                    return formatCurrency(context.parsed.y);
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        x: {{
-                            ticks: {{
-                                color: '#a8b2d1'
-                            }},
-                            grid: {{
-                                color: '#333'
-                            }}
-                        }},
-                        y: {{
-                            beginAtZero: true,
-                            ticks: {{
-                                color: '#a8b2d1',
-                                callback: function(value) {{
-                                    return formatCurrency(value);
-                                }}
-                            }},
-                            grid: {{
-                                color: '#333'
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-        }}
+        // Esperar a que se cargue la página
+        document.addEventListener('DOMContentLoaded', function() {{
+            setTimeout(inicializarApp, 100);
+        }});
+    </script>
+    <footer style="text-align: center; padding: 0; margin: 0; font-size: 11px; color: #888; line-height: 1.3;">
+        <p style="margin: 0; padding-top: 5px;">
+            Este proyecto es de código abierto bajo la 
+            <a href="https://opensource.org/licenses/MIT" target="_blank" style="color: #666; text-decoration: none;">Licencia MIT</a>
+        </p>
+        <p style="margin: 0;">
+            Creado por <a href="https://github.com/Deathsoul56" target="_blank" style="color: #666; text-decoration: none; font-weight: 500;">Deathsoul56</a>
+        </p>
+    </footer>
+</body>
+</html>'''
+    
+    # Guardar archivo
+    with open(ruta_archivo, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    
+    print(f"\n✅ Dashboard HTML generado: {ruta_archivo}")
+    return ruta_archivo
 
-        function crearGraficoTorta(data) {{
-            const ctx = document.getElementById('pieChart').getContext('2d');
-            new Chart(ctx, {{
-                type: 'doughnut',
-                data: {{
-                    labels: data.estadisticas.map(item => item.responsable),
-                    datasets: [{{
-                        data: data.estadisticas.map(item => item.totalConPropina),
-                        backgroundColor: COLORES,
-                        borderColor: '#000',
-                        borderWidth: 2,
-                        hoverOffset: 10
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{
-                            position: 'bottom',
-                            labels: {{
-                                padding: 20,
-                                usePointStyle: true,
-                                font: {{ size: 12 }},
-                                color: '#a8b2d1'
-                            }}
-                        }},
-                        tooltip: {{
-                            backgroundColor: 'rgba(0, 0, 0, 0.8)',
-                            titleColor: '#00d4ff',
-                            bodyColor: '#fff',
-                            borderColor: '#00d4ff',
-                            borderWidth: 1,
-                            callbacks: {{
-                                label: function(context) {{
-                                    const label = context.label || '';
-                                    const value = formatCurrency(context.parsed);
-                                    const total = context.dataset.data.reduce((sum, val) => sum + val, 0);
-                                    const percentage = ((context.parsed / total) * 100).toFixed(1);
-                                    return `${{label}}: ${{value}} (${{percentage}}%)`;
-                                }}
-                            }}
-                        }}
-                    }}
-                }}
-            }});
+
+# Versión del shell compartido; cambiarla invalida la copia en caché de los navegadores
+VERSION_SHELL = '4'
+
+
+def generar_datos_dashboard(stats_responsables, tabla_productos, tabla_precios,
+                            total_cuenta, total_con_propina, propina_porcentaje, fecha=None,
+                            transferencias=None):
+    """
+    Genera todos los datos que necesita el shell para dibujar el dashboard en el navegador
+    
+    Args:
+        stats_responsables: DataFrame con estadísticas por responsable
+        tabla_productos: DataFrame con productos por responsable  
+        tabla_precios: DataFrame con precios por responsable
+        total_cuenta: Total sin propina
+        total_con_propina: Total con propina
+        propina_porcentaje: Porcentaje de propina aplicado
+        fecha: Fecha del reporte (opcional)
+        transferencias: DataFrame De/Para/Monto de liquidacion.calcular_transferencias (opcional)
+    
+    Returns:
+        dict: Datos de generar_datos_json más el detalle por responsable y las transferencias
+    """
+    data = generar_datos_json(stats_responsables, tabla_productos, tabla_precios,
+                              total_cuenta, total_con_propina, propina_porcentaje, fecha)
+    data['detalle'] = [
+        {**detalle, 'items': [list(item) for item in detalle['items']]}
+        for detalle in obtener_detalle_por_responsable(tabla_productos, tabla_precios, propina_porcentaje)
+    ]
+    if transferencias is not None and len(transferencias):
+        data['transferencias'] = [
+            {'de': fila['De'], 'para': fila['Para'], 'monto': int(fila['Monto'])}
+            for fila in transferencias.to_dict('records')
+        ]
+    return data
+
+
+def generar_dashboard_json(stats_responsables, tabla_productos, tabla_precios,
+                           total_cuenta, total_con_propina, propina_porcentaje, fecha=None,
+                           nombre_archivo="dashboard_gastos.json", transferencias=None, compresion=None):
+    """
+    Genera el JSON de una boleta para el shell compartido (y el shell si aún no existe).
+    El JSON pesa pocos kilobytes; el HTML, CSS y JS viven una sola vez en el shell.
+    
+    Args:
+        stats_responsables: DataFrame con estadísticas por responsable
+        tabla_productos: DataFrame con productos por responsable  
+        tabla_precios: DataFrame con precios por responsable
+        total_cuenta: Total sin propina
+        total_con_propina: Total con propina
+        propina_porcentaje: Porcentaje de propina aplicado
+        fecha: Fecha del reporte (opcional)
+        nombre_archivo: Nombre del archivo JSON, relativo a reportes/datos (puede incluir subdirectorios)
+        transferencias: DataFrame De/Para/Monto (opcional)
+        compresion: None, 'gzip' o 'brotli' para guardar además una copia pre-comprimida
+    
+    Returns:
+        str: Ruta del shell con el parámetro ?datos= que apunta al JSON generado
+    """
+    data = generar_datos_dashboard(stats_responsables, tabla_productos, tabla_precios,
+                                   total_cuenta, total_con_propina, propina_porcentaje, fecha,
+                                   transferencias)
+    contenido = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    ruta_json = os.path.join("reportes", "datos", nombre_archivo)
+    os.makedirs(os.path.dirname(ruta_json), exist_ok=True)
+    with open(ruta_json, 'wb') as f:
+        f.write(contenido)
+    
+    # Copia para abrir el shell desde el disco: los navegadores no permiten leer el JSON
+    # desde file://, pero sí cargar un <script> que deja el mismo texto en window.datosInyectados
+    with open(f"{os.path.splitext(ruta_json)[0]}.js", 'w', encoding='utf-8') as f:
+        f.write(f"window.datosInyectados = {json.dumps(contenido.decode('utf-8'))};\n")
+    
+    # Copia pre-comprimida para servirla directamente (ej. gzip_static de nginx)
+    if compresion == 'gzip':
+        import gzip
+        with open(f"{ruta_json}.gz", 'wb') as f:
+            f.write(gzip.compress(contenido, compresslevel=9, mtime=0))
+    elif compresion == 'brotli':
+        if not BROTLI_DISPONIBLE:
+            raise RuntimeError("brotli no está instalado. Instala con: pip install brotli")
+        with open(f"{ruta_json}.br", 'wb') as f:
+            f.write(brotli.compress(contenido))
+    elif compresion is not None:
+        raise ValueError(f"Compresión desconocida: {compresion}")
+    
+    ruta_shell = generar_shell_dashboard()
+    print(f"\n✅ Datos del dashboard generados: {ruta_json}")
+    return f"{ruta_shell}?datos=datos/{nombre_archivo.replace(os.sep, '/')}"
+
+
+def generar_shell_dashboard(directorio="reportes"):
+    """
+    Genera el shell HTML versionado que carga los datos de cualquier boleta desde
+    un JSON (?datos=datos/<archivo>.json). Se escribe una sola vez por versión.
+    
+    Args:
+        directorio: Carpeta donde se guarda el shell
+    
+    Returns:
+        str: Ruta del shell
+    """
+    ruta_shell = os.path.join(directorio, f"dashboard_shell_v{VERSION_SHELL}.html")
+    if os.path.exists(ruta_shell):
+        return ruta_shell
+    
+    html_content = f'''<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Análisis de Gastos Compartidos</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+{ESTILOS_DASHBOARD}
+    </style>
+</head>
+<body>
+    <div class="app">
+        <div class="header">
+            <h1>📊 Análisis de Gastos Compartidos</h1>
+            <p id="fechaReporte"></p>
+        </div>
+
+        <div class="summary-cards" id="tarjetas"></div>
+
+        <div class="charts-container">
+            <div class="chart-card">
+                <h3 class="chart-title">💰 Gastos por Responsable</h3>
+                <div class="chart-container small">
+                    <canvas id="barChart"></canvas>
+                </div>
+            </div>
+            
+            <div class="chart-card">
+                <h3 class="chart-title">🥧 Distribución de Gastos</h3>
+                <div class="chart-container small">
+                    <canvas id="pieChart"></canvas>
+                </div>
+            </div>
+            
+            <div class="chart-card full-width-chart">
+                <h3 class="chart-title">📈 Promedio de Gasto por Item</h3>
+                <div class="chart-container">
+                    <canvas id="lineChart"></canvas>
+                </div>
+            </div>
+        </div>
+
+        <div class="table-container">
+            <h3 class="chart-title">📋 Detalle por Responsable</h3>
+            <table class="data-table">
+                <thead>
+                    <tr>
+                        <th>Responsable</th>
+                        <th>Total Gastado</th>
+                        <th>Total c/Propina</th>
+                        <th>Cantidad Items</th>
+                        <th>% del Total</th>
+                        <th>Promedio por Item</th>
+                    </tr>
+                </thead>
+                <tbody id="tablaDetalle"></tbody>
+            </table>
+        </div>
+
+        <div id="seccionTransferencias"></div>
+
+        <div class="table-container">
+            <h3 class="chart-title">🛍️ Productos por Responsable</h3>
+            <div class="productos-grid" id="productosGrid"></div>
+        </div>
+    </div>
+
+    <script>
+        // Datos cargados desde el JSON de la boleta
+        let gastosData = null;
+
+{SCRIPT_GRAFICOS}
+
+        function escaparHtml(texto) {{
+            const div = document.createElement('div');
+            div.textContent = String(texto);
+            return div.innerHTML;
         }}
 
+        // Mismo formato que format_currency en Python ($12.345)
+        function formatoPesos(value) {{
+            return '$' + Math.trunc(value).toString().replace(/\\B(?=(\\d{{3}})+(?!\\d))/g, '.');
+        }}
 
-        function crearGraficoLineas(data) {{
-            const ctx = document.getElementById('lineChart').getContext('2d');
-            // Calcular y ordenar promedios
-            const promedios = data.estadisticas
-                .map(item => ({{
-                    responsable: item.responsable,
-                    promedio: item.totalConPropina / item.cantidadItems
-                }}))
-                .sort((a, b) => a.promedio - b.promedio);
+        function renderizarTablas(data) {{
+            const resumen = data.resumen;
+            document.getElementById('fechaReporte').textContent = `Reporte generado el ${{resumen.fecha}}`;
 
-            new Chart(ctx, {{
-                type: 'line',
-                data: {{
-                    labels: promedios.map(item => item.responsable),
-                    datasets: [{{
-                        label: 'Promedio por Item',
-                        data: promedios.map(item => item.promedio),
-                        borderColor: '#4ecdc4',
-                        backgroundColor: 'rgba(78, 205, 196, 0.1)',
-                        borderWidth: 3,
-                        pointBackgroundColor: '#4ecdc4',
-                        pointBorderColor: '#000',
-                        pointBorderWidth: 2,
-                        pointRadius: 8,
-                        pointHoverRadius: 12,
-                        fill: true,
-                        tension: 0.4
-                    }}]
-                }},
-                options: {{
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {{
-                        legend: {{ display: false }},
-                        tooltip: {{
-                            backgroundColor: 'rgba(0, 0, 0, 0.8)',
-                            titleColor: '#00d4ff',
-                            bodyColor: '#fff',
-                            borderColor: '#00d4ff',
-                            borderWidth: 1,
-                            callbacks: {{
-                                label: function(context) {{
-                                    return `Promedio: ${{formatCurrency(context.parsed.y)}}`;
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        x: {{
-                            ticks: {{
-                                color: '#a8b2d1'
-                            }},
-                            grid: {{
-                                color: '#333'
-                            }}
-                        }},
-                        y: {{
-                            beginAtZero: true,
-                            ticks: {{
-                                color: '#a8b2d1',
-                                callback: function(value) {{
-                                    return formatCurrency(value);
-                                }}
-                            }},
-                            grid: {{
-                                color: '#333'
-                            }}
-                        }}
-                    }}
-                }}
+            const tarjetas = [
+                ['💰', formatoPesos(resumen.totalSinPropina), 'Total sin Propina', ''],
+                ['🎯', formatoPesos(resumen.totalConPropina), 'Total con Propina', 'color: #ff9f1c;'],
+                ['👥', resumen.numeroResponsables, 'Responsables', 'color: #27ae60;'],
+                ['📈', `${{resumen.propinaAplicada}}%`, 'Propina Aplicada', 'color: #f24e1e;']
+            ];
+            document.getElementById('tarjetas').innerHTML = tarjetas.map(([icono, valor, etiqueta, estilo]) => `
+                <div class="card">
+                    <div class="card-icon">${{icono}}</div>
+                    <div class="card-value" style="${{estilo}}">${{valor}}</div>
+                    <div class="card-label">${{etiqueta}}</div>
+                </div>`).join('');
+
+            const totales = data.totales;
+            document.getElementById('tablaDetalle').innerHTML = data.estadisticas.map(stat => `
+                <tr>
+                    <td>${{escaparHtml(stat.responsable)}}</td>
+                    <td>${{formatoPesos(stat.totalGastado)}}</td>
+                    <td>${{formatoPesos(stat.totalConPropina)}}</td>
+                    <td>${{stat.cantidadItems}}</td>
+                    <td>${{stat.porcentajeCuenta.toFixed(2)}}%</td>
+                    <td>${{formatoPesos(stat.totalConPropina / stat.cantidadItems)}}</td>
+                </tr>`).join('') + `
+                <tr class="total-row">
+                    <td>TOTAL</td>
+                    <td>${{formatoPesos(totales.totalGastado)}}</td>
+                    <td>${{formatoPesos(totales.totalConPropina)}}</td>
+                    <td>${{totales.cantidadItems}}</td>
+                    <td>100.00%</td>
+                    <td>${{formatoPesos(totales.totalConPropina / totales.cantidadItems)}}</td>
+                </tr>`;
+
+            if (data.transferencias && data.transferencias.length) {{
+                document.getElementById('seccionTransferencias').innerHTML = `
+                <div class="table-container">
+                    <h3 class="chart-title">💸 Transferencias para Saldar</h3>
+                    <table class="data-table">
+                        <thead><tr><th>Paga</th><th>Recibe</th><th>Monto</th></tr></thead>
+                        <tbody>${{data.transferencias.map(t => `
+                            <tr>
+                                <td>${{escaparHtml(t.de)}}</td>
+                                <td>${{escaparHtml(t.para)}}</td>
+                                <td>${{formatoPesos(t.monto)}}</td>
+                            </tr>`).join('')}}
+                        </tbody>
+                    </table>
+                </div>`;
+            }}
+
+            const propina = resumen.propinaAplicada;
+            document.getElementById('productosGrid').innerHTML = data.detalle.map(detalle => `
+                <div class="producto-card">
+                    <h4>${{escaparHtml(detalle.responsable)}}</h4>
+                    ${{detalle.items.map(([producto, precio]) => `
+                    <div class="producto-item">
+                        <span class="producto-nombre">${{escaparHtml(producto)}}</span>
+                        <span class="producto-precio">${{escaparHtml(precio)}}</span>
+                    </div>`).join('')}}
+                    <div class="totales-card">
+                        <div class="total-item"><span>Subtotal:</span><span>${{escaparHtml(detalle.subtotal)}}</span></div>
+                        <div class="total-item"><span>Propina (${{propina}}%):</span><span>${{escaparHtml(detalle.propina)}}</span></div>
+                        <div class="total-item final"><span>Total a Pagar:</span><span>${{escaparHtml(detalle.total)}}</span></div>
+                    </div>
+                </div>`).join('');
+        }}
+
+        // Texto del JSON de la boleta. Quien abre la página (PDF, mediciones) puede inyectarlo;
+        // desde el disco (file://) Chromium y Firefox bloquean fetch y XHR, así que se carga la
+        // copia <datos>.js con una etiqueta <script>, que sí se permite; por HTTP se usa fetch
+        function leerDatos(ruta) {{
+            if (typeof window.datosInyectados === 'string') {{
+                return Promise.resolve(window.datosInyectados);
+            }}
+            if (window.location.protocol === 'file:') {{
+                return new Promise((resolver, rechazar) => {{
+                    const script = document.createElement('script');
+                    script.src = ruta.replace(/\\.json$/, '.js');
+                    script.onload = () => typeof window.datosInyectados === 'string'
+                        ? resolver(window.datosInyectados)
+                        : rechazar(new Error(`${{script.src}} no definió los datos`));
+                    script.onerror = () => rechazar(new Error(`no se pudo leer ${{script.src}}`));
+                    document.head.appendChild(script);
+                }});
+            }}
+            return fetch(ruta).then(respuesta => {{
+                if (!respuesta.ok) throw new Error(`${{ruta}}: HTTP ${{respuesta.status}}`);
+                return respuesta.text();
             }});
         }}
 
-        // Inicializar la aplicación
-        function inicializarApp() {{
-            crearGraficoBarras(gastosData);
-            crearGraficoTorta(gastosData);
-            crearGraficoLineas(gastosData);
+        // Cargar el JSON indicado en ?datos= y dibujar el dashboard
+        async function inicializarApp() {{
+            const rutaDatos = new URLSearchParams(window.location.search).get('datos');
+            if (!rutaDatos) {{
+                document.getElementById('fechaReporte').textContent = 'Falta el parámetro ?datos= con el JSON de la boleta';
+                return;
+            }}
+            performance.mark('datos-inicio');
+            gastosData = JSON.parse(await leerDatos(rutaDatos));
+            performance.mark('datos-fin');
+            performance.measure('datos', 'datos-inicio', 'datos-fin');
+            medir('tablas', () => renderizarTablas(gastosData));
+            medir('grafico-barras', () => crearGraficoBarras(gastosData));
+            medir('grafico-torta', () => crearGraficoTorta(gastosData));
+            medir('grafico-lineas', () => crearGraficoLineas(gastosData));
+            marcarListo();
         }}
 
-        // Esperar a que se cargue la página
         document.addEventListener('DOMContentLoaded', function() {{
-            setTimeout(inicializarApp, 100);
+            inicializarApp().catch(error => {{
+                document.getElementById('fechaReporte').textContent = `No se pudieron cargar los datos: ${{error}}`;
+            }});
         }});
     </script>
     <footer style="text-align: center; padding: 0; margin: 0; font-size: 11px; color: #888; line-height: 1.3;">
@@ -556,13 +994,121 @@ def generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
 </body>
 </html>'''
     
-    # Guardar archivo
-    ruta_archivo = os.path.join("reportes", nombre_archivo)
-    with open(ruta_archivo, 'w', encoding='utf-8') as f:
+    os.makedirs(directorio, exist_ok=True)
+    # Escribir a un temporal y renombrar: varios procesos pueden crear el shell a la vez
+    ruta_temporal = f"{ruta_shell}.{os.getpid()}.tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as f:
         f.write(html_content)
+    os.replace(ruta_temporal, ruta_shell)
     
-    print(f"\n✅ Dashboard HTML generado: {ruta_archivo}")
-    return ruta_archivo
+    print(f"\n✅ Shell del dashboard generado: {ruta_shell}")
+    return ruta_shell
+
+
+# Perfiles de exportación del PDF. 'archivo' conserva la página tal cual, con los gráficos como
+# vectores (degradados y sombras incluidos en Chromium). En Chromium, 'compacto' convierte los
+# gráficos en JPEG a la resolución indicada y quita degradados y sombras, que Chromium convierte
+# en imágenes. El motor nativo no usa 'dpi' ni 'calidad_jpeg': matplotlib guarda las imágenes sin
+# pérdida, así que su perfil compacto dibuja los gráficos como vectores (más livianos que cualquier
+# imagen) con la compresión zlib de 'compresion' (Chromium no permite elegirla). Las fuentes se
+# incrustan solo con los glifos usados en ambos motores; con 'fuentes_base' el motor nativo usa
+# las fuentes estándar del PDF, que no se incrustan, si todo el texto cabe en ellas.
+PERFILES_PDF = {
+    'archivo': {'graficos_livianos': False, 'dpi': None, 'calidad_jpeg': None, 'efectos': True, 'compresion': 6,
+                'fuentes_base': False},
+    'compacto': {'graficos_livianos': True, 'dpi': 110, 'calidad_jpeg': 0.8, 'efectos': False, 'compresion': 9,
+                 'fuentes_base': True},
+}
+
+# Helvetica es una de las 14 fuentes estándar que todo lector de PDF trae; solo cubre WinAnsi (cp1252)
+OPCIONES_FUENTES_BASE_PDF = {'pdf.use14corefonts': True, 'font.family': 'sans-serif',
+                             'font.sans-serif': ['Helvetica']}
+
+# Estilos que reemplazan degradados, sombras y animaciones por colores planos (perfil compacto)
+ESTILOS_PDF_COMPACTO = '''
+    *, *::before, *::after { box-shadow: none !important; text-shadow: none !important;
+                             animation: none !important; transition: none !important; }
+    body { background: #0f0f23 !important; }
+    .header, .card, .table-container { background: #16213e !important; }
+    .producto-card { background: #1a2540 !important; }
+'''
+
+# Reemplaza cada canvas por un JPEG a la escala pedida (perfil compacto)
+SCRIPT_RASTERIZAR_GRAFICOS = """
+    async ([escala, calidad]) => {
+        for (const canvas of Array.from(document.querySelectorAll('canvas'))) {
+            const ancho = canvas.clientWidth, alto = canvas.clientHeight;
+            const copia = document.createElement('canvas');
+            copia.width = Math.max(1, Math.round(ancho * escala));
+            copia.height = Math.max(1, Math.round(alto * escala));
+            const ctx = copia.getContext('2d');
+            ctx.fillStyle = '#000';  // fondo de .chart-card; JPEG no tiene transparencia
+            ctx.fillRect(0, 0, copia.width, copia.height);
+            ctx.drawImage(canvas, 0, 0, copia.width, copia.height);
+            const img = document.createElement('img');
+            img.src = copia.toDataURL('image/jpeg', calidad);
+            img.style.width = `${ancho}px`;
+            img.style.height = `${alto}px`;
+            await img.decode();
+            canvas.replaceWith(img);
+        }
+    }
+"""
+
+
+# Formato de las páginas del PDF paginado (tamaño, orientación y ancho útil en px a 96 DPI)
+PAGINA_PDF = {'formato': 'A4', 'horizontal': True, 'margen': '10mm', 'ancho_util': 1047}
+
+# Estilos de impresión del PDF paginado: cada sección empieza en una página nueva, las tarjetas
+# y filas no se cortan y los encabezados de las tablas se repiten en cada página
+ESTILOS_PDF_PAGINADO = '''
+    body { min-height: 0 !important; }
+    .table-container { overflow: visible !important; break-before: page; }
+    .card, .chart-card, .producto-card, .data-table tr { break-inside: avoid; }
+    .data-table thead { display: table-header-group; }
+    .data-table tfoot { display: table-footer-group; }
+    footer { break-inside: avoid; }
+'''
+
+# Número de página en el margen inferior
+PIE_PDF_PAGINADO = (
+    '<div style="width: 100%; font-size: 8px; color: #888; text-align: center;">'
+    '<span class="pageNumber"></span> / <span class="totalPages"></span></div>'
+)
+
+
+def obtener_perfil_pdf(perfil_pdf):
+    """
+    Args:
+        perfil_pdf: Nombre del perfil ('archivo' o 'compacto')
+
+    Returns:
+        dict: Opciones del perfil
+    """
+    if perfil_pdf not in PERFILES_PDF:
+        raise ValueError(f"Perfil de PDF desconocido: {perfil_pdf}")
+    return PERFILES_PDF[perfil_pdf]
+
+
+def informar_pdf(ruta_pdf, perfil_pdf, inicio):
+    """
+    Muestra el tamaño y el tiempo de generación de un PDF
+
+    Args:
+        ruta_pdf: Ruta del PDF generado
+        perfil_pdf: Perfil usado
+        inicio: Valor de time.perf_counter() al comenzar la generación
+
+    Returns:
+        dict: {'perfil', 'bytes', 'segundos'}
+    """
+    medicion = {
+        'perfil': perfil_pdf,
+        'bytes': os.path.getsize(ruta_pdf),
+        'segundos': round(time.perf_counter() - inicio, 3),
+    }
+    print(f"📦 PDF perfil '{perfil_pdf}': {medicion['bytes'] / 1024:.1f} KB en {medicion['segundos']:.2f} s")
+    return medicion
 
 
 def convertir_html_a_pdf(ruta_html, nombre_pdf="dashboard_gastos.pdf"):
@@ -577,6 +1123,84 @@ def convertir_html_a_pdf(ruta_html, nombre_pdf="dashboard_gastos.pdf"):
     Returns:
         str: Ruta del archivo PDF generado o None si hay error
     """
+    artefactos = capturar_artefactos(ruta_html, nombre_pdf)
+    return artefactos['pdf'] if artefactos else None
+
+
+def inyectar_datos_shell(page, ruta_html, consulta):
+    """
+    Entrega al shell compartido el JSON de su ?datos= antes de cargarlo.
+    Chromium no permite fetch ni XHR de file://; así el shell no depende de la copia
+    <datos>.js (que falta en los JSON generados antes de la versión 4 del shell).
+    
+    Args:
+        page: Página de Playwright (aún sin navegar)
+        ruta_html: Ruta del shell
+        consulta: Query string de la URL (ej. 'datos=datos/2026/01/15/dashboard.json')
+    """
+    ruta_datos = parse_qs(consulta).get('datos', [None])[0]
+    if not ruta_datos:
+        return
+    with open(os.path.join(os.path.dirname(ruta_html), ruta_datos), encoding='utf-8') as f:
+        texto = f.read()
+    # El shell lo parsea igual que si lo hubiera descargado
+    page.add_init_script(script=f"window.datosInyectados = {json.dumps(texto)};")
+
+
+def capturar_imagenes_graficos(page, ruta_html, base):
+    """
+    Guarda un PNG por cada gráfico del dashboard ya cargado. Los gráficos de Chart.js se
+    capturan desde su <canvas>; con Config.GRAFICOS_ESTATICOS el dashboard muestra <img>
+    que ya son el PNG del gráfico, así que se copia el archivo en vez de volver a capturarlo.
+    
+    Args:
+        page: Página de Playwright con el dashboard cargado
+        ruta_html: Ruta del HTML (las imágenes estáticas son relativas a su carpeta)
+        base: Prefijo de los archivos (<base>_<id>.png, dentro de reportes/)
+    
+    Returns:
+        dict: {id_grafico: ruta_png}
+    """
+    graficos = {}
+    for elemento in page.locator('.chart-container canvas, .chart-container img').all():
+        id_grafico = elemento.get_attribute('id')
+        ruta_grafico = os.path.join("reportes", f"{base}_{id_grafico}.png")
+        if elemento.evaluate("elemento => elemento.tagName") == 'IMG':
+            origen = os.path.join(os.path.dirname(ruta_html), unquote(elemento.get_attribute('src')))
+            shutil.copyfile(origen, ruta_grafico)
+        else:
+            elemento.screenshot(path=ruta_grafico)
+        graficos[id_grafico] = ruta_grafico
+    
+    if not graficos:
+        print("⚠️  El dashboard no tiene gráficos para capturar")
+    return graficos
+
+
+def capturar_artefactos(ruta_html, nombre_pdf="dashboard_gastos.pdf", nombre_png=None,
+                        recorte_png='completa', capturar_graficos=False, nombre_datos=None,
+                        perfil_pdf='archivo', paginado=False):
+    """
+    Genera varios artefactos a partir de una sola carga del dashboard en Chromium:
+    el PDF, una miniatura PNG, una imagen por gráfico y los datos del reporte.
+    El costo de abrir el navegador y renderizar la página se paga una sola vez.
+    
+    Args:
+        ruta_html: Ruta del archivo HTML a convertir (admite '?datos=...' para el shell compartido)
+        nombre_pdf: Nombre del archivo PDF de salida (None para omitirlo)
+        nombre_png: Nombre de la miniatura PNG (None para omitirla)
+        recorte_png: 'completa' para toda la página o 'resumen' para encabezado, tarjetas y gráficos
+        capturar_graficos: Guardar un PNG por cada gráfico (<base>_<id>.png)
+        nombre_datos: Nombre del JSON con los datos del dashboard (None para omitirlo)
+        perfil_pdf: 'archivo' (página tal cual) o 'compacto' (gráficos en JPEG, sin degradados
+                    ni sombras); ver PERFILES_PDF
+        paginado: Repartir el dashboard en páginas PAGINA_PDF (secciones en páginas nuevas y
+                  encabezados de tabla repetidos) en vez de una sola página del alto del contenido
+    
+    Returns:
+        dict: Rutas generadas ('pdf', 'png', 'graficos', 'datos'), el tamaño y tiempo del
+        PDF ('medicion_pdf') o None si hay error
+    """
     
     if not PLAYWRIGHT_DISPONIBLE:
         print("❌ Playwright no está instalado. Instala con:")
@@ -584,58 +1208,456 @@ def convertir_html_a_pdf(ruta_html, nombre_pdf="dashboard_gastos.pdf"):
         print("   playwright install chromium")
         return None
     
+    if recorte_png not in ('completa', 'resumen'):
+        raise ValueError(f"Recorte de miniatura desconocido: {recorte_png}")
+    perfil = obtener_perfil_pdf(perfil_pdf)
+    
+    artefactos = {'pdf': None, 'png': None, 'graficos': {}, 'datos': None, 'medicion_pdf': None}
+    inicio = time.perf_counter()
+    
     try:
         print("\n📸 Generando PDF desde HTML...")
         
+        # El shell compartido recibe el JSON de la boleta como ?datos=
+        ruta_html, _, consulta = ruta_html.partition('?')
+        
         with sync_playwright() as p:
             browser = p.chromium.launch()
             page = browser.new_page()
+            if consulta:
+                inyectar_datos_shell(page, ruta_html, consulta)
             
             # Cargar el archivo HTML
             ruta_completa = os.path.abspath(ruta_html)
-            page.goto(f"file:///{ruta_completa}")
+            page.goto(f"file:///{ruta_completa}" + (f"?{consulta}" if consulta else ""))
             
-            # Esperar a que se carguen los gráficos de Chart.js
+            # Esperar a que el shell dibuje los datos y a que se carguen los gráficos de Chart.js
+            if consulta:
+                page.wait_for_selector('body[data-listo]', state='attached')
             page.wait_for_timeout(2000)
             
-            # Obtener dimensiones del contenido
-            dimensiones = page.evaluate("""
-                () => {
-                    const body = document.body;
-                    const html = document.documentElement;
-                    const height = Math.max(
-                        body.scrollHeight,
-                        body.offsetHeight,
-                        html.clientHeight,
-                        html.scrollHeight,
-                        html.offsetHeight
-                    );
-                    const width = Math.max(
-                        body.scrollWidth,
-                        body.offsetWidth,
-                        html.clientWidth,
-                        html.scrollWidth,
-                        html.offsetWidth
-                    );
-                    return { width, height };
-                }
-            """)
+            # Miniatura PNG de la página completa o solo de la parte superior
+            if nombre_png:
+                ruta_png = os.path.join("reportes", nombre_png)
+                if recorte_png == 'resumen':
+                    caja = page.locator('.charts-container').bounding_box()
+                    page.screenshot(path=ruta_png, full_page=True, clip={
+                        'x': 0, 'y': 0,
+                        'width': page.viewport_size['width'],
+                        'height': caja['y'] + caja['height']
+                    })
+                else:
+                    page.screenshot(path=ruta_png, full_page=True)
+                artefactos['png'] = ruta_png
             
-            # Generar PDF ajustado al contenido sin márgenes
-            ruta_pdf = os.path.join("reportes", nombre_pdf)
-            page.pdf(
-                path=ruta_pdf,
-                width=f"{dimensiones['width']}px",
-                height=f"{dimensiones['height']}px",
-                print_background=True,
-                margin={'top': '0', 'bottom': '0', 'left': '0', 'right': '0'}
-            )
+            # Una imagen por gráfico
+            if capturar_graficos:
+                base = os.path.splitext(nombre_png or nombre_pdf or os.path.basename(ruta_html))[0]
+                artefactos['graficos'] = capturar_imagenes_graficos(page, ruta_html, base)
+            
+            # Datos tal como los usó la página
+            if nombre_datos:
+                ruta_datos = os.path.join("reportes", nombre_datos)
+                with open(ruta_datos, 'w', encoding='utf-8') as f:
+                    json.dump(page.evaluate("() => gastosData"), f, ensure_ascii=False, indent=2)
+                artefactos['datos'] = ruta_datos
+            
+            if nombre_pdf:
+                # Perfil compacto: colores planos y gráficos como JPEG (después de las capturas)
+                if not perfil['efectos']:
+                    page.add_style_tag(content=ESTILOS_PDF_COMPACTO)
+                if paginado:
+                    # Diagramar al ancho de la página para que los gráficos no se escalen al imprimir
+                    page.set_viewport_size({'width': PAGINA_PDF['ancho_util'],
+                                            'height': page.viewport_size['height']})
+                    page.add_style_tag(content=ESTILOS_PDF_PAGINADO)
+                    page.wait_for_timeout(500)
+                if perfil['graficos_livianos']:
+                    page.evaluate(SCRIPT_RASTERIZAR_GRAFICOS, [perfil['dpi'] / 96, perfil['calidad_jpeg']])
+                
+                ruta_pdf = os.path.join("reportes", nombre_pdf)
+                if paginado:
+                    # Páginas de tamaño estándar: el costo crece con el contenido, no con una sola página gigante
+                    margen = PAGINA_PDF['margen']
+                    page.pdf(
+                        path=ruta_pdf,
+                        format=PAGINA_PDF['formato'],
+                        landscape=PAGINA_PDF['horizontal'],
+                        print_background=True,
+                        display_header_footer=True,
+                        header_template='<div></div>',
+                        footer_template=PIE_PDF_PAGINADO,
+                        margin={'top': margen, 'bottom': margen, 'left': margen, 'right': margen}
+                    )
+                else:
+                    # Obtener dimensiones del contenido
+                    dimensiones = page.evaluate("""
+                        () => {
+                            const body = document.body;
+                            const html = document.documentElement;
+                            const height = Math.max(
+                                body.scrollHeight,
+                                body.offsetHeight,
+                                html.clientHeight,
+                                html.scrollHeight,
+                                html.offsetHeight
+                            );
+                            const width = Math.max(
+                                body.scrollWidth,
+                                body.offsetWidth,
+                                html.clientWidth,
+                                html.scrollWidth,
+                                html.offsetWidth
+                            );
+                            return { width, height };
+                        }
+                    """)
+                    
+                    # Generar PDF ajustado al contenido sin márgenes
+                    page.pdf(
+                        path=ruta_pdf,
+                        width=f"{dimensiones['width']}px",
+                        height=f"{dimensiones['height']}px",
+                        print_background=True,
+                        margin={'top': '0', 'bottom': '0', 'left': '0', 'right': '0'}
+                    )
+                artefactos['pdf'] = ruta_pdf
             
             browser.close()
         
-        print(f"✅ PDF generado: {ruta_pdf}")
-        return ruta_pdf
+        if artefactos['pdf']:
+            print(f"✅ PDF generado: {artefactos['pdf']}")
+            artefactos['medicion_pdf'] = informar_pdf(artefactos['pdf'], perfil_pdf, inicio)
+        if artefactos['png']:
+            print(f"✅ Miniatura PNG generada: {artefactos['png']}")
+        for ruta_grafico in artefactos['graficos'].values():
+            print(f"✅ Imagen de gráfico generada: {ruta_grafico}")
+        if artefactos['datos']:
+            print(f"✅ Datos generados: {artefactos['datos']}")
+        return artefactos
         
     except Exception as e:
         print(f"❌ Error al generar PDF: {str(e)}")
         return None
+
+
+# Colores del dashboard, compartidos con el renderizador PDF nativo
+COLORES_DASHBOARD = [
+    '#00d4ff', '#ff6b6b', '#4ecdc4', '#f9ca24', '#6c5ce7', '#26de81', '#fd79a8',
+    '#fdcb6e', '#a55eea', '#520325', '#ff9f43', '#ee5a6f', '#0fb9b1', '#2ed573',
+    '#ffa502', '#ff6348', '#747d8c', '#5f27cd', '#00d2d3', '#ff9ff3'
+]
+
+
+def _estilo_ejes_oscuro(ax):
+    """Aplica el estilo oscuro del dashboard a unos ejes de matplotlib"""
+    ax.set_facecolor('#000')
+    ax.tick_params(colors='#a8b2d1')
+    ax.grid(color='#333')
+    ax.set_axisbelow(True)
+    for borde in ax.spines.values():
+        borde.set_color('#333')
+
+
+def _dibujar_tabla(ax, encabezados, filas, titulo, resaltar_ultima=False):
+    """
+    Dibuja una tabla con el estilo del dashboard en unos ejes vacíos
+
+    Args:
+        ax: Ejes de matplotlib
+        encabezados: Lista de encabezados
+        filas: Lista de filas (listas de strings)
+        titulo: Título de la tabla
+        resaltar_ultima: Resaltar la última fila como fila de totales
+    """
+    ax.axis('off')
+    ax.set_title(titulo, color='#00d4ff', fontsize=13, fontweight='bold', loc='left')
+    if not filas:
+        return
+
+    tabla = ax.table(cellText=filas, colLabels=encabezados, loc='upper center', cellLoc='left')
+    tabla.auto_set_font_size(False)
+    tabla.set_fontsize(8)
+    tabla.scale(1, 1.4)
+    for (fila, _), celda in tabla.get_celld().items():
+        celda.set_edgecolor('#454545')
+        if fila == 0:
+            celda.set_facecolor('#000')
+            celda.get_text().set_color('#00d4ff')
+            celda.get_text().set_fontweight('bold')
+        elif resaltar_ultima and fila == len(filas):
+            celda.set_facecolor('#00d4ff')
+            celda.get_text().set_color('#000')
+            celda.get_text().set_fontweight('bold')
+        else:
+            celda.set_facecolor('#1e2328' if fila % 2 else '#2a2d32')
+            celda.get_text().set_color('#e8eaed')
+
+
+def _formato_moneda(value):
+    """Formatea un monto con separador de miles chileno"""
+    return f"${int(value):,}".replace(",", ".")
+
+
+def _colores_responsables(estadisticas):
+    """Asigna a cada responsable el mismo color que usa Chart.js en el dashboard"""
+    return [COLORES_DASHBOARD[i % len(COLORES_DASHBOARD)] for i in range(len(estadisticas))]
+
+
+def _grafico_barras(ax, estadisticas):
+    """Dibuja el gráfico 'Gastos por Responsable' del dashboard"""
+    _estilo_ejes_oscuro(ax)
+    ax.bar([item['responsable'] for item in estadisticas],
+           [item['totalConPropina'] for item in estadisticas],
+           color=_colores_responsables(estadisticas))
+    ax.set_title('Gastos por Responsable', color='#00d4ff', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45, labelsize=7)
+    ax.yaxis.set_major_formatter(lambda valor, _: _formato_moneda(valor))
+
+
+def _grafico_torta(ax, estadisticas):
+    """Dibuja el gráfico 'Distribución de Gastos' del dashboard"""
+    ax.pie([item['totalConPropina'] for item in estadisticas],
+           labels=[item['responsable'] for item in estadisticas],
+           colors=_colores_responsables(estadisticas), startangle=90, counterclock=False,
+           wedgeprops={'width': 0.5, 'edgecolor': '#000', 'linewidth': 1.5},
+           textprops={'color': '#a8b2d1', 'fontsize': 7})
+    ax.set_title('Distribución de Gastos', color='#00d4ff', fontsize=12)
+
+
+def _grafico_lineas(ax, estadisticas):
+    """Dibuja el gráfico 'Promedio de Gasto por Item' del dashboard"""
+    promedios = sorted(
+        ((item['responsable'], item['totalConPropina'] / item['cantidadItems']) for item in estadisticas),
+        key=lambda par: par[1]
+    )
+    _estilo_ejes_oscuro(ax)
+    ax.plot([p[0] for p in promedios], [p[1] for p in promedios], color='#4ecdc4',
+            linewidth=2.5, marker='o', markerfacecolor='#4ecdc4', markeredgecolor='#000')
+    ax.fill_between(range(len(promedios)), [p[1] for p in promedios], color='#4ecdc4', alpha=0.1)
+    ax.set_title('Promedio de Gasto por Item', color='#00d4ff', fontsize=12)
+    ax.set_ylim(bottom=0)
+    ax.tick_params(axis='x', labelsize=7)
+    ax.yaxis.set_major_formatter(lambda valor, _: _formato_moneda(valor))
+
+
+# Gráficos del dashboard: id del canvas → (función de dibujo)
+GRAFICOS_DASHBOARD = {
+    'barChart': _grafico_barras,
+    'pieChart': _grafico_torta,
+    'lineChart': _grafico_lineas,
+}
+
+# Tamaño en pulgadas de cada gráfico renderizado como imagen
+TAMANOS_GRAFICOS = {
+    'barChart': (7, 4.5),
+    'pieChart': (7, 4.5),
+    'lineChart': (14, 4.5),
+}
+
+
+def renderizar_graficos(data, nombre_base, dpi=150, directorio=os.path.join("reportes", "graficos")):
+    """
+    Renderiza una sola vez cada gráfico del dashboard como PNG para reutilizarlo
+    en el HTML, el Excel y el PDF
+    
+    Args:
+        data: Datos de generar_datos_json
+        nombre_base: Prefijo de los archivos de imagen
+        dpi: Resolución de las imágenes
+        directorio: Carpeta donde se guardan las imágenes
+    
+    Returns:
+        dict: {id_grafico: ruta_png}
+    """
+    # Importar aquí para no cargar matplotlib cuando no se usan imágenes
+    from matplotlib.figure import Figure
+    
+    os.makedirs(directorio, exist_ok=True)
+    
+    imagenes = {}
+    for id_grafico, dibujar in GRAFICOS_DASHBOARD.items():
+        fig = Figure(figsize=TAMANOS_GRAFICOS[id_grafico], facecolor='#000')
+        ax = fig.add_subplot()
+        dibujar(ax, data['estadisticas'])
+        fig.tight_layout()
+        ruta_imagen = os.path.join(directorio, f"{nombre_base}_{id_grafico}.png")
+        fig.savefig(ruta_imagen, dpi=dpi, facecolor=fig.get_facecolor())
+        imagenes[id_grafico] = ruta_imagen
+    
+    print(f"\n🖼️  Gráficos renderizados en: {directorio}")
+    return imagenes
+
+
+@contextmanager
+def _silenciar_avisos_fuentes(silenciar):
+    """
+    Oculta los avisos de matplotlib por pesos de fuente aproximados: la Helvetica estándar
+    del PDF solo tiene el peso 'medium' y matplotlib avisa cada vez que se pide 'normal'
+    """
+    registro = logging.getLogger('matplotlib.font_manager')
+    nivel_anterior = registro.level
+    if silenciar:
+        registro.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        registro.setLevel(nivel_anterior)
+
+
+def _cabe_en_winansi(data, *tablas):
+    """
+    Indica si todo el texto del reporte se puede escribir con las fuentes estándar del PDF
+
+    Args:
+        data: Datos de generar_datos_json
+        *tablas: DataFrames cuyo texto también va al PDF (se ignoran los None)
+
+    Returns:
+        bool: True si todo el texto cabe en WinAnsi (cp1252)
+    """
+    textos = [json.dumps(data, ensure_ascii=False)]
+    textos.extend(tabla.to_csv() for tabla in tablas if tabla is not None)
+    try:
+        for texto in textos:
+            texto.encode('cp1252')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def generar_pdf_nativo(stats_responsables, tabla_productos, tabla_precios,
+                       total_cuenta, total_con_propina, propina_porcentaje, fecha=None,
+                       nombre_pdf="dashboard_gastos.pdf", filas_por_pagina=40, imagenes_graficos=None,
+                       transferencias=None, perfil_pdf='archivo'):
+    """
+    Genera el PDF del dashboard directamente con matplotlib, sin abrir un navegador.
+    Incluye las tarjetas de resumen, los tres gráficos y las tablas de detalle.
+    
+    Args:
+        stats_responsables: DataFrame con estadísticas por responsable
+        tabla_productos: DataFrame con productos por responsable  
+        tabla_precios: DataFrame con precios por responsable
+        total_cuenta: Total sin propina
+        total_con_propina: Total con propina
+        propina_porcentaje: Porcentaje de propina aplicado
+        fecha: Fecha del reporte (opcional)
+        nombre_pdf: Nombre del archivo PDF de salida
+        filas_por_pagina: Máximo de filas de tabla por página
+        imagenes_graficos: Dict {id_grafico: ruta_png} de renderizar_graficos (opcional; el
+                           perfil de archivo las incrusta tal cual en vez de volver a dibujar)
+        transferencias: DataFrame De/Para/Monto de liquidacion.calcular_transferencias (opcional)
+        perfil_pdf: 'archivo' (las imágenes entregadas o gráficos vectoriales) o 'compacto'
+                    (siempre gráficos vectoriales, fuentes estándar sin incrustar y compresión
+                    máxima); ver PERFILES_PDF
+    
+    Returns:
+        str: Ruta del archivo PDF generado
+    """
+    # Importar aquí para no cargar matplotlib cuando solo se usa el HTML
+    from matplotlib import rc_context
+    from matplotlib.figure import Figure
+    from matplotlib.image import imread
+    from matplotlib.backends.backend_pdf import PdfPages
+    
+    print("\n📄 Generando PDF nativo (sin navegador)...")
+    perfil = obtener_perfil_pdf(perfil_pdf)
+    inicio_pdf = time.perf_counter()
+    if perfil['graficos_livianos']:
+        # Un PNG del gráfico pesa más que sus vectores y matplotlib no lo guardaría como JPEG
+        imagenes_graficos = None
+    
+    data = generar_datos_json(stats_responsables, tabla_productos, tabla_precios,
+                              total_cuenta, total_con_propina, propina_porcentaje, fecha)
+    resumen = data['resumen']
+    estadisticas = data['estadisticas']
+    format_currency = _formato_moneda
+    
+    ruta_pdf = os.path.join("reportes", nombre_pdf)
+    os.makedirs(os.path.dirname(ruta_pdf), exist_ok=True)
+    tamano_pagina = (11.69, 8.27)  # A4 horizontal en pulgadas
+    
+    # Type 3 incrusta solo los glifos usados
+    opciones_pdf = {'pdf.fonttype': 3, 'pdf.compression': perfil['compresion']}
+    fuentes_base = perfil['fuentes_base'] and _cabe_en_winansi(data, tabla_productos, tabla_precios,
+                                                                transferencias)
+    if fuentes_base:
+        opciones_pdf.update(OPCIONES_FUENTES_BASE_PDF)
+    with rc_context(opciones_pdf), _silenciar_avisos_fuentes(fuentes_base), PdfPages(ruta_pdf) as pdf:
+        # Página 1: encabezado, tarjetas de resumen y gráficos
+        fig = Figure(figsize=tamano_pagina, facecolor='#0f0f23')
+        fig.text(0.5, 0.95, 'Análisis de Gastos Compartidos', ha='center', color='#00d4ff',
+                 fontsize=20, fontweight='bold')
+        fig.text(0.5, 0.915, f"Reporte generado el {resumen['fecha']}", ha='center', color='#a8b2d1', fontsize=10)
+        
+        tarjetas = [
+            (format_currency(resumen['totalSinPropina']), 'TOTAL SIN PROPINA', '#00d4ff'),
+            (format_currency(resumen['totalConPropina']), 'TOTAL CON PROPINA', '#ff9f1c'),
+            (str(resumen['numeroResponsables']), 'RESPONSABLES', '#27ae60'),
+            (f"{resumen['propinaAplicada']}%", 'PROPINA APLICADA', '#f24e1e'),
+        ]
+        for i, (valor, etiqueta, color) in enumerate(tarjetas):
+            x = 0.125 + i * 0.25
+            fig.text(x, 0.84, valor, ha='center', color=color, fontsize=16, fontweight='bold',
+                     bbox={'boxstyle': 'round,pad=0.8', 'facecolor': '#16213e', 'edgecolor': '#333'})
+            fig.text(x, 0.79, etiqueta, ha='center', color='#a8b2d1', fontsize=8)
+        
+        posiciones = {
+            'barChart': [0.06, 0.42, 0.52, 0.3],
+            'pieChart': [0.62, 0.36, 0.34, 0.38],
+            'lineChart': [0.06, 0.07, 0.9, 0.22],
+        }
+        for id_grafico, posicion in posiciones.items():
+            ax = fig.add_axes(posicion)
+            if imagenes_graficos and id_grafico in imagenes_graficos:
+                # Reusar la imagen ya renderizada (sus píxeles tal cual, sin volver a muestrear)
+                ax.imshow(imread(imagenes_graficos[id_grafico]), interpolation='none')
+                ax.axis('off')
+            else:
+                GRAFICOS_DASHBOARD[id_grafico](ax, estadisticas)
+        pdf.savefig(fig, facecolor=fig.get_facecolor())
+        
+        # Tabla de detalle por responsable
+        encabezados = ['Responsable', 'Total Gastado', 'Total c/Propina', 'Cantidad Items',
+                       '% del Total', 'Promedio por Item']
+        filas = [
+            [item['responsable'], format_currency(item['totalGastado']), format_currency(item['totalConPropina']),
+             str(item['cantidadItems']), f"{item['porcentajeCuenta']:.2f}%",
+             format_currency(item['totalConPropina'] / item['cantidadItems'])]
+            for item in estadisticas
+        ]
+        totales = data['totales']
+        filas.append(['TOTAL', format_currency(totales['totalGastado']), format_currency(totales['totalConPropina']),
+                      str(totales['cantidadItems']), '100.00%',
+                      format_currency(totales['totalConPropina'] / totales['cantidadItems'])])
+        
+        # Tabla de productos por responsable (una fila por producto)
+        filas_productos = []
+        for detalle in obtener_detalle_por_responsable(tabla_productos, tabla_precios, propina_porcentaje):
+            filas_productos.extend([detalle['responsable'], producto, precio] for producto, precio in detalle['items'])
+            filas_productos.append([detalle['responsable'], f'Total a Pagar (propina {propina_porcentaje}%)',
+                                    detalle['total']])
+        
+        secciones = [
+            ('Detalle por Responsable', encabezados, filas, True),
+            ('Productos por Responsable', ['Responsable', 'Producto', 'Precio'], filas_productos, False),
+        ]
+        if transferencias is not None and len(transferencias):
+            filas_transferencias = [
+                [fila['De'], fila['Para'], format_currency(fila['Monto'])]
+                for fila in transferencias.to_dict('records')
+            ]
+            secciones.insert(1, ('Transferencias para Saldar', ['Paga', 'Recibe', 'Monto'],
+                                 filas_transferencias, False))
+        for titulo, columnas, filas_seccion, con_totales in secciones:
+            for inicio in range(0, len(filas_seccion), filas_por_pagina):
+                bloque = filas_seccion[inicio:inicio + filas_por_pagina]
+                ultimo_bloque = inicio + filas_por_pagina >= len(filas_seccion)
+                fig = Figure(figsize=tamano_pagina, facecolor='#0f0f23')
+                ax = fig.add_axes([0.04, 0.04, 0.92, 0.88])
+                _dibujar_tabla(ax, columnas, bloque, titulo, resaltar_ultima=con_totales and ultimo_bloque)
+                pdf.savefig(fig, facecolor=fig.get_facecolor())
+    
+    print(f"✅ PDF generado: {ruta_pdf}")
+    informar_pdf(ruta_pdf, perfil_pdf, inicio_pdf)
+    return ruta_pdf
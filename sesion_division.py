@@ -0,0 +1,163 @@
+from boleta_compacta import BoletaCompacta
+from Boleta import Config, armar_estadisticas
+
+
+class SesionDivision:
+    """
+    Sesión en memoria para corregir la división de una boleta ítem por ítem.
+
+    Mantiene el total de cada persona y, al agregar, quitar o reasignar un ítem,
+    actualiza solo a quienes lo comparten (costo proporcional a esa cantidad de
+    personas). Cada cambio retorna la diferencia de lo que paga cada afectado,
+    sin recalcular la boleta ni regenerar reportes.
+    """
+
+    def __init__(self, propina_porcentaje=None):
+        self.propina_porcentaje = Config.PROPINA_PORCENTAJE if propina_porcentaje is None else propina_porcentaje
+        self.items = {}         # id de ítem → (producto, monto, [responsables])
+        self.personas = {}      # nombre → [total_gastado, total_con_propina, cantidad_items]
+        self.total_cuenta = 0
+        self._siguiente_id = 0
+
+    @classmethod
+    def desde_boleta(cls, df, total_cuenta=None, propina_porcentaje=None):
+        """
+        Crea la sesión a partir de una boleta ya cargada
+
+        Args:
+            df: DataFrame de cargar_y_procesar_csv o BoletaCompacta
+            total_cuenta: Total de la cuenta sin propina (por defecto, la suma de los ítems)
+            propina_porcentaje: Porcentaje de propina (por defecto Config.PROPINA_PORCENTAJE)
+
+        Returns:
+            SesionDivision con un ítem por fila de la boleta (ids 0..n-1, en orden)
+        """
+        boleta = df if isinstance(df, BoletaCompacta) else BoletaCompacta.desde_dataframe(df)
+        sesion = cls(propina_porcentaje)
+        for i in range(len(boleta)):
+            inicio, fin = boleta.offsets[i], boleta.offsets[i + 1]
+            sesion.agregar_item(
+                boleta.productos.nombres[boleta.producto_ids[i]],
+                boleta.montos[i].item(),
+                boleta.personas.obtener_nombres(boleta.persona_ids[inicio:fin])
+            )
+        if total_cuenta is not None:
+            sesion.total_cuenta = total_cuenta
+        return sesion
+
+    def _aplicar(self, monto, responsables, signo, afectados):
+        """Suma (signo 1) o resta (signo -1) la parte de cada responsable de un ítem"""
+        if not responsables:
+            return
+        factor = 1 + self.propina_porcentaje / 100
+        parte = monto / len(responsables)
+        for nombre in responsables:
+            if nombre not in afectados:
+                afectados[nombre] = self.total_con_propina(nombre)
+            registro = self.personas.setdefault(nombre, [0.0, 0.0, 0])
+            registro[0] += signo * parte
+            registro[1] += signo * parte * factor
+            registro[2] += signo
+            # Sin ítems no debe quedar un residuo de punto flotante
+            if registro[2] == 0:
+                del self.personas[nombre]
+
+    def _diferencias(self, afectados):
+        """
+        Args:
+            afectados: Dict {nombre: total con propina antes del cambio}
+
+        Returns:
+            dict: {nombre: {'antes', 'despues', 'diferencia'}} en pesos enteros, solo
+            para quienes cambió lo que pagan
+        """
+        diferencias = {}
+        for nombre, antes in afectados.items():
+            antes, despues = round(antes), round(self.total_con_propina(nombre))
+            if antes != despues:
+                diferencias[nombre] = {'antes': antes, 'despues': despues, 'diferencia': despues - antes}
+        return diferencias
+
+    def total_con_propina(self, nombre):
+        """
+        Args:
+            nombre: Nombre de la persona
+
+        Returns:
+            float: Lo que paga la persona con propina (0 si no tiene ítems)
+        """
+        registro = self.personas.get(nombre)
+        return registro[1] if registro else 0.0
+
+    def agregar_item(self, producto, monto, responsables):
+        """
+        Agrega un ítem a la boleta
+
+        Args:
+            producto: Nombre del producto
+            monto: Precio total del ítem (sin propina)
+            responsables: Lista de quienes lo comparten (un nombre repetido paga más partes)
+
+        Returns:
+            Tuple de (id_item, diferencias)
+        """
+        id_item = self._siguiente_id
+        self._siguiente_id += 1
+        responsables = list(responsables)
+        self.items[id_item] = (producto, monto, responsables)
+        self.total_cuenta += monto
+
+        afectados = {}
+        self._aplicar(monto, responsables, 1, afectados)
+        return id_item, self._diferencias(afectados)
+
+    def quitar_item(self, id_item):
+        """
+        Quita un ítem de la boleta
+
+        Args:
+            id_item: Id del ítem
+
+        Returns:
+            dict: Diferencias por persona
+        """
+        _, monto, responsables = self.items.pop(id_item)
+        self.total_cuenta -= monto
+
+        afectados = {}
+        self._aplicar(monto, responsables, -1, afectados)
+        return self._diferencias(afectados)
+
+    def reasignar_item(self, id_item, responsables):
+        """
+        Cambia quiénes comparten un ítem (ej. "esa empanada era solo de Beak y Pixie")
+
+        Args:
+            id_item: Id del ítem
+            responsables: Nueva lista de responsables
+
+        Returns:
+            dict: Diferencias por persona (de los responsables anteriores y los nuevos)
+        """
+        producto, monto, anteriores = self.items[id_item]
+        responsables = list(responsables)
+        self.items[id_item] = (producto, monto, responsables)
+
+        afectados = {}
+        self._aplicar(monto, anteriores, -1, afectados)
+        self._aplicar(monto, responsables, 1, afectados)
+        return self._diferencias(afectados)
+
+    def a_estadisticas(self):
+        """
+        Returns:
+            DataFrame con el mismo formato de calcular_estadisticas_por_responsable
+        """
+        nombres = list(self.personas)
+        return armar_estadisticas(
+            nombres,
+            [self.personas[n][0] for n in nombres],
+            [self.personas[n][1] for n in nombres],
+            [self.personas[n][2] for n in nombres],
+            self.total_cuenta
+        )
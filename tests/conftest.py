@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Boleta import Config
+
+
+@pytest.fixture
+def directorio_trabajo(tmp_path, monkeypatch):
+    """
+    Corre la prueba en una carpeta temporal (los reportes se escriben en rutas relativas),
+    leyendo los CSV de ejemplo de data/ y sin tocar el caché ni el índice del repositorio
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'DIRECTORIO_DATA', os.path.join(RAIZ, 'data'))
+    monkeypatch.setattr(Config, 'DIRECTORIO_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(Config, 'ARCHIVO_DICCIONARIOS', str(tmp_path / 'cache' / 'diccionarios.json'))
+    monkeypatch.setattr(Config, 'ARCHIVO_HISTORIAL', str(tmp_path / 'cache' / 'historial_personas.json'))
+    monkeypatch.setattr(Config, 'USAR_CACHE', False)
+    return tmp_path
+
+
+def chromium_disponible():
+    """True si Playwright puede abrir Chromium (no siempre está instalado el navegador)"""
+    from reporte import PLAYWRIGHT_DISPONIBLE
+    if not PLAYWRIGHT_DISPONIBLE:
+        return False
+    from playwright.sync_api import sync_playwright
+    try:
+        with sync_playwright() as p:
+            p.chromium.launch().close()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture
+def reporte_boleta(directorio_trabajo):
+    """Tablas de la Boleta01 listas para generar reportes"""
+    from Boleta import cargar_y_procesar_csv, calcular_estadisticas_por_responsable, generar_tablas_detalle
+    df, total_cuenta, total_con_propina = cargar_y_procesar_csv('Boleta01.csv')
+    stats_responsables = calcular_estadisticas_por_responsable(df, total_cuenta)
+    tabla_productos, tabla_precios = generar_tablas_detalle(df, stats_responsables)
+    return stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina
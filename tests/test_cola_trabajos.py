@@ -0,0 +1,67 @@
+import os
+import shutil
+import sqlite3
+
+from Boleta import Config
+from cola_trabajos import ColaTrabajos, ETAPAS_BOLETA, procesar_cola
+
+
+def copiar_boletas(directorio_trabajo, monkeypatch, *archivos):
+    """Copia boletas de ejemplo a una carpeta data/ propia de la prueba (para poder modificarlas)"""
+    directorio_data = directorio_trabajo / 'data'
+    directorio_data.mkdir()
+    for archivo in archivos:
+        shutil.copy(os.path.join(Config.DIRECTORIO_DATA, archivo), directorio_data / archivo)
+    monkeypatch.setattr(Config, 'DIRECTORIO_DATA', str(directorio_data))
+    return directorio_data
+
+
+def test_volver_a_encolar_solo_si_cambio_el_csv(directorio_trabajo, monkeypatch):
+    directorio_data = copiar_boletas(directorio_trabajo, monkeypatch, 'Boleta02.csv')
+    cola = ColaTrabajos(str(directorio_trabajo / 'cola.db'))
+
+    assert cola.encolar(['Boleta02.csv']) == len(ETAPAS_BOLETA)
+    assert cola.encolar(['Boleta02.csv']) == 0
+
+    with open(directorio_data / 'Boleta02.csv', 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert cola.encolar(['Boleta02.csv']) == len(ETAPAS_BOLETA)
+    assert cola.estado()['version'].nunique() == 2
+
+
+def test_migrar_cola_anterior(directorio_trabajo):
+    ruta_db = str(directorio_trabajo / 'cola.db')
+    conexion = sqlite3.connect(ruta_db)
+    conexion.executescript('''
+        CREATE TABLE trabajos (
+            id INTEGER PRIMARY KEY, archivo TEXT NOT NULL, etapa TEXT NOT NULL, fecha TEXT NOT NULL,
+            estado TEXT NOT NULL DEFAULT 'pendiente', intentos INTEGER NOT NULL DEFAULT 0, trabajador TEXT,
+            lease_hasta REAL, disponible_desde REAL NOT NULL DEFAULT 0, resultado TEXT, error TEXT,
+            actualizado REAL NOT NULL, UNIQUE (archivo, etapa));
+        CREATE INDEX trabajos_estado ON trabajos (estado, disponible_desde);
+        INSERT INTO trabajos (archivo, etapa, fecha, estado, actualizado)
+            VALUES ('Boleta02.csv', 'carga', '2026-01-01', 'completado', 0);
+    ''')
+    conexion.close()
+
+    cola = ColaTrabajos(ruta_db)
+
+    estado = cola.estado()
+    assert list(estado['estado']) == ['completado']
+    assert cola.encolar(['Boleta02.csv']) == len(ETAPAS_BOLETA)
+
+
+def test_trabajadores_generan_un_excel_por_boleta(directorio_trabajo, monkeypatch):
+    copiar_boletas(directorio_trabajo, monkeypatch, 'Boleta02.csv', 'Boleta04.csv')
+    monkeypatch.setattr(Config, 'MOTOR_PDF', 'nativo')
+    cola = ColaTrabajos(str(directorio_trabajo / 'cola.db'))
+    cola.encolar(['Boleta02.csv', 'Boleta04.csv'], fecha='2026-01-01')
+
+    completados, fallidos = procesar_cola(cola, trabajador='prueba')
+
+    assert (completados, fallidos) == (2 * len(ETAPAS_BOLETA), 0)
+    assert Config.MODO_EXCEL == 'unico'
+    particion = directorio_trabajo / 'reportes' / '2026' / '01' / '01'
+    assert sorted(p.name for p in particion.glob('*.xlsx')) == [
+        'analisis_Boleta02_2026-01-01.xlsx', 'analisis_Boleta04_2026-01-01.xlsx']
+    assert not (directorio_trabajo / Config.ARCHIVO_EXCEL).exists()
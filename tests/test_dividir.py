@@ -0,0 +1,31 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from Boleta import Config
+from conftest import RAIZ
+from dividir import dividir_boleta
+
+BOLETA = os.path.join(RAIZ, 'data', 'Boleta01.csv')
+
+
+def total_con_propina(stats_responsables):
+    return int(stats_responsables.loc[stats_responsables['Responsable'] == 'TOTAL', 'Total_con_Propina'].iloc[0])
+
+
+def test_propina_explicita_no_modifica_la_configuracion():
+    stats_responsables, cuadra = dividir_boleta(BOLETA, propina_porcentaje=15)
+
+    assert total_con_propina(stats_responsables) == round(236300 * 1.15)
+    assert not cuadra  # el CSV trae el total con 10% de propina
+    assert Config.PROPINA_PORCENTAJE == 10
+
+
+def test_llamadas_concurrentes_con_distintas_propinas():
+    propinas = [0, 10, 15, 20] * 10
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultados = list(executor.map(lambda propina: dividir_boleta(BOLETA, propina), propinas))
+
+    for propina, (stats_responsables, cuadra) in zip(propinas, resultados):
+        assert total_con_propina(stats_responsables) == round(236300 * (1 + propina / 100))
+        assert cuadra == (propina == 10)
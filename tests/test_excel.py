@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Boleta import exportar_consolidado
+
+resource = pytest.importorskip('resource', reason="Límite de descriptores solo en sistemas Unix")
+
+
+@pytest.fixture
+def pocos_descriptores():
+    """Baja el límite de archivos abiertos del proceso durante la prueba"""
+    blando, duro = resource.getrlimit(resource.RLIMIT_NOFILE)
+    limite = 64
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limite, duro))
+    try:
+        yield limite
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (blando, duro))
+
+
+def test_consolidado_con_mas_boletas_que_descriptores(directorio_trabajo, pocos_descriptores):
+    archivos_csv = ['Boleta01.csv', 'Boleta02.csv'] * pocos_descriptores
+
+    ruta = exportar_consolidado(archivos_csv, os.path.join('reportes', 'consolidado.xlsx'))
+
+    hojas = pd.read_excel(ruta, sheet_name=None)
+    assert list(hojas) == ['Índice', 'Responsables', 'Ítems']
+    assert len(hojas['Índice']) == len(archivos_csv)
+    # Boleta01 tiene 12 responsables y Boleta02 tiene 4
+    assert len(hojas['Responsables']) == (12 + 4) * pocos_descriptores
+    assert hojas['Responsables']['Boleta'].value_counts()['Boleta02'] == 4 * pocos_descriptores
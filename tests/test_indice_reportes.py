@@ -0,0 +1,54 @@
+import json
+import os
+import re
+
+from indice_reportes import (ARCHIVO_DATOS_INDICE, ARCHIVO_MANIFIESTO, compactar_indice, leer_indice,
+                             registrar_reporte)
+
+
+def registrar(directorio, boleta):
+    return registrar_reporte(boleta, '2026-01-15', 1000, 2, {'html': os.path.join(directorio, f'{boleta}.html')},
+                             directorio=directorio)
+
+
+def lineas_datos(directorio):
+    with open(os.path.join(directorio, ARCHIVO_DATOS_INDICE), encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def assert_datos_validos(directorio):
+    """Cada línea de indice.js es una llamada completa con un texto JSON"""
+    for linea in lineas_datos(directorio):
+        llamada = re.fullmatch(r'agregarLinea\((".*")\);', linea)
+        assert llamada, linea
+        json.loads(llamada.group(1))
+
+
+def test_lineas_danadas_se_omiten_y_la_cortada_se_descarta(tmp_path):
+    directorio = str(tmp_path)
+    registrar(directorio, 'Boleta01')
+    # Línea válida pero sin los campos del índice, y una línea cortada por un proceso interrumpido
+    with open(os.path.join(directorio, ARCHIVO_MANIFIESTO), 'a', encoding='utf-8') as f:
+        f.write('{"otra": 1}\n{"boleta": "Bol')
+    with open(os.path.join(directorio, ARCHIVO_DATOS_INDICE), 'a', encoding='utf-8') as f:
+        f.write('agregarLinea("{\\"boleta')
+
+    assert [e['boleta'] for e in leer_indice(directorio)] == ['Boleta01']
+
+    registrar(directorio, 'Boleta02')
+
+    assert [e['boleta'] for e in leer_indice(directorio)] == ['Boleta01', 'Boleta02']
+    assert len(lineas_datos(directorio)) == 2
+    assert_datos_validos(directorio)
+
+
+def test_compactar_deja_una_linea_por_reporte(tmp_path):
+    directorio = str(tmp_path)
+    registrar(directorio, 'Boleta01')
+    registrar(directorio, 'Boleta01')
+    registrar(directorio, 'Boleta02')
+
+    compactar_indice(directorio)
+
+    assert len(lineas_datos(directorio)) == 2
+    assert_datos_validos(directorio)
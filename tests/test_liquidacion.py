@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from liquidacion import calcular_saldos, liquidar_boletas
+
+
+def estadisticas(consumos):
+    filas = [{'Responsable': nombre, 'Total_con_Propina': monto} for nombre, monto in consumos.items()]
+    filas.append({'Responsable': 'TOTAL', 'Total_con_Propina': sum(consumos.values())})
+    return pd.DataFrame(filas)
+
+
+def test_saldos_de_varios_pagadores_suman_cero():
+    stats = estadisticas({'Beak': 30000, 'Pixie': 20000, 'Jubilee': 27330})
+
+    saldos = calcular_saldos([(stats, {'Pixie': 50000, 'Jubilee': 27330})])
+
+    assert saldos == {'Beak': -30000, 'Pixie': 30000, 'Jubilee': 0}
+    assert sum(saldos.values()) == 0
+
+
+def test_redondeo_dentro_de_la_tolerancia():
+    stats = estadisticas({'Beak': 100.6, 'Pixie': 100.6})
+
+    saldos = calcular_saldos([(stats, {'Beak': 201})])
+
+    assert saldos == {'Beak': 101, 'Pixie': -100}
+
+
+def test_pagos_que_no_cuadran_lanzan_error():
+    stats = estadisticas({'Beak': 30000, 'Pixie': 20000})
+
+    with pytest.raises(ValueError, match='boleta 2'):
+        liquidar_boletas([(stats, 'Beak'), (stats, {'Beak': 45000})])
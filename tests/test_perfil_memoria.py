@@ -0,0 +1,26 @@
+import pytest
+
+from perfil_memoria import PerfilMemoria, PresupuestoMemoriaExcedido
+
+
+def test_presupuesto_no_cuenta_memoria_asignada_antes_de_la_etapa():
+    perfil = PerfilMemoria(presupuesto_mb=20)
+    with perfil.etapa('inicio'):
+        pass
+    # Como una importación perezosa hecha fuera de toda etapa
+    retenido = bytearray(40 * 1024 * 1024)
+
+    with perfil.etapa('vacia'):
+        pass
+
+    assert perfil.etapas[-1]['pico_mb'] > 20
+    assert perfil.etapas[-1]['pico_sobre_inicio_mb'] < 1
+    del retenido
+
+
+def test_presupuesto_excedido_por_la_etapa():
+    perfil = PerfilMemoria(presupuesto_mb=20)
+
+    with pytest.raises(PresupuestoMemoriaExcedido, match="'grande'"):
+        with perfil.etapa('grande'):
+            bytearray(40 * 1024 * 1024)
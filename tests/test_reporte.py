@@ -0,0 +1,115 @@
+import json
+import os
+import re
+
+import pytest
+
+from conftest import chromium_disponible
+from reporte import (generar_datos_json, generar_dashboard_html, renderizar_graficos,
+                     capturar_imagenes_graficos, capturar_artefactos)
+
+
+class ElementoHTML:
+    """Elemento <canvas>/<img> leído del HTML, con la parte de la API de Playwright que se usa"""
+
+    def __init__(self, etiqueta, atributos):
+        self.etiqueta = etiqueta
+        self.atributos = atributos
+
+    def get_attribute(self, nombre):
+        return self.atributos.get(nombre)
+
+    def evaluate(self, script):
+        return self.etiqueta.upper()
+
+    def screenshot(self, path):
+        raise AssertionError("Las imágenes estáticas no deben volver a capturarse")
+
+
+class PaginaHTML:
+    """Página con los gráficos de un dashboard ya escrito, sin abrir un navegador"""
+
+    def __init__(self, ruta_html):
+        with open(ruta_html, encoding='utf-8') as f:
+            self.html = f.read()
+
+    def locator(self, selector):
+        elementos = [
+            ElementoHTML(etiqueta, dict(re.findall(r'(\w+)="([^"]*)"', atributos)))
+            for etiqueta, atributos in re.findall(r'<(canvas|img)\b([^>]*)>', self.html)
+        ]
+        return type('Locator', (), {'all': lambda _: elementos})()
+
+
+def dashboard_estatico(reporte_boleta):
+    stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina = reporte_boleta
+    data = generar_datos_json(stats_responsables, tabla_productos, tabla_precios,
+                              total_cuenta, total_con_propina, 10, '2026-01-01')
+    imagenes = renderizar_graficos(data, 'Boleta01_2026-01-01', 50,
+                                   os.path.join('reportes', '2026', '01', '01', 'graficos'))
+    ruta_html = generar_dashboard_html(stats_responsables, tabla_productos, tabla_precios,
+                                       total_cuenta, total_con_propina, 10, '2026-01-01',
+                                       os.path.join('2026', '01', '01', 'dashboard_Boleta01.html'), imagenes)
+    return ruta_html, imagenes
+
+
+def test_capturar_graficos_estaticos_copia_las_imagenes(reporte_boleta):
+    ruta_html, imagenes = dashboard_estatico(reporte_boleta)
+
+    graficos = capturar_imagenes_graficos(PaginaHTML(ruta_html), ruta_html, 'dashboard_Boleta01')
+
+    assert set(graficos) == set(imagenes)
+    for id_grafico, ruta in graficos.items():
+        with open(ruta, 'rb') as capturada, open(imagenes[id_grafico], 'rb') as original:
+            assert capturada.read() == original.read()
+
+
+@pytest.mark.skipif(not chromium_disponible(), reason="Chromium de Playwright no está instalado")
+def test_capturar_artefactos_con_graficos_estaticos(reporte_boleta):
+    ruta_html, imagenes = dashboard_estatico(reporte_boleta)
+
+    artefactos = capturar_artefactos(ruta_html, nombre_pdf=None, capturar_graficos=True)
+
+    assert set(artefactos['graficos']) == set(imagenes)
+    assert all(os.path.getsize(ruta) for ruta in artefactos['graficos'].values())
+
+
+def test_json_del_shell_tiene_copia_para_abrir_desde_el_disco(reporte_boleta):
+    from reporte import generar_dashboard_json
+    stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina = reporte_boleta
+
+    enlace = generar_dashboard_json(stats_responsables, tabla_productos, tabla_precios, total_cuenta,
+                                    total_con_propina, 10, '2026-01-01', os.path.join('2026', 'dashboard.json'))
+
+    assert enlace.endswith('?datos=datos/2026/dashboard.json')
+    ruta_json = os.path.join('reportes', 'datos', '2026', 'dashboard.json')
+    with open(ruta_json, encoding='utf-8') as f:
+        texto = f.read()
+    with open(os.path.join('reportes', 'datos', '2026', 'dashboard.js'), encoding='utf-8') as f:
+        copia = f.read()
+    prefijo = 'window.datosInyectados = '
+    assert copia.startswith(prefijo)
+    assert json.loads(copia[len(prefijo):].rstrip().rstrip(';')) == texto
+
+
+@pytest.mark.parametrize('con_imagenes', [False, True])
+def test_pdf_nativo_compacto_no_pesa_mas_que_el_de_archivo(reporte_boleta, con_imagenes):
+    from reporte import generar_pdf_nativo
+    stats_responsables, tabla_productos, tabla_precios, total_cuenta, total_con_propina = reporte_boleta
+    imagenes = None
+    if con_imagenes:
+        data = generar_datos_json(stats_responsables, tabla_productos, tabla_precios,
+                                  total_cuenta, total_con_propina, 10, '2026-01-01')
+        imagenes = renderizar_graficos(data, 'Boleta01', 150)
+
+    tamanos = {}
+    for perfil in ('archivo', 'compacto'):
+        ruta = generar_pdf_nativo(stats_responsables, tabla_productos, tabla_precios, total_cuenta,
+                                  total_con_propina, 10, '2026-01-01', f'{perfil}.pdf',
+                                  imagenes_graficos=imagenes, perfil_pdf=perfil)
+        tamanos[perfil] = os.path.getsize(ruta)
+        with open(ruta, 'rb') as f:
+            # El archivo reusa las imágenes ya renderizadas; el compacto dibuja vectores
+            assert (b'/Subtype /Image' in f.read()) == (con_imagenes and perfil == 'archivo')
+
+    assert tamanos['compacto'] <= tamanos['archivo']